@@ -2,19 +2,21 @@ from flask import Flask
 from flask_cors import CORS
 from backend.config import Config
 from backend.database.connection import get_db_manager
+from backend.json_provider import FastJSONProvider
 
 def create_app(config_class=Config):
     """Application factory pour Flask"""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = FastJSONProvider(app, backend=app.config.get("JSON_BACKEND"))
     
     # Configure CORS to handle preflight requests properly
     # On Vercel, backend and frontend are on same domain, so CORS is less restrictive
     cors_kwargs = {
         "methods": ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"],
+        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Idempotency-Key"],
         "supports_credentials": True,
-        "expose_headers": ["Content-Type", "Authorization"]
+        "expose_headers": ["Content-Type", "Authorization", "Idempotent-Replayed"]
     }
     
     # If CORS_ORIGINS is "*", use origin="*" for all routes
@@ -92,9 +94,18 @@ def create_app(config_class=Config):
             return jsonify({'message': 'Unauthorized: Only clients can create orders'}), 403
         
         from backend.controllers import order_controller
+        from backend.middleware.idempotency import run_idempotent
         data = request.get_json() or {}
         client_id = user.get('id')
-        return order_controller.create_order(client_id, data)
+        return run_idempotent("order", client_id, lambda: order_controller.create_order(client_id, data))
+
+    @app.after_request
+    def add_db_metrics_headers(response):
+        if app.config.get('DB_POOL_METRICS'):
+            stats = get_db_manager().get_request_stats()
+            response.headers['X-DB-Cursors'] = str(stats['cursors'])
+            response.headers['X-DB-Checkouts'] = str(stats['checkouts'])
+        return response
 
     @app.teardown_appcontext
     def close_db_connection(exception=None):
@@ -0,0 +1,40 @@
+"""In-process caches.
+
+Caches are named, created once per worker with :func:`get_cache`, and listed
+with their hit/miss counters by :func:`cache_stats` (``GET /api/admin/metrics``).
+Writers invalidate by name with :func:`invalidate`, so DAO modules do not need
+to know which caches hold their data. Entries also expire after their TTL,
+which bounds how stale another worker's cache can be after a write.
+"""
+import threading
+from backend.cache.ttl import TTLCache, MISSING
+
+_caches = {}
+_lock = threading.Lock()
+
+
+def get_cache(name, maxsize=1024, ttl=60):
+    """Get the cache called ``name``, creating it on first use."""
+    cache = _caches.get(name)
+    if cache is None:
+        with _lock:
+            cache = _caches.get(name)
+            if cache is None:
+                cache = _caches[name] = TTLCache(name, maxsize=maxsize, ttl=ttl)
+    return cache
+
+
+def invalidate(*names):
+    """Clear the named caches (the ones not created yet are skipped)."""
+    for name in names:
+        cache = _caches.get(name)
+        if cache is not None:
+            cache.clear()
+
+
+def cache_stats():
+    """Counters of every cache, keyed by name."""
+    return {name: cache.stats() for name, cache in sorted(_caches.items())}
+
+
+__all__ = ["TTLCache", "MISSING", "get_cache", "invalidate", "cache_stats"]
@@ -0,0 +1,235 @@
+"""Read-through cache for single-row catalog lookups.
+
+:func:`read_through` wraps a DAO getter taking one key (``get_product(id)``,
+``get_category(id)``...). Lookups go through two levels:
+
+1. a per-entity in-process LRU (:class:`backend.cache.ttl.TTLCache`), with
+   the TTL configured for that entity in ``CATALOG_CACHE_TTLS``;
+2. optionally a shared backend (``CACHE_SHARED_BACKEND``): ``redis``, or
+   ``local``, an in-process stand-in with the same interface for
+   development and single-worker deployments.
+
+Rows go to the shared backend as JSON, with ``Decimal``, ``datetime``,
+``date``, ``timedelta`` and ``bytes`` values tagged so they read back with
+their type (never pickle: whoever can write to Redis must not be able to
+run code in the app). Only rows are cached, never "not found". The DAO
+write functions call
+``getter.invalidate(key)``, which drops the key from both levels; the TTL
+bounds staleness in the in-process level of *other* workers.
+"""
+import base64
+import functools
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from backend.config import Config
+from backend.cache import get_cache, MISSING
+
+
+class LocalSharedBackend:
+    """In-process stand-in for the shared backend (same interface as Redis)."""
+
+    name = "local"
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class RedisSharedBackend:
+    """Shared backend on Redis (needs the optional ``redis`` package)."""
+
+    name = "redis"
+
+    def __init__(self, url):
+        import redis  # optional dependency, only needed for this backend
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl):
+        self._client.set(key, value, ex=max(int(ttl), 1))
+
+    def delete(self, key):
+        self._client.delete(key)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+_shared_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+def _create_shared_backend(config):
+    name = (config.CACHE_SHARED_BACKEND or "").lower()
+    if not name or name == "none":
+        return None
+    if name == "local":
+        return LocalSharedBackend()
+    if name == "redis":
+        return RedisSharedBackend(config.CACHE_REDIS_URL)
+    raise ValueError(f"Unknown CACHE_SHARED_BACKEND: {name}")
+
+
+def get_shared_backend():
+    """The configured shared backend, or None."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = _create_shared_backend(Config()) or False
+    return _shared or None
+
+
+def _count_shared(name):
+    with _shared_lock:
+        _shared_stats[name] += 1
+
+
+def shared_stats():
+    backend = get_shared_backend()
+    with _shared_lock:
+        stats = dict(_shared_stats)
+    stats["backend"] = backend.name if backend else None
+    return stats
+
+
+# JSON tags of the row values JSON has no type for.
+_ENCODERS = {
+    Decimal: lambda value: {"$dec": str(value)},
+    datetime: lambda value: {"$dt": value.isoformat()},
+    date: lambda value: {"$date": value.isoformat()},
+    timedelta: lambda value: {"$td": value.total_seconds()},
+    bytes: lambda value: {"$b64": base64.b64encode(value).decode("ascii")},
+}
+_DECODERS = {
+    "$dec": Decimal,
+    "$dt": datetime.fromisoformat,
+    "$date": date.fromisoformat,
+    "$td": lambda seconds: timedelta(seconds=seconds),
+    "$b64": base64.b64decode,
+}
+
+
+def _encode_value(value):
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:
+        raise TypeError(f"Object of type {type(value).__name__} cannot be cached")
+    return encoder(value)
+
+
+def _decode_object(data):
+    if len(data) == 1:
+        tag, value = next(iter(data.items()))
+        decoder = _DECODERS.get(tag)
+        if decoder is not None:
+            return decoder(value)
+    return data
+
+
+def dumps_row(row):
+    """Encoded row for the shared backend."""
+    return json.dumps(row, default=_encode_value, separators=(",", ":")).encode("utf-8")
+
+
+def loads_row(blob):
+    """Row of :func:`dumps_row`; ValueError if ``blob`` is not one."""
+    return json.loads(blob, object_hook=_decode_object)
+
+
+def _copy(row):
+    # Callers may modify the row they get; never hand out the cached object.
+    return dict(row) if isinstance(row, dict) else row
+
+
+def read_through(entity, shared=True):
+    """Cache the results of a ``getter(key)`` DAO function under ``entity``.
+
+    ``shared=False`` keeps the entity out of the shared backend (rows that
+    should not leave the process, such as users with their password hash).
+    """
+    def decorator(getter):
+        def local_cache():
+            config = Config()
+            return get_cache(
+                f"catalog:{entity}",
+                maxsize=config.CATALOG_CACHE_SIZE,
+                ttl=config.CATALOG_CACHE_TTLS.get(entity, config.CATALOG_CACHE_DEFAULT_TTL),
+            )
+
+        def shared_backend():
+            return get_shared_backend() if shared else None
+
+        @functools.wraps(getter)
+        def wrapper(key):
+            if not Config.CATALOG_CACHE_ENABLED:
+                return getter(key)
+            cache = local_cache()
+            generation = cache.generation
+            row = cache.get(key)
+            if row is not MISSING:
+                return _copy(row)
+            backend = shared_backend()
+            shared_key = f"catalog:{entity}:{key}"
+            if backend is not None:
+                try:
+                    blob = backend.get(shared_key)
+                except Exception:
+                    blob = None
+                    _count_shared("errors")
+                row = None
+                if blob is not None:
+                    try:
+                        row = loads_row(blob)
+                    except ValueError:
+                        # Entrée illisible (ancien format) : relue en base
+                        _count_shared("errors")
+                if row is not None:
+                    _count_shared("hits")
+                    cache.set(key, row, generation=generation)
+                    return _copy(row)
+                _count_shared("misses")
+            row = getter(key)
+            if row is not None and cache.generation == generation:
+                cache.set(key, row, generation=generation)
+                if backend is not None:
+                    try:
+                        backend.set(shared_key, dumps_row(row), cache.ttl)
+                    except Exception:
+                        _count_shared("errors")
+            return _copy(row)
+
+        def invalidate(key):
+            local_cache().delete(key)
+            backend = shared_backend()
+            if backend is not None:
+                try:
+                    backend.delete(f"catalog:{entity}:{key}")
+                except Exception:
+                    _count_shared("errors")
+
+        wrapper.invalidate = invalidate
+        wrapper.uncached = getter
+        return wrapper
+
+    return decorator
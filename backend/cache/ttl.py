@@ -0,0 +1,97 @@
+"""Thread-safe LRU cache with per-entry expiry."""
+import threading
+import time
+from collections import OrderedDict
+
+# Returned by TTLCache.get on a miss (cached values may be None or 0).
+MISSING = object()
+
+
+class TTLCache:
+    """LRU cache of at most ``maxsize`` entries, each valid ``ttl`` seconds.
+
+    A ``ttl`` of 0 disables the cache: nothing is stored and every lookup is
+    a miss.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=60):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        # Bumped by delete() and clear(): a value loaded before an
+        # invalidation is not stored after it.
+        self._generation = 0
+
+    def get(self, key, default=MISSING):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self._misses += 1
+            return default
+
+    def set(self, key, value, ttl=None, generation=None):
+        ttl = self.ttl if ttl is None else ttl
+        if not ttl or self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def get_or_load(self, key, loader, ttl=None):
+        """Cached value of ``key``, calling ``loader()`` on a miss."""
+        generation = self._generation
+        value = self.get(key)
+        if value is MISSING:
+            value = loader()
+            self.set(key, value, ttl, generation=generation)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+            self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            self._invalidations += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
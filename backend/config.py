@@ -13,6 +13,16 @@ class Config:
     MYSQL_USER = os.environ.get("MYSQL_USER") or "root"
     MYSQL_PASSWORD = os.environ.get("MYSQL_PASSWORD") or "root"
     MYSQL_DATABASE = os.environ.get("MYSQL_DATABASE") or "ECommerce"
+    MYSQL_POOL_SIZE = int(os.environ.get("MYSQL_POOL_SIZE") or 5)
+
+    # Bind one pooled connection per Flask request and reuse it for every DAO
+    # call of that request (released in teardown_appcontext). Size the pool
+    # for the number of concurrent requests when enabling this.
+    DB_REQUEST_SCOPED_CONNECTIONS = (
+        os.environ.get("DB_REQUEST_SCOPED_CONNECTIONS", "false").lower() == "true"
+    )
+    # Add X-DB-Cursors / X-DB-Checkouts headers to every API response.
+    DB_POOL_METRICS = os.environ.get("DB_POOL_METRICS", "false").lower() == "true"
 
     # CORS Origins - Support for local dev and Vercel deployment
     # In production (Vercel), backend and frontend are on same domain via rewrites
@@ -31,6 +41,81 @@ class Config:
             "http://127.0.0.1:5174",
         ]
 
+    # Product text search backend: "like", "fulltext" or "memory"
+    SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND") or "like"
+    SEARCH_FULLTEXT_MIN_TOKEN_SIZE = int(os.environ.get("SEARCH_FULLTEXT_MIN_TOKEN_SIZE") or 3)
+    SEARCH_MAX_CANDIDATES = int(os.environ.get("SEARCH_MAX_CANDIDATES") or 5000)
+    SEARCH_INDEX_TTL = int(os.environ.get("SEARCH_INDEX_TTL") or 300)
+
+    # Cache of search total counts (seconds, 0 disables; entries per worker).
+    # Product writes clear it; the TTL bounds staleness across workers.
+    COUNT_CACHE_TTL = int(os.environ.get("COUNT_CACHE_TTL") or 60)
+    COUNT_CACHE_SIZE = int(os.environ.get("COUNT_CACHE_SIZE") or 1024)
+
+    # Read-through cache of catalog rows (product, category, user, seller
+    # profile lookups by ID; carts by client and cart summaries). TTLs are per entity, in seconds:
+    # CATALOG_CACHE_TTLS="product=30,category=300".
+    CATALOG_CACHE_ENABLED = os.environ.get("CATALOG_CACHE_ENABLED", "true").lower() == "true"
+    CATALOG_CACHE_SIZE = int(os.environ.get("CATALOG_CACHE_SIZE") or 2048)
+    CATALOG_CACHE_DEFAULT_TTL = int(os.environ.get("CATALOG_CACHE_DEFAULT_TTL") or 60)
+    CATALOG_CACHE_TTLS = {
+        name.strip(): int(ttl)
+        for name, _, ttl in (
+            item.partition("=")
+            for item in (
+                os.environ.get("CATALOG_CACHE_TTLS")
+                or "product=30,category=300,user=60,seller_profile=120,cart=300,cart_summary=30"
+            ).split(",")
+            if "=" in item
+        )
+    }
+    # Second cache level shared by the workers: "" (none), "local"
+    # (in-process stand-in) or "redis" (needs the redis package).
+    CACHE_SHARED_BACKEND = os.environ.get("CACHE_SHARED_BACKEND") or ""
+    CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL") or "redis://localhost:6379/0"
+
+    # Seconds between two checks of the category tree version (see
+    # backend/controllers/category_tree.py).
+    CATEGORY_TREE_CHECK_INTERVAL = float(os.environ.get("CATEGORY_TREE_CHECK_INTERVAL") or 5)
+
+    # JSON encoder of API responses: "auto" (orjson if installed), "orjson"
+    # or "json" (standard library).
+    JSON_BACKEND = os.environ.get("JSON_BACKEND") or "auto"
+
+    # Rows per batch of the streamed list endpoints (/api/product/All,
+    # /api/admin/products, /orders, /users): read, hydrated and sent together.
+    STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE") or 500)
+
+    # Admin dashboard counters: cached for DASHBOARD_STATS_TTL seconds.
+    # "incremental" reads the product and order counters kept by the DAO
+    # writes (migration 0004) instead of counting; "aggregate" counts.
+    DASHBOARD_STATS_MODE = os.environ.get("DASHBOARD_STATS_MODE") or "aggregate"
+    DASHBOARD_STATS_TTL = int(os.environ.get("DASHBOARD_STATS_TTL") or 10)
+
+    # Seller dashboard counters: "sql" (grouped queries on each read) or
+    # "materialized" (seller_stats table kept current by writes, migration 0006).
+    SELLER_STATS_MODE = os.environ.get("SELLER_STATS_MODE") or "sql"
+
+    # Idempotency-Key support of POST /api/order, /api/payment/order/<id> and
+    # /api/payment/stripe/create-checkout (migration 0009), in seconds:
+    # stored responses are kept IDEMPOTENCY_TTL, a running request holds its
+    # key at most IDEMPOTENCY_LOCK_TIMEOUT, duplicates wait for it at most
+    # IDEMPOTENCY_WAIT_TIMEOUT. The in-process LRU keeps recent responses.
+    IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL") or 86400)
+    IDEMPOTENCY_LOCK_TIMEOUT = int(os.environ.get("IDEMPOTENCY_LOCK_TIMEOUT") or 60)
+    IDEMPOTENCY_WAIT_TIMEOUT = float(os.environ.get("IDEMPOTENCY_WAIT_TIMEOUT") or 10)
+    IDEMPOTENCY_CACHE_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE") or 1024)
+    IDEMPOTENCY_CACHE_TTL = int(os.environ.get("IDEMPOTENCY_CACHE_TTL") or 300)
+
+    # Stock holds of checkouts in progress (migration 0011), in seconds: a
+    # hold lasts STOCK_RESERVATION_TTL, expired holds are released at most
+    # every STOCK_RESERVATION_SWEEP_INTERVAL per worker, and sold-out
+    # products are refused from memory for STOCK_AVAILABILITY_TTL.
+    STOCK_RESERVATIONS = os.environ.get("STOCK_RESERVATIONS", "false").lower() == "true"
+    STOCK_RESERVATION_TTL = int(os.environ.get("STOCK_RESERVATION_TTL") or 600)
+    STOCK_RESERVATION_SWEEP_INTERVAL = int(os.environ.get("STOCK_RESERVATION_SWEEP_INTERVAL") or 30)
+    STOCK_AVAILABILITY_TTL = float(os.environ.get("STOCK_AVAILABILITY_TTL") or 2)
+
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     UPLOAD_FOLDER = os.path.join(BASE_DIR, "server", "uploads")
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
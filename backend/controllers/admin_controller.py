@@ -1,4 +1,5 @@
 import os
+from datetime import datetime, timedelta
 from flask import jsonify, request, current_app
 from backend.database.dao import users as users_dao
 from backend.database.dao import seller_profiles as seller_profiles_dao
@@ -9,23 +10,31 @@ from backend.database.dao import product_images as images_dao
 from backend.database.dao import orders as orders_dao
 from backend.database.dao import payments as payments_dao
 from backend.database.dao import reviews as reviews_dao
+from backend.database.connection import get_db_manager
+from backend import cache, search
+from backend.cache import read_through
+from backend.controllers import category_tree, dashboard_stats, pagination, streaming
 from backend.controllers.serializers import (
     user_to_dict,
     category_to_dict,
     subcategory_to_dict,
-    product_to_dict,
-    product_image_to_dict,
     order_to_dict,
     order_item_to_dict,
     payment_to_dict,
     seller_profile_to_dict,
 )
+from backend.controllers.hydration import hydrate_products
+
+ORDER_STATUSES = ["processing", "shipped", "delivered", "cancelled"]
+PAYMENT_STATUSES = ["pending", "paid", "failed"]
 
 
 def get_all_users():
     try:
-        users = users_dao.list_users()
-        return jsonify([user_to_dict(user) for user in users]), 200
+        return streaming.stream_json(
+            streaming.keyset_batches(users_dao.search_users, pagination.USERS),
+            lambda users: [user_to_dict(user) for user in users],
+        ), 200
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
@@ -109,22 +118,9 @@ def create_category():
 
 
 def get_all_categories():
+    """Category tree with subcategories, from the shared snapshot (ETag/304)."""
     try:
-        categories = categories_dao.list_categories()
-        if not categories:
-            return jsonify([]), 200
-        
-        result = []
-        for category in categories:
-            try:
-                cat_dict = category_to_dict(category)
-                subcategories = subcategories_dao.list_subcategories_by_category(category["id_category"])
-                cat_dict["subcategories"] = [subcategory_to_dict(sub) for sub in subcategories] if subcategories else []
-                result.append(cat_dict)
-            except Exception as e:
-                # Log error but continue processing other categories
-                continue
-        return jsonify(result), 200
+        return category_tree.tree_response()
     except Exception as error:
         import traceback
         return jsonify({"message": str(error), "traceback": traceback.format_exc()}), 500
@@ -218,14 +214,10 @@ def delete_subcategory(subcategory_id):
 
 def get_all_products():
     try:
-        products = products_dao.list_products()
-        result = []
-        for product in products:
-            product_dict = product_to_dict(product)
-            images = images_dao.list_images_by_product(product["id_product"])
-            product_dict["images"] = [product_image_to_dict(img) for img in images]
-            result.append(product_dict)
-        return jsonify(result), 200
+        return streaming.stream_json(
+            streaming.keyset_batches(products_dao.search_products, pagination.PRODUCT_IDS),
+            hydrate_products,
+        ), 200
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
@@ -249,6 +241,7 @@ def delete_product(product_id):
                         pass
         images_dao.delete_images_by_product(product_id)
         products_dao.delete_product(product_id)
+        search.product_deleted(product_id)
         return jsonify({"message": "Product deleted successfully"}), 200
     except Exception as error:
         return jsonify({"message": str(error)}), 500
@@ -290,22 +283,101 @@ def update_seller_verification(seller_id):
         return jsonify({"message": str(error)}), 500
 
 
-def get_all_orders():
+def _hydrate_orders(orders):
+    """Serialize orders with their items, client and payment (one query per relation)."""
+    order_ids = [order["id_order"] for order in orders]
+    items_by_order = {}
+    for item in orders_dao.list_order_items_by_orders(order_ids):
+        items_by_order.setdefault(item["id_order"], []).append(item)
+    clients = {
+        client["id_user"]: client
+        for client in users_dao.list_users_by_ids(list({order["id_client"] for order in orders}))
+    }
+    payments = {
+        payment["id_order"]: payment
+        for payment in payments_dao.list_payments_by_orders(order_ids)
+    }
+
+    result = []
+    for order in orders:
+        order_dict = order_to_dict(order)
+        order_dict["items"] = [order_item_to_dict(item) for item in items_by_order.get(order["id_order"], [])]
+        client = clients.get(order["id_client"])
+        if client:
+            order_dict["client"] = user_to_dict(client)
+        payment = payments.get(order["id_order"])
+        if payment:
+            order_dict["payment"] = payment_to_dict(payment)
+        result.append(order_dict)
+    return result
+
+
+def _parse_date(value, end=False):
+    """Datetime of a ``date_from`` / ``date_to`` value (ISO date or datetime).
+    A plain ``date_to`` date includes that whole day."""
     try:
-        orders = orders_dao.list_orders_all()
-        result = []
-        for order in orders:
-            order_dict = order_to_dict(order)
-            items = orders_dao.list_order_items(order["id_order"])
-            order_dict["items"] = [order_item_to_dict(item) for item in items]
-            client = users_dao.get_user_by_id(order["id_client"])
-            if client:
-                order_dict["client"] = user_to_dict(client)
-            payment = payments_dao.get_payment_by_order(order["id_order"])
-            if payment:
-                order_dict["payment"] = payment_to_dict(payment)
-            result.append(order_dict)
-        return jsonify(result), 200
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}") from None
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def _order_filters(query_params):
+    """``(conditions, params)`` of the admin order filters (ValueError on bad input)."""
+    conditions, params = [], []
+    for name, column, allowed in (
+        ("status", "order_status", ORDER_STATUSES),
+        ("payment_status", "payment_status", PAYMENT_STATUSES),
+    ):
+        values = [value for value in (query_params.get(name) or "").split(",") if value]
+        if values:
+            if any(value not in allowed for value in values):
+                raise ValueError(f"Invalid {name}")
+            conditions.append(f"{column} IN ({', '.join(['%s'] * len(values))})")
+            params.extend(values)
+    client_id = query_params.get("client_id")
+    if client_id:
+        try:
+            params.append(int(client_id))
+        except ValueError:
+            raise ValueError("Invalid client_id") from None
+        conditions.append("id_client = %s")
+    if query_params.get("date_from"):
+        conditions.append("order_createdAt >= %s")
+        params.append(_parse_date(query_params["date_from"]))
+    if query_params.get("date_to"):
+        conditions.append("order_createdAt < %s")
+        params.append(_parse_date(query_params["date_to"], end=True))
+    return conditions, params
+
+
+def _orders_page(conditions, params, query_params):
+    """One keyset page of orders: 4 queries (orders, items, clients, payments)."""
+    orders, page_info = pagination.keyset_page(
+        orders_dao.search_orders, conditions, params, query_params, pagination.ORDERS,
+    )
+    return {"orders": _hydrate_orders(orders), "pagination": page_info}
+
+
+def get_all_orders(query_params=None):
+    """All orders (streamed), or one page when ``cursor`` is given.
+
+    Filters: ``status``, ``payment_status`` (comma-separated), ``client_id``,
+    ``date_from`` / ``date_to``.
+    """
+    query_params = query_params or {}
+    try:
+        conditions, params = _order_filters(query_params)
+        if "cursor" in query_params:
+            return jsonify(_orders_page(conditions, params, query_params)), 200
+        return streaming.stream_json(
+            streaming.keyset_batches(orders_dao.search_orders, pagination.ORDERS, conditions, params),
+            _hydrate_orders,
+        ), 200
+    except ValueError as error:
+        return jsonify({"message": str(error)}), 400
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
@@ -319,11 +391,11 @@ def update_order_status(order_id):
         data = request.get_json() or {}
         fields = {}
         if "order_status" in data:
-            if data["order_status"] not in ["processing", "shipped", "delivered", "cancelled"]:
+            if data["order_status"] not in ORDER_STATUSES:
                 return jsonify({"message": "Invalid order status"}), 400
             fields["order_status"] = data["order_status"]
         if "payment_status" in data:
-            if data["payment_status"] not in ["pending", "paid", "failed"]:
+            if data["payment_status"] not in PAYMENT_STATUSES:
                 return jsonify({"message": "Invalid payment status"}), 400
             fields["payment_status"] = data["payment_status"]
         if fields:
@@ -336,17 +408,8 @@ def update_order_status(order_id):
 
 def get_dashboard_stats():
     try:
-        stats = {
-            "total_users": users_dao.count_users(),
-            "total_clients": users_dao.count_users_by_role("client"),
-            "total_sellers": users_dao.count_users_by_role("seller"),
-            "total_products": len(products_dao.list_products()),
-            "total_orders": len(orders_dao.list_orders_all()),
-            "pending_orders": len([o for o in orders_dao.list_orders_all() if o["order_status"] == "processing"]),
-            "total_categories": len(categories_dao.list_categories()),
-            "pending_seller_verifications": seller_profiles_dao.count_pending_verifications(),
-        }
-        return jsonify(stats), 200
+        refresh = request.args.get("refresh", "").lower() == "true"
+        return jsonify(dashboard_stats.get_stats(refresh=refresh)), 200
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
@@ -358,16 +421,21 @@ def delete_review(review_id):
         if not review:
             return jsonify({"message": "Review not found"}), 404
 
-        product_id = review["id_product"]
+        # Also updates the product rating (same transaction)
         reviews_dao.delete_review(review_id)
 
-        # Update product rating
-        avg_rating = reviews_dao.average_rating_for_product(product_id)
-        if avg_rating is None:
-            products_dao.update_product_rating(product_id, 0.0)
-        else:
-            products_dao.update_product_rating(product_id, avg_rating)
-
         return jsonify({"message": "Review deleted successfully"}), 200
     except Exception as error:
         return jsonify({"message": str(error)}), 500
+
+
+def get_metrics():
+    """Process-level performance counters (admin only)."""
+    try:
+        return jsonify({
+            "db_pool": get_db_manager().get_pool_stats(),
+            "caches": cache.cache_stats(),
+            "shared_cache": read_through.shared_stats(),
+        }), 200
+    except Exception as error:
+        return jsonify({"message": str(error)}), 500
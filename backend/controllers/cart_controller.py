@@ -1,8 +1,41 @@
 from flask import jsonify
 from backend.database.dao import cart as cart_dao
 from backend.database.dao import products as products_dao
-from backend.database.dao import product_images as images_dao
-from backend.controllers.serializers import cart_to_dict, cart_item_to_dict, product_to_dict, product_image_to_dict
+from backend.controllers.serializers import (
+    cart_to_dict,
+    cart_item_to_dict,
+    product_to_dict,
+    product_image_to_dict,
+)
+
+MAX_BATCH_ITEMS = 100
+
+
+def _cart_item_dicts(rows):
+    """Cart item dicts, with their product and its first image, from the
+    rows of `cart_dao.list_cart_rows`; returns (items, total)."""
+    items = []
+    total = 0
+    for row in rows:
+        if row["id_cart_item"] is None:
+            continue
+        item_dict = cart_item_to_dict({
+            "id_cart_item": row["id_cart_item"],
+            "id_cart": row["id_cart"],
+            "id_product": row["item_id_product"],
+            "quantity": row["quantity"],
+        })
+        if row["id_product"] is not None:
+            product_dict = product_to_dict(row)
+            product_dict["images"] = (
+                [product_image_to_dict(row)] if row["id_product_image"] is not None else []
+            )
+            item_dict["product"] = product_dict
+            item_total = (product_dict["price"] or 0) * item_dict["quantity"]
+            item_dict["item_total"] = item_total
+            total += item_total
+        items.append(item_dict)
+    return items, total
 
 
 def get_cart(client_id):
@@ -10,9 +43,13 @@ def get_cart(client_id):
     try:
         if not client_id:
             return jsonify({"message": "Client ID is required"}), 400
-        
-        cart = cart_dao.get_cart_by_client(client_id)
-        if not cart:
+
+        # Panier, articles, produits et première image en une requête
+        rows = cart_dao.list_cart_rows(client_id)
+        if rows:
+            cart = rows[0]
+            rows = [row for row in rows if row["id_cart"] == cart["id_cart"]]
+        else:
             cart_id = cart_dao.create_cart(client_id)
             if not cart_id:
                 return jsonify({"message": "Failed to create cart"}), 500
@@ -30,61 +67,109 @@ def get_cart(client_id):
                 "items": [],
                 "total": 0
             }), 200
-        result["items"] = []
-        total = 0
-
-        items = cart_dao.list_cart_items(cart["id_cart"])
-        for item in items:
-            item_dict = cart_item_to_dict(item)
-            product = products_dao.get_product(item["id_product"])
-            if product:
-                product_dict = product_to_dict(product)
-                images = images_dao.list_images_by_product(product["id_product"])
-                product_dict["images"] = [product_image_to_dict(img) for img in images[:1]]
-                item_dict["product"] = product_dict
-                item_total = (product_dict["price"] or 0) * item_dict["quantity"]
-                item_dict["item_total"] = item_total
-                total += item_total
-            result["items"].append(item_dict)
-
-        result["total"] = total
+        result["items"], result["total"] = _cart_item_dicts(rows)
         return jsonify(result), 200
     except Exception as error:
         import traceback
         return jsonify({"message": str(error), "traceback": traceback.format_exc()}), 500
 
 
-def add_to_cart(client_id, data):
-    """Add a product to the cart."""
+def get_cart_summary(client_id):
+    """Item count and total of a client's cart (cached, for the header badge)."""
     try:
-        product_id = data.get("id_product")
-        quantity = data.get("quantity", 1)
+        if not client_id:
+            return jsonify({"message": "Client ID is required"}), 400
 
-        if not product_id:
-            return jsonify({"message": "Product ID is required"}), 400
+        cart = cart_dao.get_cart_by_client(client_id)
+        if not cart:
+            return jsonify({"id_cart": None, "item_count": 0, "total": 0}), 200
+        summary = cart_dao.get_cart_summary(cart["id_cart"]) or {}
+        return jsonify({
+            "id_cart": cart["id_cart"],
+            "item_count": int(summary.get("item_count") or 0),
+            "total": float(summary.get("total") or 0),
+        }), 200
+    except Exception as error:
+        return jsonify({"message": str(error)}), 500
 
-        product = products_dao.get_product(product_id)
-        if not product:
-            return jsonify({"message": "Product not found"}), 404
 
-        if product["stock"] < quantity:
-            return jsonify({"message": "Insufficient stock"}), 400
+def _parse_items(items):
+    """{id_product: quantity} of a list of `{"id_product", "quantity"}`
+    (quantity defaults to 1; repeated products are summed). Raises
+    ValueError on invalid input."""
+    if not isinstance(items, list) or not items:
+        raise ValueError("items must be a non-empty list")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ValueError(f"At most {MAX_BATCH_ITEMS} items per request")
+    quantities = {}
+    for item in items:
+        if not isinstance(item, dict) or not item.get("id_product"):
+            raise ValueError("Product ID is required")
+        try:
+            product_id = int(item["id_product"])
+            quantity = int(item.get("quantity", 1))
+        except (TypeError, ValueError):
+            raise ValueError("id_product and quantity must be integers") from None
+        if quantity < 1:
+            raise ValueError("Quantity must be at least 1")
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+def _add_items(client_id, quantities):
+    """Check `quantities` against stock (one query) and add them to the
+    client's cart (one upsert). Returns an error response, or None."""
+    cart = cart_dao.get_cart_by_client(client_id)
+    cart_id = cart["id_cart"] if cart else cart_dao.create_cart(client_id)
+
+    products = {row["id_product"]: row for row in cart_dao.list_cart_stock(cart_id, list(quantities))}
+    missing = [product_id for product_id in quantities if product_id not in products]
+    if missing:
+        return jsonify({"message": "Product not found", "id_products": missing}), 404
+    insufficient = [
+        product_id for product_id, quantity in quantities.items()
+        if (products[product_id]["stock"] or 0) < products[product_id]["in_cart"] + quantity
+    ]
+    if insufficient:
+        return jsonify({"message": "Insufficient stock", "id_products": insufficient}), 400
+
+    cart_dao.add_cart_items(cart_id, quantities)
+    return None
 
-        cart = cart_dao.get_cart_by_client(client_id)
-        if not cart:
-            cart_id = cart_dao.create_cart(client_id)
-            cart = cart_dao.get_cart(cart_id)
 
-        existing_item = cart_dao.get_cart_item_by_product(cart["id_cart"], product_id)
-        if existing_item:
-            new_quantity = existing_item["quantity"] + quantity
-            if product["stock"] < new_quantity:
-                return jsonify({"message": "Insufficient stock"}), 400
-            cart_dao.update_cart_item_quantity(existing_item["id_cart_item"], new_quantity)
-        else:
-            cart_dao.add_cart_item(cart["id_cart"], product_id, quantity)
+def add_to_cart(client_id, data):
+    """Add a product to the cart."""
+    try:
+        if not data.get("id_product"):
+            return jsonify({"message": "Product ID is required"}), 400
 
+        error = _add_items(client_id, _parse_items([data]))
+        if error:
+            return error
         return jsonify({"message": "Product added to cart successfully"}), 201
+    except ValueError as error:
+        return jsonify({"message": str(error)}), 400
+    except Exception as error:
+        return jsonify({"message": str(error)}), 500
+
+
+def add_items_to_cart(client_id, data):
+    """Add many products to the cart at once (reorder, wishlist to cart).
+
+    All items are checked before any is added: one missing product or
+    insufficient stock rejects the whole request."""
+    try:
+        items = data.get("items") if isinstance(data, dict) else data
+        quantities = _parse_items(items)
+        error = _add_items(client_id, quantities)
+        if error:
+            return error
+        return jsonify({
+            "message": "Products added to cart successfully",
+            "added": [{"id_product": product_id, "quantity": quantity} for product_id, quantity in quantities.items()],
+        }), 201
+    except ValueError as error:
+        return jsonify({"message": str(error)}), 400
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
@@ -103,12 +188,12 @@ def update_cart_item(cart_item_id, client_id, data):
         quantity = data.get("quantity")
         if quantity is not None:
             if quantity <= 0:
-                cart_dao.delete_cart_item(cart_item_id)
+                cart_dao.delete_cart_item(cart_item_id, cart["id_cart"])
             else:
                 product = products_dao.get_product(cart_item["id_product"])
                 if product and product["stock"] < quantity:
                     return jsonify({"message": "Insufficient stock"}), 400
-                cart_dao.update_cart_item_quantity(cart_item_id, quantity)
+                cart_dao.update_cart_item_quantity(cart_item_id, quantity, cart["id_cart"])
 
         return jsonify({"message": "Cart item updated successfully"}), 200
     except Exception as error:
@@ -126,7 +211,7 @@ def remove_from_cart(cart_item_id, client_id):
         if not cart or cart["id_client"] != client_id:
             return jsonify({"message": "Unauthorized"}), 403
 
-        cart_dao.delete_cart_item(cart_item_id)
+        cart_dao.delete_cart_item(cart_item_id, cart["id_cart"])
         return jsonify({"message": "Item removed from cart successfully"}), 200
     except Exception as error:
         return jsonify({"message": str(error)}), 500
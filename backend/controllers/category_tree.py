@@ -0,0 +1,92 @@
+"""Category/subcategory tree served from an in-memory snapshot.
+
+The tree is built with one join (``categories_dao.list_category_tree_rows``)
+and kept as an immutable :class:`Snapshot`: the serialized JSON body, its
+strong ETag and the ``catalog_version`` counter it was built from. The
+category and subcategory DAO writes bump that counter (migration 0003), so a
+worker rebuilds its snapshot only after a category change. Other workers'
+changes are checked for at most every ``CATEGORY_TREE_CHECK_INTERVAL``
+seconds; this worker's own writes are seen immediately.
+
+Without the ``catalog_version`` table the snapshot is rebuilt once it is
+older than the check interval instead.
+"""
+import hashlib
+import threading
+import time
+from collections import namedtuple
+from flask import current_app, request
+from backend.config import Config
+from backend.database.dao import catalog_versions as catalog_versions_dao
+from backend.database.dao import categories as categories_dao
+from backend.controllers.serializers import category_to_dict, subcategory_to_dict
+
+Snapshot = namedtuple("Snapshot", ["version", "body", "etag"])
+
+_snapshot = None
+_checked_at = 0.0
+_seen_writes = 0
+_lock = threading.Lock()
+
+
+def build_tree(rows):
+    """Category dicts with their ``subcategories``, from the joined rows."""
+    tree = []
+    by_id = {}
+    for row in rows or []:
+        category = by_id.get(row["id_category"])
+        if category is None:
+            category = category_to_dict(row)
+            category["subcategories"] = []
+            by_id[row["id_category"]] = category
+            tree.append(category)
+        if row.get("id_SubCategory") is not None:
+            category["subcategories"].append(subcategory_to_dict(row))
+    return tree
+
+
+def _build(version):
+    tree = build_tree(categories_dao.list_category_tree_rows())
+    body = current_app.json.dumps(tree).encode("utf-8")
+    return Snapshot(version=version, body=body, etag=hashlib.sha1(body).hexdigest())
+
+
+def _is_current():
+    return (
+        _snapshot is not None
+        and _seen_writes == catalog_versions_dao.local_writes(categories_dao.TREE_VERSION)
+        and time.monotonic() - _checked_at < Config.CATEGORY_TREE_CHECK_INTERVAL
+    )
+
+
+def get_snapshot():
+    """Current snapshot, rebuilt if the tree version changed."""
+    global _snapshot, _checked_at, _seen_writes
+    if _is_current():
+        return _snapshot
+    with _lock:
+        if _is_current():
+            return _snapshot
+        writes = catalog_versions_dao.local_writes(categories_dao.TREE_VERSION)
+        version = catalog_versions_dao.get_version(categories_dao.TREE_VERSION)
+        if _snapshot is None or version is None or version != _snapshot.version:
+            _snapshot = _build(version)
+        _seen_writes = writes
+        _checked_at = time.monotonic()
+        return _snapshot
+
+
+def tree_response():
+    """The tree as a JSON response, or 304 when the client's ETag matches."""
+    snapshot = get_snapshot()
+    response = current_app.response_class(mimetype="application/json")
+    response.set_etag(snapshot.etag)
+    # Clients may keep the tree but must revalidate it (a 304 is cheap).
+    response.headers["Cache-Control"] = "no-cache"
+    if snapshot.version is not None:
+        response.headers["X-Catalog-Version"] = str(snapshot.version)
+    if request.if_none_match.contains(snapshot.etag):
+        response.status_code = 304
+        return response
+    response.set_data(snapshot.body)
+    return response
@@ -0,0 +1,46 @@
+"""Admin dashboard counters.
+
+All counters come from one query (``stats_dao``) and the result is cached
+for ``DASHBOARD_STATS_TTL`` seconds, so repeated dashboard refreshes cost a
+cache lookup.
+
+With ``DASHBOARD_STATS_MODE=incremental`` the product and order counters
+are not counted at all: the order and product DAO writes keep them in the
+``dashboard_counter`` table (migration 0004), and the query reads them from
+there. Counters missing from the table, or left stale by writers running
+in another mode (``stats_dao.MAINTAINED_MARKER``), are re-seeded from the
+tables once; without the table the aggregate query is used.
+"""
+from backend import cache
+from backend.config import Config
+from backend.database.dao import stats as stats_dao
+
+CACHE_NAME = "dashboard_stats"
+
+
+def _stats_cache():
+    return cache.get_cache(CACHE_NAME, maxsize=1, ttl=Config.DASHBOARD_STATS_TTL)
+
+
+def compute_stats():
+    """Counters straight from the database (no cache)."""
+    if not stats_dao.incremental_enabled():
+        return stats_dao.dashboard_counts()
+    counts = stats_dao.dashboard_counts_incremental()
+    if counts is None:
+        return stats_dao.dashboard_counts()
+    if any(counts[name] is None for name in stats_dao.COUNTER_QUERIES):
+        stats_dao.resync_counters()
+        counts = stats_dao.dashboard_counts_incremental()
+    return counts
+
+
+def get_stats(refresh=False):
+    """Cached dashboard counters; ``refresh`` recomputes them (and re-seeds
+    the stored counters in incremental mode)."""
+    stats_cache = _stats_cache()
+    if refresh:
+        if stats_dao.incremental_enabled():
+            stats_dao.resync_counters()
+        stats_cache.clear()
+    return dict(stats_cache.get_or_load("dashboard", compute_stats))
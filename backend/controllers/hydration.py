@@ -0,0 +1,122 @@
+"""Batched hydration of product rows.
+
+Related rows (images, categories, subcategories, sellers and seller profiles)
+are fetched with one ``IN (...)`` query per entity type and stitched together
+in memory, so the number of queries does not grow with the number of products.
+"""
+from backend.database.dao import products as products_dao
+from backend.database.dao import product_images as images_dao
+from backend.database.dao import categories as categories_dao
+from backend.database.dao import subcategories as subcategories_dao
+from backend.database.dao import users as users_dao
+from backend.database.dao import seller_profiles as seller_profiles_dao
+from backend.controllers.serializers import (
+    product_to_dict,
+    product_image_to_dict,
+    category_to_dict,
+    subcategory_to_dict,
+    user_to_dict,
+    seller_profile_to_dict,
+)
+
+
+def _distinct(values):
+    """Unique non-null values, keeping first-seen order."""
+    return list(dict.fromkeys(value for value in values if value))
+
+
+def _index_by(rows, key):
+    return {row[key]: row for row in rows or []}
+
+
+def _group_by(rows, key):
+    grouped = {}
+    for row in rows or []:
+        grouped.setdefault(row[key], []).append(row)
+    return grouped
+
+
+def hydrate_products(
+    products,
+    images=True,
+    first_image_only=False,
+    category=False,
+    subcategory=False,
+    seller=False,
+):
+    """Serialize product rows with their related data.
+
+    Issues at most one query per requested relation, whatever the number of
+    products. The returned dicts keep the order of ``products``.
+    """
+    products = list(products or [])
+    if not products:
+        return []
+
+    images_by_product = {}
+    if images:
+        product_ids = _distinct(product["id_product"] for product in products)
+        images_by_product = _group_by(
+            images_dao.list_images_by_products(product_ids), "id_product"
+        )
+
+    categories = {}
+    if category:
+        category_ids = _distinct(product.get("id_category") for product in products)
+        categories = _index_by(categories_dao.list_categories_by_ids(category_ids), "id_category")
+
+    subcategories = {}
+    if subcategory:
+        subcategory_ids = _distinct(product.get("id_SubCategory") for product in products)
+        subcategories = _index_by(
+            subcategories_dao.list_subcategories_by_ids(subcategory_ids), "id_SubCategory"
+        )
+
+    sellers = {}
+    profiles = {}
+    if seller:
+        seller_ids = _distinct(product.get("id_seller") for product in products)
+        sellers = _index_by(users_dao.list_users_by_ids(seller_ids), "id_user")
+        profiles = _index_by(
+            seller_profiles_dao.list_profiles_by_user_ids(list(sellers.keys())), "id_user"
+        )
+
+    result = []
+    for product in products:
+        product_dict = product_to_dict(product)
+
+        if images:
+            product_images = images_by_product.get(product["id_product"], [])
+            if first_image_only:
+                product_images = product_images[:1]
+            product_dict["images"] = [product_image_to_dict(img) for img in product_images]
+
+        if category and product.get("id_category") in categories:
+            product_dict["category"] = category_to_dict(categories[product["id_category"]])
+
+        if subcategory and product.get("id_SubCategory") in subcategories:
+            product_dict["subcategory"] = subcategory_to_dict(
+                subcategories[product["id_SubCategory"]]
+            )
+
+        if seller and product.get("id_seller") in sellers:
+            seller_dict = user_to_dict(sellers[product["id_seller"]])
+            profile = profiles.get(product["id_seller"])
+            if profile:
+                seller_dict["seller_profile"] = seller_profile_to_dict(profile)
+            product_dict["seller"] = seller_dict
+
+        result.append(product_dict)
+    return result
+
+
+def hydrate_product_ids(product_ids, **options):
+    """Load products by ID in one query and hydrate them.
+
+    Returns a dict keyed by ``id_product``; IDs that no longer exist are
+    absent from the result.
+    """
+    product_ids = _distinct(product_ids)
+    products = products_dao.list_products_by_ids(product_ids)
+    hydrated = hydrate_products(products, **options)
+    return {product_dict["id_product"]: product_dict for product_dict in hydrated}
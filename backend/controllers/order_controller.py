@@ -2,15 +2,15 @@ from flask import jsonify
 from backend.database.dao import cart as cart_dao
 from backend.database.dao import orders as orders_dao
 from backend.database.dao import products as products_dao
-from backend.database.dao import product_images as images_dao
 from backend.database.dao import payments as payments_dao
+from backend.database.dao import reservations as reservations_dao
+from backend.config import Config
 from backend.controllers.serializers import (
     order_to_dict,
     order_item_to_dict,
-    product_to_dict,
-    product_image_to_dict,
     payment_to_dict,
 )
+from backend.controllers.hydration import hydrate_product_ids
 
 
 def create_order(client_id, data):
@@ -20,40 +20,52 @@ def create_order(client_id, data):
         if not cart:
             return jsonify({"message": "Cart is empty"}), 400
 
-        cart_items = cart_dao.list_cart_items(cart["id_cart"])
-        if not cart_items:
-            return jsonify({"message": "Cart is empty"}), 400
-
-        total_amount = 0
-        order_items_data = []
-        for cart_item in cart_items:
-            product = products_dao.get_product(cart_item["id_product"])
-            if not product:
-                continue
-            if product["stock"] < cart_item["quantity"]:
-                return jsonify({
-                    "message": f"Insufficient stock for product {product['product_name']}"
-                }), 400
-            item_price = float(product["price"]) if product["price"] is not None else 0
-            total_amount += item_price * cart_item["quantity"]
-            order_items_data.append({
-                "id_product": cart_item["id_product"],
-                "quantity": cart_item["quantity"],
-                "price": item_price,
-            })
-
-        if total_amount == 0:
-            return jsonify({"message": "Cannot create order with zero total"}), 400
-
-        order_id = orders_dao.create_order_with_items(
-            client_id, cart["id_cart"], order_items_data, total_amount
-        )
+        # Lecture du panier, contrôle et décrément du stock dans une transaction
+        order_id = orders_dao.checkout_cart(client_id, cart["id_cart"])
 
         order = orders_dao.get_order(order_id)
         order_dict = order_to_dict(order)
         items = orders_dao.list_order_items(order_id)
         order_dict["items"] = [order_item_to_dict(item) for item in items]
         return jsonify({"message": "Order created successfully", "order": order_dict}), 201
+    except orders_dao.CheckoutError as error:
+        return jsonify({"message": str(error)}), 400
+    except Exception as error:
+        return jsonify({"message": str(error)}), 500
+
+
+def reserve_cart(client_id):
+    """Hold the cart's stock while the client checks out."""
+    try:
+        if not reservations_dao.enabled():
+            return jsonify({"message": "Stock reservations are disabled", "items": [], "expires_in": None}), 200
+        cart = cart_dao.get_cart_by_client(client_id)
+        if not cart:
+            return jsonify({"message": "Cart is empty"}), 400
+
+        held = reservations_dao.hold_cart(client_id, cart["id_cart"])
+        if not held:
+            return jsonify({"message": "Cart is empty"}), 400
+        items = [{"id_product": product_id, "quantity": quantity} for product_id, quantity in held.items()]
+        return jsonify({
+            "message": "Stock reserved",
+            "items": items,
+            "expires_in": Config.STOCK_RESERVATION_TTL,
+        }), 200
+    except reservations_dao.ReservationError as error:
+        return jsonify({"message": str(error), "id_products": error.product_ids}), 400
+    except Exception as error:
+        return jsonify({"message": str(error)}), 500
+
+
+def release_reservation(client_id):
+    """Give back the stock held for the client."""
+    try:
+        if not reservations_dao.enabled():
+            return jsonify({"message": "Stock reservations are disabled", "items": []}), 200
+        held = reservations_dao.release_holds(client_id)
+        items = [{"id_product": product_id, "quantity": quantity} for product_id, quantity in held.items()]
+        return jsonify({"message": "Reservation released", "items": items}), 200
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
@@ -62,21 +74,30 @@ def get_client_orders(client_id):
     """Get all orders for a client."""
     try:
         orders = orders_dao.list_orders_by_client(client_id)
+        order_ids = [order["id_order"] for order in orders]
+        items_by_order = {}
+        all_items = orders_dao.list_order_items_by_orders(order_ids)
+        for item in all_items:
+            items_by_order.setdefault(item["id_order"], []).append(item)
+        products = hydrate_product_ids(
+            [item["id_product"] for item in all_items], first_image_only=True
+        )
+        payments = {
+            payment["id_order"]: payment
+            for payment in payments_dao.list_payments_by_orders(order_ids)
+        }
+
         result = []
         for order in orders:
             order_dict = order_to_dict(order)
-            items = orders_dao.list_order_items(order["id_order"])
             order_dict["items"] = []
-            for item in items:
+            for item in items_by_order.get(order["id_order"], []):
                 item_dict = order_item_to_dict(item)
-                product = products_dao.get_product(item["id_product"])
-                if product:
-                    product_dict = product_to_dict(product)
-                    images = images_dao.list_images_by_product(product["id_product"])
-                    product_dict["images"] = [product_image_to_dict(img) for img in images[:1]]
+                product_dict = products.get(item["id_product"])
+                if product_dict:
                     item_dict["product"] = product_dict
                 order_dict["items"].append(item_dict)
-            payment = payments_dao.get_payment_by_order(order["id_order"])
+            payment = payments.get(order["id_order"])
             if payment:
                 order_dict["payment"] = payment_to_dict(payment)
             result.append(order_dict)
@@ -97,14 +118,12 @@ def get_order(order_id, client_id=None):
 
         order_dict = order_to_dict(order)
         items = orders_dao.list_order_items(order_id)
+        products = hydrate_product_ids([item["id_product"] for item in items])
         order_dict["items"] = []
         for item in items:
             item_dict = order_item_to_dict(item)
-            product = products_dao.get_product(item["id_product"])
-            if product:
-                product_dict = product_to_dict(product)
-                images = images_dao.list_images_by_product(product["id_product"])
-                product_dict["images"] = [product_image_to_dict(img) for img in images]
+            product_dict = products.get(item["id_product"])
+            if product_dict:
                 item_dict["product"] = product_dict
             order_dict["items"].append(item_dict)
         payment = payments_dao.get_payment_by_order(order_id)
@@ -0,0 +1,197 @@
+"""Keyset (cursor) pagination for product lists.
+
+OFFSET pagination makes MySQL read and discard every skipped row, so page N
+costs N pages. With a cursor, the next page starts *after* the last row
+returned: the cursor is an opaque token holding that row's sort key and
+``id_product`` (the tiebreaker), which become a range condition the sort
+index can seek to directly.
+
+Each sort orders by ``(column, id_product)`` in the same direction, so rows
+with equal sort values keep a stable order across pages. Other lists (admin
+orders, reviews) pass their own :class:`Keyset` of sorts and tiebreaker
+column.
+
+MySQL puts NULLs first in ascending and last in descending order;
+:func:`keyset_condition` follows that.
+"""
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal
+
+# sort name -> (column, direction); id_product is the tiebreaker.
+SORTS = {
+    "newest": ("createdAtt", "DESC"),
+    "oldest": ("createdAtt", "ASC"),
+    "price_asc": ("price", "ASC"),
+    "price_desc": ("price", "DESC"),
+    "name_asc": ("product_name", "ASC"),
+    "name_desc": ("product_name", "DESC"),
+    "rating_desc": ("rating", "DESC"),
+    "rating_asc": ("rating", "ASC"),
+}
+DEFAULT_SORT = "newest"
+
+# Sorts of a list and the unique column that breaks ties between equal keys.
+Keyset = namedtuple("Keyset", ["sorts", "default", "id_column"])
+
+PRODUCTS = Keyset(SORTS, DEFAULT_SORT, "id_product")
+ORDERS = Keyset(
+    {"newest": ("order_createdAt", "DESC"), "oldest": ("order_createdAt", "ASC")},
+    "newest",
+    "id_order",
+)
+REVIEWS = Keyset(
+    {"newest": ("review_createdAt", "DESC"), "oldest": ("review_createdAt", "ASC")},
+    "newest",
+    "id_review",
+)
+
+# Whole-table streams (controllers/streaming.py): one sort on the unique key.
+PRODUCT_IDS = Keyset({"id": ("id_product", "ASC")}, "id", "id_product")
+USERS = Keyset({"newest": ("id_user", "DESC")}, "newest", "id_user")
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidPagination(ValueError):
+    """Pagination parameters a list cannot be served with (answered 400)."""
+
+
+class InvalidCursor(InvalidPagination):
+    """The cursor token is malformed or belongs to another sort."""
+
+
+def order_by(sort, keyset=PRODUCTS):
+    """ORDER BY clause of a sort, with the tiebreaker (id_product)."""
+    column, direction = keyset.sorts.get(sort) or keyset.sorts[keyset.default]
+    if column == keyset.id_column:
+        return f"{column} {direction}"
+    return f"{column} {direction}, {keyset.id_column} {direction}"
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"t": "dt", "v": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"t": "dec", "v": str(value)}
+    return {"v": value}
+
+
+def _decode_value(data):
+    kind, value = data.get("t"), data.get("v")
+    if value is None:
+        return None
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "dec":
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(sort, row=None, offset=None, keyset=PRODUCTS):
+    """Opaque token for the page following ``row`` (or following ``offset``
+    rows, for orders that have no sort key such as relevance)."""
+    if row is not None:
+        column, _ = keyset.sorts[sort]
+        payload = {"s": sort, "k": _encode_value(row.get(column)), "id": row[keyset.id_column]}
+    else:
+        payload = {"s": sort, "o": offset}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, sort, by_offset=False):
+    """Decode a cursor; raise :class:`InvalidCursor` if it does not fit
+    ``sort``, or is not an offset cursor when ``by_offset`` (a key cursor
+    otherwise)."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as error:
+        raise InvalidCursor("Invalid cursor") from error
+    if not isinstance(payload, dict) or payload.get("s") != sort:
+        raise InvalidCursor("Cursor does not match the requested sort")
+    if by_offset:
+        offset = payload.get("o")
+        if type(offset) is not int or offset < 0:
+            raise InvalidCursor("Invalid cursor")
+        return {"offset": offset}
+    try:
+        value = _decode_value(payload["k"])
+        last_id = int(payload["id"])
+    except (KeyError, AttributeError, TypeError, ValueError) as error:
+        raise InvalidCursor("Invalid cursor") from error
+    return {"value": value, "id": last_id}
+
+
+def keyset_condition(sort, value, last_id, keyset=PRODUCTS):
+    """``(condition, params)`` selecting the rows after ``(value, last_id)``."""
+    column, direction = keyset.sorts[sort]
+    id_column = keyset.id_column
+    after = ">" if direction == "ASC" else "<"
+    if column == id_column:
+        return f"{id_column} {after} %s", [last_id]
+    if value is None:
+        if direction == "ASC":
+            # NULLs come first: the rest of the NULLs, then every non-NULL.
+            return f"(({column} IS NULL AND {id_column} > %s) OR {column} IS NOT NULL)", [last_id]
+        # NULLs come last: only the rest of the NULLs.
+        return f"({column} IS NULL AND {id_column} < %s)", [last_id]
+    condition = f"{column} {after} %s OR ({column} = %s AND {id_column} {after} %s)"
+    if direction == "DESC":
+        condition += f" OR {column} IS NULL"
+    return f"({condition})", [value, value, last_id]
+
+
+def int_param(query_params, names, default):
+    """Integer value of the first of ``names`` given in ``query_params``;
+    raise :class:`InvalidPagination` if it is not a number."""
+    for name in names:
+        value = query_params.get(name)
+        if value:
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                raise InvalidPagination(f"Invalid {name}: {value}") from None
+    return default
+
+
+def page_size(query_params, default=24):
+    size = int_param(query_params, ("perPage", "limit"), default)
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def requested_sort(query_params):
+    """Sort name asked for with ``sortBy`` or ``sort`` (every list accepts
+    both), or None."""
+    sort = query_params.get("sortBy") or query_params.get("sort")
+    return sort if isinstance(sort, str) else None
+
+
+def sort_name(query_params, keyset=PRODUCTS):
+    """Requested sort of ``keyset``, or its default."""
+    sort = requested_sort(query_params)
+    return sort if sort in keyset.sorts else keyset.default
+
+
+def keyset_page(fetch, conditions, params, query_params, keyset):
+    """One page after ``query_params["cursor"]``: ``(rows, page_info)``.
+
+    ``fetch(conditions, params, order_by, limit)`` runs the query; one row
+    more than the page size is fetched to know whether a next page exists.
+    """
+    sort = sort_name(query_params, keyset)
+    per_page = page_size(query_params)
+    conditions, params = list(conditions), list(params)
+    token = query_params.get("cursor")
+    if token:
+        position = decode_cursor(token, sort)
+        condition, values = keyset_condition(sort, position["value"], position["id"], keyset)
+        conditions.append(condition)
+        params.extend(values)
+    rows = fetch(conditions, params, order_by(sort, keyset), per_page + 1)
+    page = rows[:per_page]
+    next_cursor = encode_cursor(sort, row=page[-1], keyset=keyset) if len(rows) > per_page else None
+    return page, {"per_page": per_page, "next_cursor": next_cursor, "has_next": next_cursor is not None}
@@ -3,51 +3,81 @@ import os
 from backend.database.dao import products as products_dao
 from backend.database.dao import product_images as images_dao
 from backend.database.dao import categories as categories_dao
-from backend.database.dao import subcategories as subcategories_dao
 from backend.database.dao import users as users_dao
 from backend.database.dao import seller_profiles as seller_profiles_dao
 from backend.controllers.serializers import (
     product_to_dict,
     product_image_to_dict,
-    category_to_dict,
-    subcategory_to_dict,
     user_to_dict,
     seller_profile_to_dict,
 )
+from backend.controllers.hydration import hydrate_products
+from backend.controllers import pagination, product_counts, streaming
+from backend import search
+from backend.search import facets
 
 
 def _build_product_details(product):
-    product_dict = product_to_dict(product)
-    images = images_dao.list_images_by_product(product["id_product"])
-    product_dict["images"] = [product_image_to_dict(img) for img in images]
+    return hydrate_products([product], category=True, subcategory=True, seller=True)[0]
 
-    if product.get("id_category"):
-        category = categories_dao.get_category(product["id_category"])
-        if category:
-            product_dict["category"] = category_to_dict(category)
 
-    if product.get("id_SubCategory"):
-        subcategory = subcategories_dao.get_subcategory(product["id_SubCategory"])
-        if subcategory:
-            product_dict["subcategory"] = subcategory_to_dict(subcategory)
+def _fetch_cursor_page(conditions, params, query_params, sort, order_by, order_params=None, by_offset=False):
+    """One page of products after ``query_params["cursor"]``.
+
+    Fetches one row more than the page size to know whether a next page
+    exists. ``by_offset`` is for orders without a usable sort key (relevance):
+    the cursor then carries an offset instead of the last key.
+    """
+    per_page = pagination.page_size(query_params)
+    cursor_sort = "relevance" if by_offset else sort
+    page_conditions, page_params, offset = list(conditions), list(params), None
+    token = query_params.get("cursor")
+    if token:
+        position = pagination.decode_cursor(token, cursor_sort, by_offset=by_offset)
+        if by_offset:
+            offset = position["offset"]
+        else:
+            condition, values = pagination.keyset_condition(sort, position["value"], position["id"])
+            page_conditions.append(condition)
+            page_params.extend(values)
+    rows = products_dao.search_products(
+        page_conditions, page_params, order_by=order_by, limit=per_page + 1, offset=offset,
+        order_params=order_params,
+    )
+    products = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        if by_offset:
+            next_cursor = pagination.encode_cursor(cursor_sort, offset=(offset or 0) + per_page)
+        else:
+            next_cursor = pagination.encode_cursor(sort, row=products[-1])
+    page_info = {"per_page": per_page, "next_cursor": next_cursor, "has_next": next_cursor is not None}
+    return products, page_info
 
-    seller = users_dao.get_user_by_id(product["id_seller"])
-    if seller:
-        seller_dict = user_to_dict(seller)
-        profile = seller_profiles_dao.get_profile_by_user_id(product["id_seller"])
-        if profile:
-            seller_dict["seller_profile"] = seller_profile_to_dict(profile)
-        product_dict["seller"] = seller_dict
 
-    return product_dict
+def _list_by_cursor(conditions, params, query_params, **hydrate_options):
+    """Cursor-paginated listing response (``?cursor=&sort=&limit=``)."""
+    sort = pagination.sort_name(query_params)
+    products, page_info = _fetch_cursor_page(
+        conditions, params, query_params, sort, pagination.order_by(sort),
+    )
+    return {"products": hydrate_products(products, **hydrate_options), "pagination": page_info}
 
 
-def get_all_products():
-    """Get all products."""
+def get_all_products(query_params=None):
+    """Get all products, streamed (one cursor page when ``cursor`` is given)."""
     try:
-        products = products_dao.list_products()
-        result = [_build_product_details(product) for product in products]
-        return jsonify(result), 200
+        if query_params and "cursor" in query_params:
+            return jsonify(_list_by_cursor(
+                [], [], query_params, category=True, subcategory=True, seller=True,
+            )), 200
+        # Tout le catalogue : envoyé par lots au fil de la lecture
+        return streaming.stream_json(
+            streaming.keyset_batches(products_dao.search_products, pagination.PRODUCT_IDS),
+            lambda products: hydrate_products(products, category=True, subcategory=True, seller=True),
+        ), 200
+    except pagination.InvalidPagination as error:
+        return jsonify({"message": str(error)}), 400
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
@@ -63,21 +93,18 @@ def get_product_by_id(product_id):
         return jsonify({"message": str(error)}), 500
 
 
-def get_all_products_by_seller(seller_id):
-    """Get all products for a seller."""
+def get_all_products_by_seller(seller_id, query_params=None):
+    """Get all products for a seller (one cursor page when ``cursor`` is given)."""
     try:
+        if query_params and "cursor" in query_params:
+            return jsonify(_list_by_cursor(
+                ["id_seller = %s"], [seller_id], query_params, category=True,
+            )), 200
         products = products_dao.list_products_by_seller(seller_id)
-        result = []
-        for product in products:
-            product_dict = product_to_dict(product)
-            images = images_dao.list_images_by_product(product["id_product"])
-            product_dict["images"] = [product_image_to_dict(img) for img in images]
-            if product.get("id_category"):
-                category = categories_dao.get_category(product["id_category"])
-                if category:
-                    product_dict["category"] = category_to_dict(category)
-            result.append(product_dict)
+        result = hydrate_products(products, category=True)
         return jsonify(result), 200
+    except pagination.InvalidPagination as error:
+        return jsonify({"message": str(error)}), 400
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
@@ -100,6 +127,7 @@ def add_product(data, seller_id):
                 images_dao.create_image(product_id, image_url)
 
         product = products_dao.get_product(product_id)
+        search.product_saved(product)
         product_dict = product_to_dict(product)
         product_dict["images"] = [
             product_image_to_dict(img)
@@ -135,6 +163,7 @@ def delete_product(product_id, seller_id=None):
 
         images_dao.delete_images_by_product(product_id)
         products_dao.delete_product(product_id)
+        search.product_deleted(product_id)
         return jsonify({"message": "Product deleted successfully"}), 200
     except Exception as error:
         return jsonify({"message": str(error)}), 400
@@ -157,7 +186,6 @@ def update_product(product_id, data, seller_id=None):
             "product_description",
             "price",
             "stock",
-            "rating",
             "id_category",
             "id_SubCategory",
         ]:
@@ -186,6 +214,7 @@ def update_product(product_id, data, seller_id=None):
                     images_dao.create_image(product_id, image_url)
 
         product = products_dao.get_product(product_id)
+        search.product_saved(product)
         product_dict = product_to_dict(product)
         product_dict["images"] = [
             product_image_to_dict(img)
@@ -202,17 +231,25 @@ def search_products(query_params):
     Tous les filtres sont appliqués côté backend via requêtes SQL pures MySQL.
     Pas de filtrage frontend - tout se fait dans la base de données.
     """
+    try:
+        requested_facets = facets.parse_facets(query_params.get("facets"))
+    except ValueError as error:
+        return jsonify({"message": str(error)}), 400
     try:
         conditions = []
         params = []
+        # Mêmes filtres sous forme structurée, pour les facettes calculées
+        # sur l'index en mémoire
+        filters = {}
 
         # 1. Recherche par nom, marque ou description (recherche textuelle)
+        # via le backend configuré (LIKE, FULLTEXT MySQL ou index en mémoire)
         search_query = query_params.get("search") or query_params.get("name")
+        text_match = None
         if search_query:
-            # Recherche dans product_name, brand, et product_description
-            conditions.append("(product_name LIKE %s OR brand LIKE %s OR product_description LIKE %s)")
-            search_pattern = f"%{search_query}%"
-            params.extend([search_pattern, search_pattern, search_pattern])
+            text_match = search.get_search_backend().match(search_query)
+            conditions.append(text_match.condition)
+            params.extend(text_match.params)
 
         # 2. Filtre par marque(s) - supporte plusieurs marques
         brands = []
@@ -229,7 +266,8 @@ def search_products(query_params):
             if brands:
                 placeholders = ",".join(["%s"] * len(brands))
                 conditions.append(f"brand IN ({placeholders})")
-                params.extend([f"%{b}%" for b in brands])
+                params.extend(brands)
+                filters["brands"] = brands
 
         # 3. Filtre par catégorie(s) - supporte plusieurs catégories
         category_ids = []
@@ -255,6 +293,7 @@ def search_products(query_params):
             placeholders = ",".join(["%s"] * len(category_ids))
             conditions.append(f"id_category IN ({placeholders})")
             params.extend(category_ids)
+            filters["category_ids"] = category_ids
 
         # 4. Filtre par sous-catégorie(s)
         subcategory_ids = []
@@ -272,6 +311,7 @@ def search_products(query_params):
             placeholders = ",".join(["%s"] * len(subcategory_ids))
             conditions.append(f"id_SubCategory IN ({placeholders})")
             params.extend(subcategory_ids)
+            filters["subcategory_ids"] = subcategory_ids
 
         # 5. Filtre par prix (min et max)
         min_price = query_params.get("minPrice") or query_params.get("min_price")
@@ -285,14 +325,20 @@ def search_products(query_params):
         elif max_price:
             conditions.append("price <= %s")
             params.append(float(max_price))
+        if min_price:
+            filters["min_price"] = float(min_price)
+        if max_price:
+            filters["max_price"] = float(max_price)
 
         # 6. Filtre par disponibilité (stock)
         stock = query_params.get("stock") or query_params.get("available")
         if stock:
             if stock.lower() == "available" or stock.lower() == "true":
                 conditions.append("stock > 0")
+                filters["stock"] = "available"
             elif stock.lower() == "out" or stock.lower() == "false" or stock.lower() == "unavailable":
                 conditions.append("stock = 0")
+                filters["stock"] = "out"
 
         # 7. Filtre par vendeur (seller_id)
         seller_id = query_params.get("seller_id") or query_params.get("sellerId")
@@ -301,6 +347,7 @@ def search_products(query_params):
                 seller_id_int = int(seller_id)
                 conditions.append("id_seller = %s")
                 params.append(seller_id_int)
+                filters["seller_id"] = seller_id_int
             except (ValueError, TypeError):
                 pass  # Ignore invalid seller_id
 
@@ -309,65 +356,59 @@ def search_products(query_params):
         if min_rating:
             conditions.append("rating >= %s")
             params.append(float(min_rating))
-
-        # 8. Tri (ORDER BY) - supporte plusieurs options
-        sort_by = query_params.get("sortBy") or query_params.get("sort")
-        order_by = None
-        if sort_by:
-            sort_mapping = {
-                "price_asc": "price ASC",
-                "price_desc": "price DESC",
-                "name_asc": "product_name ASC",
-                "name_desc": "product_name DESC",
-                "rating_desc": "rating DESC",
-                "rating_asc": "rating ASC",
-                "newest": "createdAtt DESC",
-                "oldest": "createdAtt ASC"
-            }
-            order_by = sort_mapping.get(sort_by, "createdAtt DESC")
+            filters["min_rating"] = float(min_rating)
+
+        # 8. Tri (ORDER BY) - supporte plusieurs options, toujours départagé
+        # par id_product pour un ordre stable entre les pages
+        sort_by = pagination.requested_sort(query_params)
+        sort_key = pagination.sort_name(query_params)
+        order_by = pagination.order_by(sort_key)
+        order_params = None
+        by_relevance = False
+        if sort_by == "relevance" and text_match and text_match.relevance:
+            # Pertinence fournie par le backend de recherche, puis les plus récents
+            order_by = f"{text_match.relevance}, {order_by}"
+            order_params = text_match.relevance_params
+            by_relevance = True
+
+        # Total approximatif (approx_count=true) : statistiques MySQL ou index
+        # en mémoire au lieu d'un COUNT(*)
+        approximate = str(query_params.get("approx_count", "")).lower() == "true"
+
+        # 9. Pagination : par curseur (keyset) si `cursor` est fourni (vide pour
+        # la première page), sinon par numéro de page (LIMIT/OFFSET)
+        if "cursor" in query_params:
+            products, page_info = _fetch_cursor_page(
+                conditions, params, query_params, sort_key, order_by,
+                order_params=order_params, by_offset=by_relevance,
+            )
+            # Total seulement sur demande (total=exact ou total=estimate)
+            total_mode = query_params.get("total")
+            if total_mode in ("exact", "estimate"):
+                approximate = approximate or total_mode == "estimate"
+                page_info["total"] = product_counts.total_count(
+                    conditions, params, approximate=approximate,
+                    search_query=search_query, filters=filters,
+                )
+                page_info["total_is_estimate"] = approximate
         else:
-            order_by = "createdAtt DESC"
-
-        # 9. Pagination
-        page = int(query_params.get("page", 1))
-        per_page = int(query_params.get("perPage") or query_params.get("limit", 24))
-        offset = (page - 1) * per_page
-
-        # Compter le total pour la pagination
-        total = products_dao.count_products(conditions, params)
-
-        # Récupérer les produits avec pagination
-        products = products_dao.search_products(conditions, params, order_by=order_by, limit=per_page, offset=offset)
-        
-        # Construire la réponse avec les informations complètes
-        result = []
-        for product in products:
-            product_dict = product_to_dict(product)
-            
-            # Ajouter les images
-            images = images_dao.list_images_by_product(product["id_product"])
-            product_dict["images"] = [product_image_to_dict(img) for img in images]
-            
-            # Ajouter la catégorie si disponible
-            if product.get("id_category"):
-                category = categories_dao.get_category(product["id_category"])
-                if category:
-                    product_dict["category"] = category_to_dict(category)
-            
-            # Ajouter la sous-catégorie si disponible
-            if product.get("id_SubCategory"):
-                subcategory = subcategories_dao.get_subcategory(product["id_SubCategory"])
-                if subcategory:
-                    product_dict["subcategory"] = subcategory_to_dict(subcategory)
-            
-            result.append(product_dict)
-
-        # Retourner avec métadonnées de pagination
-        total_pages = (total + per_page - 1) // per_page if total > 0 else 0
-        
-        return jsonify({
-            "products": result,
-            "pagination": {
+            page = max(1, pagination.int_param(query_params, ("page",), 1))
+            per_page = max(1, pagination.int_param(query_params, ("perPage", "limit"), 24))
+            offset = (page - 1) * per_page
+
+            # Compter le total pour la pagination (mis en cache par filtres)
+            total = product_counts.total_count(
+                conditions, params, approximate=approximate,
+                search_query=search_query, filters=filters,
+            )
+
+            # Récupérer les produits avec pagination
+            products = products_dao.search_products(
+                conditions, params, order_by=order_by, limit=per_page, offset=offset,
+                order_params=order_params,
+            )
+            total_pages = (total + per_page - 1) // per_page if total > 0 else 0
+            page_info = {
                 "total": total,
                 "page": page,
                 "per_page": per_page,
@@ -375,7 +416,29 @@ def search_products(query_params):
                 "has_next": page < total_pages,
                 "has_prev": page > 1
             }
-        }), 200
+            if approximate:
+                page_info["total_is_estimate"] = True
+
+        # Facettes demandées (facets=category,brand,...) : une seule requête
+        # groupée, ou un seul passage sur l'index en mémoire
+        facet_counts = None
+        if requested_facets:
+            facet_counts = facets.facet_counts(
+                requested_facets, conditions, params,
+                search_query=search_query, filters=filters,
+            )
+
+        # Construire la réponse avec les informations complètes
+        # (images, catégorie, sous-catégorie chargées en une requête par entité)
+        result = hydrate_products(products, category=True, subcategory=True)
+
+        # Retourner avec métadonnées de pagination
+        response = {"products": result, "pagination": page_info}
+        if facet_counts is not None:
+            response["facets"] = facet_counts
+        return jsonify(response), 200
+    except pagination.InvalidPagination as error:
+        return jsonify({"message": str(error)}), 400
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
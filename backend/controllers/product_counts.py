@@ -0,0 +1,53 @@
+"""Total counts for product search pagination.
+
+Exact counts (``COUNT(*)``) are cached per normalized filter set: the same
+conditions in another order, with the same parameters, share one entry.
+Product writes clear the cache (see ``products_dao.invalidate_product_caches``).
+
+Approximate counts skip the ``COUNT(*)``: the in-memory search index counts
+its own matches when ``SEARCH_BACKEND=memory``; otherwise MySQL's row
+estimate is used (table statistics without filters, EXPLAIN with filters).
+"""
+import hashlib
+from backend import cache, search
+from backend.config import Config
+from backend.database.dao import products as products_dao
+
+
+def _count_cache():
+    config = Config()
+    return cache.get_cache("product_counts", maxsize=config.COUNT_CACHE_SIZE, ttl=config.COUNT_CACHE_TTL)
+
+
+def normalize_filters(conditions, params):
+    """Cache key of a filter set, independent of the order of its conditions."""
+    pairs = []
+    position = 0
+    for condition in conditions:
+        size = condition.count("%s")
+        pairs.append((condition, tuple(params[position:position + size])))
+        position += size
+    pairs.sort(key=repr)
+    return hashlib.sha1(repr(pairs).encode("utf-8")).hexdigest()
+
+
+def exact_count(conditions, params):
+    key = "exact:" + normalize_filters(conditions, params)
+    return _count_cache().get_or_load(key, lambda: products_dao.count_products(conditions, params))
+
+
+def approximate_count(conditions, params, search_query=None, filters=None):
+    counter = getattr(search.get_search_backend(), "count", None)
+    if counter is not None and filters is not None:
+        return counter(search_query, filters)
+    key = "approx:" + normalize_filters(conditions, params)
+    if not conditions:
+        return _count_cache().get_or_load(key, products_dao.estimate_product_table_rows)
+    return _count_cache().get_or_load(key, lambda: products_dao.estimate_products(conditions, params))
+
+
+def total_count(conditions, params, approximate=False, search_query=None, filters=None):
+    """Exact (cached) or approximate number of products matching the filters."""
+    if approximate:
+        return approximate_count(conditions, params, search_query=search_query, filters=filters)
+    return exact_count(conditions, params)
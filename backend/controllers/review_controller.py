@@ -3,6 +3,7 @@ from backend.database.dao import reviews as reviews_dao
 from backend.database.dao import products as products_dao
 from backend.database.dao import orders as orders_dao
 from backend.database.dao import users as users_dao
+from backend.controllers import pagination
 from backend.controllers.serializers import review_to_dict, user_to_dict, product_to_dict
 
 
@@ -26,12 +27,9 @@ def create_review(client_id, product_id, data):
         if not rating or rating < 1 or rating > 5:
             return jsonify({"message": "Rating must be between 1 and 5"}), 400
 
+        # La note du produit est mise à jour dans la même transaction
         review_id = reviews_dao.create_review(rating, comment, product_id, client_id)
 
-        avg_rating = reviews_dao.average_rating_for_product(product_id)
-        if avg_rating is not None:
-            products_dao.update_product_rating(product_id, avg_rating)
-
         review = reviews_dao.get_review(review_id)
         review_dict = review_to_dict(review)
         client = users_dao.get_user_by_id(client_id)
@@ -42,18 +40,56 @@ def create_review(client_id, product_id, data):
         return jsonify({"message": str(error)}), 500
 
 
-def get_product_reviews(product_id):
-    """Get all reviews for a product."""
+def _hydrate_reviews(reviews):
+    """Review dicts with their `client`, fetched in one batch."""
+    clients = {
+        user["id_user"]: user
+        for user in users_dao.list_users_by_ids({review["id_client"] for review in reviews})
+    }
+    result = []
+    for review in reviews:
+        review_dict = review_to_dict(review)
+        client = clients.get(review["id_client"])
+        if client:
+            review_dict["client"] = user_to_dict(client)
+        result.append(review_dict)
+    return result
+
+
+def _rating_summary(product_id):
+    """Review count, average and 1-5 star histogram of a product."""
+    histogram = reviews_dao.get_rating_histogram(product_id)
+    if histogram is None:
+        # Table product_rating_histogram absente (migration 0008)
+        histogram = reviews_dao.count_reviews_by_rating(product_id)
+    count = sum(histogram.values())
+    total = sum(stars * reviews for stars, reviews in histogram.items())
+    return {
+        "count": count,
+        "average": round(total / count, 2) if count else 0,
+        "histogram": {str(stars): reviews for stars, reviews in histogram.items()},
+    }
+
+
+def get_product_reviews(product_id, query_params=None):
+    """Get the reviews of a product (one page by review date, with the
+    rating summary, when ``cursor`` is given)."""
     try:
+        query_params = query_params or {}
+        if "cursor" in query_params:
+            reviews, page_info = pagination.keyset_page(
+                reviews_dao.search_reviews, ["id_product = %s"], [product_id],
+                query_params, pagination.REVIEWS,
+            )
+            return jsonify({
+                "reviews": _hydrate_reviews(reviews),
+                "rating": _rating_summary(product_id),
+                "pagination": page_info,
+            }), 200
         reviews = reviews_dao.list_reviews_by_product(product_id)
-        result = []
-        for review in reviews:
-            review_dict = review_to_dict(review)
-            client = users_dao.get_user_by_id(review["id_client"])
-            if client:
-                review_dict["client"] = user_to_dict(client)
-            result.append(review_dict)
-        return jsonify(result), 200
+        return jsonify(_hydrate_reviews(reviews)), 200
+    except pagination.InvalidPagination as error:
+        return jsonify({"message": str(error)}), 400
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
@@ -80,10 +116,6 @@ def update_review(review_id, client_id, data):
         if update_fields:
             reviews_dao.update_review(review_id, update_fields)
 
-        avg_rating = reviews_dao.average_rating_for_product(review["id_product"])
-        if avg_rating is not None:
-            products_dao.update_product_rating(review["id_product"], avg_rating)
-
         updated_review = reviews_dao.get_review(review_id)
         review_dict = review_to_dict(updated_review)
         client = users_dao.get_user_by_id(client_id)
@@ -104,15 +136,8 @@ def delete_review(review_id, client_id):
         if review["id_client"] != client_id:
             return jsonify({"message": "Unauthorized"}), 403
 
-        product_id = review["id_product"]
         reviews_dao.delete_review(review_id)
 
-        avg_rating = reviews_dao.average_rating_for_product(product_id)
-        if avg_rating is None:
-            products_dao.update_product_rating(product_id, 0.0)
-        else:
-            products_dao.update_product_rating(product_id, avg_rating)
-
         return jsonify({"message": "Review deleted successfully"}), 200
     except Exception as error:
         return jsonify({"message": str(error)}), 500
@@ -4,13 +4,15 @@ from backend.database.dao import users as users_dao
 from backend.database.dao import seller_profiles as seller_profiles_dao
 from backend.database.dao import products as products_dao
 from backend.database.dao import orders as orders_dao
+from backend.database.dao import seller_stats as seller_stats_dao
 from backend.controllers.serializers import (
     user_to_dict,
     seller_profile_to_dict,
     order_to_dict,
     order_item_to_dict,
-    product_to_dict,
 )
+from backend.controllers.hydration import hydrate_products
+from backend.controllers import pagination
 
 
 def get_seller_profile(seller_id):
@@ -89,48 +91,65 @@ def update_seller_profile(seller_id, data):
         return jsonify({"message": str(error)}), 500
 
 
-def get_seller_orders(seller_id):
-    """Get orders for seller's products."""
+def _hydrate_seller_orders(seller_id, orders):
+    """Serialize orders with the seller's items (product and images) and the
+    client: one query per relation, joined in memory by ID."""
+    order_ids = [order["id_order"] for order in orders]
+    items_by_order = {}
+    products = {}
+    for item in orders_dao.list_seller_order_items(seller_id, order_ids):
+        items_by_order.setdefault(item["id_order"], []).append(item)
+        # Les lignes portent déjà les colonnes du produit (jointure)
+        products.setdefault(item["id_product"], item)
+    products = {
+        product_dict["id_product"]: product_dict
+        for product_dict in hydrate_products(products.values())
+    }
+    clients = {
+        client["id_user"]: client
+        for client in users_dao.list_users_by_ids(list({order["id_client"] for order in orders}))
+    }
+
+    result = []
+    for order in orders:
+        order_dict = order_to_dict(order)
+        seller_items = items_by_order.get(order["id_order"], [])
+        order_dict["items"] = []
+        for item in seller_items:
+            item_dict = order_item_to_dict(item)
+            item_dict["product"] = products[item["id_product"]]
+            order_dict["items"].append(item_dict)
+        order_dict["seller_total"] = float(sum(
+            (item["order_item_price"] or 0) * item["order_item_quantity"]
+            for item in seller_items
+        ))
+        client = clients.get(order["id_client"])
+        if client:
+            order_dict["client"] = user_to_dict(client)
+        result.append(order_dict)
+    return result
+
+
+def get_seller_orders(seller_id, query_params=None):
+    """Get orders for seller's products (one page by order date when
+    ``cursor`` is given)."""
     try:
-        products = products_dao.list_products_by_seller(seller_id)
-        product_ids = [product["id_product"] for product in products]
-        order_items = orders_dao.list_order_items_by_products(product_ids)
-        order_ids = list({item["id_order"] for item in order_items})
-        orders = orders_dao.list_orders_by_ids(order_ids)
-
-        result = []
-        for order in orders:
-            order_dict = order_to_dict(order)
-            seller_items = [item for item in order_items if item["id_order"] == order["id_order"]]
-            order_dict["items"] = []
-            for item in seller_items:
-                item_dict = order_item_to_dict(item)
-                product = next(
-                    (p for p in products if p["id_product"] == item["id_product"]),
-                    None,
-                )
-                if product:
-                    product_dict = product_to_dict(product)
-                    # Add images to product
-                    from backend.database.dao import product_images as images_dao
-                    from backend.controllers.serializers import product_image_to_dict
-                    images = images_dao.list_images_by_product(product["id_product"])
-                    product_dict["images"] = [product_image_to_dict(img) for img in images]
-                    item_dict["product"] = product_dict
-                order_dict["items"].append(item_dict)
-
-            seller_total = sum(
-                (item["order_item_price"] or 0) * item["order_item_quantity"]
-                for item in seller_items
+        query_params = query_params or {}
+        condition, params = orders_dao.seller_orders_condition(seller_id)
+        if "cursor" in query_params:
+            orders, page_info = pagination.keyset_page(
+                orders_dao.search_orders, [condition], params, query_params, pagination.ORDERS,
             )
-            order_dict["seller_total"] = float(seller_total)
-
-            client = users_dao.get_user_by_id(order["id_client"])
-            if client:
-                order_dict["client"] = user_to_dict(client)
-            result.append(order_dict)
-
-        return jsonify(result), 200
+            return jsonify({
+                "orders": _hydrate_seller_orders(seller_id, orders),
+                "pagination": page_info,
+            }), 200
+        orders = orders_dao.search_orders(
+            [condition], params, pagination.order_by(pagination.ORDERS.default, pagination.ORDERS),
+        )
+        return jsonify(_hydrate_seller_orders(seller_id, orders)), 200
+    except pagination.InvalidPagination as error:
+        return jsonify({"message": str(error)}), 400
     except Exception as error:
         return jsonify({"message": str(error)}), 500
 
@@ -140,7 +159,6 @@ def update_seller_order_status(seller_id, order_id, data):
     try:
         from flask import jsonify
         from backend.database.dao import orders as orders_dao
-        from backend.database.dao import products as products_dao
         from backend.controllers.serializers import order_to_dict
         
         # Verify order belongs to seller's products
@@ -148,13 +166,8 @@ def update_seller_order_status(seller_id, order_id, data):
         if not order:
             return jsonify({"message": "Order not found"}), 404
         
-        # Get seller's products
-        products = products_dao.list_products_by_seller(seller_id)
-        product_ids = [p["id_product"] for p in products]
-        
-        # Get order items
-        order_items = orders_dao.list_order_items(order_id)
-        seller_items = [item for item in order_items if item["id_product"] in product_ids]
+        # Seller's items of this order (join order_item -> product)
+        seller_items = orders_dao.list_seller_order_items(seller_id, [order_id])
         
         if not seller_items:
             return jsonify({"message": "Order does not contain any of your products"}), 403
@@ -178,46 +191,31 @@ def update_seller_order_status(seller_id, order_id, data):
         return jsonify({"message": str(error)}), 500
 
 
-def get_seller_stats(seller_id):
+def _load_seller_stats(seller_id, refresh=False):
+    """Counters of a seller: the materialized row when enabled (computed
+    and stored on first read), else one grouped query."""
+    if seller_stats_dao.materialized_enabled() and not refresh:
+        row = seller_stats_dao.get_seller_stats_row(seller_id)
+        if row:
+            return row
+    stats = seller_stats_dao.compute_seller_stats(seller_id)
+    if seller_stats_dao.materialized_enabled():
+        seller_stats_dao.save_seller_stats(seller_id, stats)
+    return stats
+
+
+def get_seller_stats(seller_id, refresh=False):
     """Get seller statistics."""
     try:
-        from backend.database.dao import reviews as reviews_dao
-        
-        products = products_dao.list_products_by_seller(seller_id)
-        product_ids = [product["id_product"] for product in products]
-        order_items = orders_dao.list_order_items_by_products(product_ids)
-        order_ids = list({item["id_order"] for item in order_items})
-        orders = orders_dao.list_orders_by_ids(order_ids)
-
-        total_revenue = 0
-        for item in order_items:
-            order = next((o for o in orders if o["id_order"] == item["id_order"]), None)
-            # Only count delivered orders (livré suffisant, pas besoin de vérifier payment_status)
-            if order and order["order_status"] == "delivered":
-                item_revenue = (item["order_item_price"] or 0) * item["order_item_quantity"]
-                total_revenue += item_revenue
-        
-        # Log for debugging (can be removed in production)
-        from flask import current_app
-        current_app.logger.info(f"Seller {seller_id} - Calculated total_revenue: {total_revenue} from {len(order_items)} order items")
-
-        # Calculate average rating from all seller's products
-        total_rating = 0
-        rating_count = 0
-        for product in products:
-            avg_rating = reviews_dao.average_rating_for_product(product["id_product"])
-            if avg_rating is not None:
-                total_rating += avg_rating
-                rating_count += 1
-        
-        average_rating = total_rating / rating_count if rating_count > 0 else 0
-
+        row = _load_seller_stats(seller_id, refresh=refresh)
+        average_rating = float(row["average_rating"] or 0)
         stats = {
-            "total_products": len(products),
-            "total_orders": len(orders),
-            "total_revenue": float(total_revenue),
-            "pending_orders": len([o for o in orders if o["order_status"] == "processing"]),
-            "delivered_orders": len([o for o in orders if o["order_status"] == "delivered"]),
+            "total_products": int(row["total_products"] or 0),
+            "total_orders": int(row["total_orders"] or 0),
+            # Only delivered orders count (livré suffisant, pas besoin de vérifier payment_status)
+            "total_revenue": float(row["total_revenue"] or 0),
+            "pending_orders": int(row["pending_orders"] or 0),
+            "delivered_orders": int(row["delivered_orders"] or 0),
             "average_rating": round(average_rating, 2) if average_rating > 0 else 0,
             "total_views": 0  # Placeholder for future implementation
         }
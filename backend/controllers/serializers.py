@@ -1,165 +1,202 @@
+"""Row -> dict serializers of the API entities.
+
+Each serializer is built once from a fixed field list: a dict
+comprehension over the fields that leaves values as MySQL returns them,
+except for the converted ones. ``Decimal`` amounts are always converted
+to floats, as the API has always sent them. ``datetime`` fields (``typed``)
+are left to the app's JSON provider (``backend/json_provider.py``) when
+orjson is installed, which encodes them natively; without it they are
+converted here, which is cheaper than the standard encoder's per-value
+fallback.
+"""
 from backend.database.dao.utils import to_iso, to_float
+from backend.json_provider import orjson
+
+
+def compile_serializer(fields, converters=None, typed=None, native_types=None):
+    """Build a ``row -> dict`` function for ``fields``.
+
+    ``converters`` maps a field to a function applied to its value (for
+    values whose JSON form differs from the column type, like tinyint flags
+    or Decimal amounts). ``typed`` maps datetime fields to their converter,
+    used only when the encoder does not handle them natively
+    (``native_types``, default: orjson is installed). Missing columns give
+    None.
+    """
+    fields = tuple(fields)
+    converters = dict(converters or {})
+    if native_types is None:
+        native_types = orjson is not None
+    if not native_types:
+        converters.update(typed or {})
+
+    converted = tuple((field, converters[field]) for field in fields if field in converters)
+
+    def serialize(row):
+        if not row:
+            return None
+        get = row.get
+        result = {field: get(field) for field in fields}
+        for field, convert in converted:
+            result[field] = convert(result[field])
+        return result
+
+    serialize.fields = fields
+    return serialize
+
+
+USER_FIELDS = (
+    "id_user",
+    "full_name",
+    "email",
+    "rolee",
+    "phone",
+    "adress",
+    "createdAT",
+)
+
+user_to_dict = compile_serializer(USER_FIELDS, typed={"createdAT": to_iso})
+
+
+CATEGORY_FIELDS = (
+    "id_category",
+    "category_name",
+    "category_description",
+    "image",
+)
+
+category_to_dict = compile_serializer(CATEGORY_FIELDS)
+
+
+SUBCATEGORY_FIELDS = (
+    "id_SubCategory",
+    "SubCategory_name",
+    "id_category",
+    "SubCategory_description",
+)
+
+subcategory_to_dict = compile_serializer(SUBCATEGORY_FIELDS)
+
+
+PRODUCT_FIELDS = (
+    "id_product",
+    "product_name",
+    "brand",
+    "product_description",
+    "price",
+    "stock",
+    "rating",
+    "id_seller",
+    "id_category",
+    "id_SubCategory",
+    "createdAtt",
+    "updatedAt",
+)
+
+PRODUCT_CONVERTERS = {"price": to_float}
+PRODUCT_TYPED = {"createdAtt": to_iso, "updatedAt": to_iso}
+product_to_dict = compile_serializer(PRODUCT_FIELDS, converters=PRODUCT_CONVERTERS, typed=PRODUCT_TYPED)
+
+
+PRODUCT_IMAGE_FIELDS = (
+    "id_product_image",
+    "imageURL",
+    "id_product",
+)
+
+product_image_to_dict = compile_serializer(PRODUCT_IMAGE_FIELDS)
+
+
+REVIEW_FIELDS = (
+    "id_review",
+    "rating_review",
+    "commentt",
+    "id_product",
+    "id_client",
+    "review_createdAt",
+)
+
+review_to_dict = compile_serializer(REVIEW_FIELDS, typed={"review_createdAt": to_iso})
+
+
+CART_FIELDS = (
+    "id_cart",
+    "id_client",
+    "cart_createdAt",
+)
+
+cart_to_dict = compile_serializer(CART_FIELDS, typed={"cart_createdAt": to_iso})
+
+
+CART_ITEM_FIELDS = (
+    "id_cart_item",
+    "id_cart",
+    "id_product",
+    "quantity",
+)
+
+cart_item_to_dict = compile_serializer(CART_ITEM_FIELDS)
 
 
-def user_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_user": row.get("id_user"),
-        "full_name": row.get("full_name"),
-        "email": row.get("email"),
-        "rolee": row.get("rolee"),
-        "phone": row.get("phone"),
-        "adress": row.get("adress"),
-        "createdAT": to_iso(row.get("createdAT")),
-    }
-
-
-def category_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_category": row.get("id_category"),
-        "category_name": row.get("category_name"),
-        "category_description": row.get("category_description"),
-        "image": row.get("image"),
-    }
-
-
-def subcategory_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_SubCategory": row.get("id_SubCategory"),
-        "SubCategory_name": row.get("SubCategory_name"),
-        "id_category": row.get("id_category"),
-        "SubCategory_description": row.get("SubCategory_description"),
-    }
-
-
-def product_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_product": row.get("id_product"),
-        "product_name": row.get("product_name"),
-        "brand": row.get("brand"),
-        "product_description": row.get("product_description"),
-        "price": to_float(row.get("price")),
-        "stock": row.get("stock"),
-        "rating": row.get("rating"),
-        "id_seller": row.get("id_seller"),
-        "id_category": row.get("id_category"),
-        "id_SubCategory": row.get("id_SubCategory"),
-        "createdAtt": to_iso(row.get("createdAtt")),
-        "updatedAt": to_iso(row.get("updatedAt")),
-    }
-
-
-def product_image_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_product_image": row.get("id_product_image"),
-        "imageURL": row.get("imageURL"),
-        "id_product": row.get("id_product"),
-    }
-
-
-def review_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_review": row.get("id_review"),
-        "rating_review": row.get("rating_review"),
-        "commentt": row.get("commentt"),
-        "id_product": row.get("id_product"),
-        "id_client": row.get("id_client"),
-        "review_createdAt": to_iso(row.get("review_createdAt")),
-    }
-
-
-def cart_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_cart": row.get("id_cart"),
-        "id_client": row.get("id_client"),
-        "cart_createdAt": to_iso(row.get("cart_createdAt")),
-    }
-
-
-def cart_item_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_cart_item": row.get("id_cart_item"),
-        "id_cart": row.get("id_cart"),
-        "id_product": row.get("id_product"),
-        "quantity": row.get("quantity"),
-    }
-
-
-def order_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_order": row.get("id_order"),
-        "id_client": row.get("id_client"),
-        "total_amount": to_float(row.get("total_amount")),
-        "payment_status": row.get("payment_status"),
-        "order_status": row.get("order_status"),
-        "order_createdAt": to_iso(row.get("order_createdAt")),
-    }
-
-
-def payment_card_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_payment_card": row.get("id_payment_card"),
-        "id_client": row.get("id_client"),
-        "card_number": row.get("card_number"),
-        "card_holder_name": row.get("card_holder_name"),
-        "expiry_date": row.get("expiry_date"),
-        "cvv": row.get("cvv"),
-        "is_default": bool(row.get("is_default")),
-        "created_at": to_iso(row.get("created_at")),
-    }
-
-
-def order_item_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_order_item": row.get("id_order_item"),
-        "id_order": row.get("id_order"),
-        "id_product": row.get("id_product"),
-        "order_item_quantity": row.get("order_item_quantity"),
-        "order_item_price": to_float(row.get("order_item_price")),
-    }
-
-
-def payment_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_payment": row.get("id_payment"),
-        "id_order": row.get("id_order"),
-        "payment_amount": to_float(row.get("payment_amount")),
-        "method": row.get("method"),
-        "payment_status": row.get("payment_status"),
-        "id_transaction": row.get("id_transaction"),
-    }
-
-
-def seller_profile_to_dict(row):
-    if not row:
-        return None
-    return {
-        "id_seller_profile": row.get("id_seller_profile"),
-        "id_user": row.get("id_user"),
-        "shop_name": row.get("shop_name"),
-        "shop_description": row.get("shop_description"),
-        "verification_status": row.get("verification_status"),
-    }
+ORDER_FIELDS = (
+    "id_order",
+    "id_client",
+    "total_amount",
+    "payment_status",
+    "order_status",
+    "order_createdAt",
+)
+
+order_to_dict = compile_serializer(
+    ORDER_FIELDS, converters={"total_amount": to_float}, typed={"order_createdAt": to_iso}
+)
+
+
+PAYMENT_CARD_FIELDS = (
+    "id_payment_card",
+    "id_client",
+    "card_number",
+    "card_holder_name",
+    "expiry_date",
+    "cvv",
+    "is_default",
+    "created_at",
+)
+
+payment_card_to_dict = compile_serializer(
+    PAYMENT_CARD_FIELDS, converters={"is_default": bool}, typed={"created_at": to_iso}
+)
+
+
+ORDER_ITEM_FIELDS = (
+    "id_order_item",
+    "id_order",
+    "id_product",
+    "order_item_quantity",
+    "order_item_price",
+)
+
+order_item_to_dict = compile_serializer(ORDER_ITEM_FIELDS, converters={"order_item_price": to_float})
+
+
+PAYMENT_FIELDS = (
+    "id_payment",
+    "id_order",
+    "payment_amount",
+    "method",
+    "payment_status",
+    "id_transaction",
+)
+
+payment_to_dict = compile_serializer(PAYMENT_FIELDS, converters={"payment_amount": to_float})
+
+
+SELLER_PROFILE_FIELDS = (
+    "id_seller_profile",
+    "id_user",
+    "shop_name",
+    "shop_description",
+    "verification_status",
+)
+
+seller_profile_to_dict = compile_serializer(SELLER_PROFILE_FIELDS)
@@ -0,0 +1,136 @@
+"""Streamed JSON responses for unbounded list endpoints.
+
+The rows come in keyset batches (:func:`keyset_batches`): each batch is one
+short query on a regular cursor, then hydrated and encoded on its own and
+sent, so a worker holds one batch at a time whatever the size of the
+table. The request-scoped connection (``DB_REQUEST_SCOPED_CONNECTIONS``)
+is handed back to the pool after each batch: under ``stream_with_context``
+the request teardown only runs once the client has read the whole body, so
+no connection stays checked out while the client reads.
+
+Two formats: a JSON array (default, same body as ``jsonify(list)``) or
+NDJSON, one object per line, with ``?format=ndjson`` or
+``Accept: application/x-ndjson``. The status is sent with the first batch;
+if a later batch fails, NDJSON ends with an ``{"error": ...}`` line and the
+JSON array is left unclosed, so the client cannot take a truncated list for
+a complete one.
+"""
+from flask import current_app, request, stream_with_context
+from backend.config import Config
+from backend.controllers import pagination
+from backend.database.connection import get_db_manager
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def batch_size():
+    return Config.STREAM_BATCH_SIZE
+
+
+def keyset_batches(fetch, keyset, conditions=(), params=(), sort=None):
+    """Lists of up to :func:`batch_size` rows of
+    ``fetch(conditions, params, order_by, limit)``, in the order of
+    ``sort`` of ``keyset``; each batch starts after the last row of the
+    previous one (:func:`pagination.keyset_condition`)."""
+    sort = sort if sort in keyset.sorts else keyset.default
+    column, _ = keyset.sorts[sort]
+    order_by = pagination.order_by(sort, keyset)
+    size = batch_size()
+    last = None
+    while True:
+        batch_conditions, batch_params = list(conditions), list(params)
+        if last is not None:
+            condition, values = pagination.keyset_condition(sort, last.get(column), last[keyset.id_column], keyset)
+            batch_conditions.append(condition)
+            batch_params.extend(values)
+        rows = fetch(batch_conditions, batch_params, order_by, size)
+        if rows:
+            yield rows
+        if len(rows) < size:
+            return
+        last = rows[-1]
+
+
+def wants_ndjson():
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def _encode_array(batches, encode):
+    yield b"["
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        # Encoded batch without its brackets: "{...},{...}"
+        body = encode(batch)[1:-1]
+        yield body if first else b"," + body
+        first = False
+    yield b"]\n"
+
+
+def _encode_lines(batches, encode):
+    for batch in batches:
+        if batch:
+            yield b"".join(encode(item, pretty=False) + b"\n" for item in batch)
+
+
+def _hydrated(batches, hydrate):
+    db = get_db_manager()
+    for rows in batches:
+        items = hydrate(rows)
+        # Released before the batch is sent: the next batch checks out a
+        # connection again
+        db.close_connection()
+        yield items
+
+
+def _chunks(batches, hydrate, ndjson):
+    encode = current_app.json.dumps_bytes
+    try:
+        hydrated = _hydrated(batches, hydrate)
+        if ndjson:
+            yield from _encode_lines(hydrated, encode)
+        else:
+            yield from _encode_array(hydrated, encode)
+    finally:
+        # Client gone or error: close the batch generator now, not at
+        # garbage collection
+        close = getattr(batches, "close", None)
+        if close is not None:
+            close()
+
+
+def _prepend(first, chunks, ndjson):
+    try:
+        yield first
+        yield from chunks
+    except Exception as error:
+        # Statut 200 déjà envoyé : marqueur d'erreur en fin de flux
+        current_app.logger.exception("Streamed response cut short")
+        if ndjson:
+            yield current_app.json.dumps_bytes({"error": str(error)}, pretty=False) + b"\n"
+    finally:
+        chunks.close()
+
+
+def stream_json(batches, hydrate):
+    """Streamed response of the items of ``batches``.
+
+    ``batches`` yields lists of rows and ``hydrate`` turns one list of rows
+    into a list of dicts. The first batch is read and encoded before the
+    response is returned, so a failing query still gives a regular error
+    response; an error after that ends the stream with an error marker
+    (NDJSON) or an unclosed array.
+    """
+    ndjson = wants_ndjson()
+    chunks = _chunks(batches, hydrate, ndjson)
+    first = next(chunks, b"")
+    if not ndjson:
+        # "[" alone: also encode the first batch (or "]") up front
+        first += next(chunks, b"")
+    return current_app.response_class(
+        stream_with_context(_prepend(first, chunks, ndjson)),
+        mimetype=NDJSON_MIMETYPE if ndjson else "application/json",
+    )
@@ -1,13 +1,7 @@
 from flask import jsonify, request
 from backend.database.dao import wishlist as wishlist_dao
 from backend.database.dao import products as products_dao
-from backend.database.dao import product_images as images_dao
-from backend.controllers.serializers import (
-    product_to_dict,
-    product_image_to_dict,
-    category_to_dict
-)
-from backend.database.dao import categories as categories_dao
+from backend.controllers.hydration import hydrate_product_ids
 
 
 def get_client_wishlist(client_id):
@@ -20,24 +14,15 @@ def get_client_wishlist(client_id):
         if not wishlist_items:
             return jsonify([]), 200
         
+        products = hydrate_product_ids(
+            [item['id_product'] for item in wishlist_items], category=True
+        )
+
         result = []
         for item in wishlist_items:
-            product = products_dao.get_product(item['id_product'])
-            if not product:
+            product_dict = products.get(item['id_product'])
+            if not product_dict:
                 continue
-                
-            product_dict = product_to_dict(product)
-            
-            # Get product images
-            product_images = images_dao.list_images_by_product(item['id_product'])
-            product_dict['images'] = [product_image_to_dict(img) for img in product_images] if product_images else []
-            
-            # Get category if available
-            if product.get('id_category'):
-                category = categories_dao.get_category(product['id_category'])
-                if category:
-                    product_dict['category'] = category_to_dict(category)
-            
             product_dict['wishlist_createdAt'] = item.get('wishlist_createdAt')
             product_dict['id_wishlist'] = item.get('id_wishlist')
             result.append(product_dict)
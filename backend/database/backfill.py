@@ -0,0 +1,56 @@
+"""One-off data backfills run after migrations (``python init_db.py --backfill-ratings``)."""
+from backend.database.connection import get_db_manager
+
+
+def backfill_product_ratings(batch_size=1000, log=print):
+    """Recompute ``rating_sum``, ``rating_count`` and ``rating`` of every
+    product (migration 0007) and its star histogram (migration 0008) from
+    the review table.
+
+    Works through ranges of ``batch_size`` product IDs, one short transaction
+    each, so the product table is never locked as a whole. A range is read
+    and written under the locks of its products and reviews: a review write
+    running meanwhile is either counted by the backfill or applied on top of
+    its result. Safe to re-run.
+    Returns the number of products processed.
+    """
+    db = get_db_manager()
+    last_id, processed = 0, 0
+    while True:
+        row = db.execute_query(
+            "SELECT MAX(id_product) AS upper_id, COUNT(*) AS total FROM ("
+            "SELECT id_product FROM product WHERE id_product > %s ORDER BY id_product LIMIT %s"
+            ") batch",
+            (last_id, batch_size),
+            fetch_one=True,
+        )
+        if not row or not row["total"]:
+            break
+        upper_id = row["upper_id"]
+        bounds = (last_id, upper_id)
+        with db.get_cursor(commit=True) as cursor:
+            cursor.execute(
+                "UPDATE product p LEFT JOIN ("
+                "SELECT id_product, SUM(rating_review) AS rating_total, COUNT(*) AS reviews FROM review "
+                "WHERE id_product > %s AND id_product <= %s GROUP BY id_product"
+                ") r ON r.id_product = p.id_product "
+                "SET p.rating_sum = COALESCE(r.rating_total, 0), p.rating_count = COALESCE(r.reviews, 0), "
+                "p.rating = CASE WHEN r.reviews > 0 THEN r.rating_total / r.reviews ELSE 0 END "
+                "WHERE p.id_product > %s AND p.id_product <= %s",
+                bounds + bounds,
+            )
+            cursor.execute(
+                "DELETE FROM product_rating_histogram WHERE id_product > %s AND id_product <= %s",
+                bounds,
+            )
+            cursor.execute(
+                "INSERT INTO product_rating_histogram (id_product, stars, review_count) "
+                "SELECT id_product, rating_review, COUNT(*) FROM review "
+                "WHERE id_product > %s AND id_product <= %s AND rating_review BETWEEN 1 AND 5 "
+                "GROUP BY id_product, rating_review",
+                bounds,
+            )
+        processed += row["total"]
+        last_id = upper_id
+        log(f"products <= {upper_id}: {processed} done")
+    return processed
@@ -1,17 +1,34 @@
 """Database connection manager with connection pooling (mysql-connector)."""
+import threading
 from contextlib import contextmanager
-from mysql.connector import pooling
+from flask import g, has_app_context
+from mysql.connector import Error, pooling
 from backend.config import Config
 
+# Cursor options of each row format of streamed reads. Tuples and named
+# tuples skip building one dict per row.
+ROW_FORMATS = {
+    "dict": {"dictionary": True},
+    "tuple": {},
+    "namedtuple": {"named_tuple": True},
+}
+
 
 class DatabaseManager:
-    """Manages database connections with connection pooling."""
+    """Manages database connections with connection pooling.
+
+    When ``DB_REQUEST_SCOPED_CONNECTIONS`` is enabled, the first query made
+    inside an application context binds a pooled connection to ``flask.g``
+    and later queries of the same request reuse it. ``close_connection``
+    (called from ``teardown_appcontext``) hands it back to the pool.
+    """
 
     def __init__(self):
         config = Config()
+        self.request_scoped = config.DB_REQUEST_SCOPED_CONNECTIONS
         self._pool = pooling.MySQLConnectionPool(
             pool_name="bdia_pool",
-            pool_size=5,
+            pool_size=config.MYSQL_POOL_SIZE,
             pool_reset_session=True,
             host=config.MYSQL_HOST,
             user=config.MYSQL_USER,
@@ -20,15 +37,39 @@ class DatabaseManager:
             charset="utf8mb4",
             collation="utf8mb4_unicode_ci",
         )
+        self._stats_lock = threading.Lock()
+        self._stats = {"cursors": 0, "checkouts": 0, "reuses": 0, "discards": 0}
 
     def get_connection(self):
         """Get a database connection from the pool."""
-        return self._pool.get_connection()
+        connection = self._pool.get_connection()
+        self._count("checkouts")
+        return connection
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+        if has_app_context():
+            request_stats = g.setdefault("_db_stats", {"cursors": 0, "checkouts": 0, "reuses": 0})
+            request_stats[name] += 1
+
+    def _acquire(self):
+        """Return ``(connection, owned)``; owned connections go back to the pool after use."""
+        self._count("cursors")
+        if not (self.request_scoped and has_app_context()):
+            return self.get_connection(), True
+        connection = g.get("_db_connection")
+        if connection is None:
+            connection = self.get_connection()
+            g._db_connection = connection
+        else:
+            self._count("reuses")
+        return connection, False
 
     @contextmanager
     def get_cursor(self, commit=False):
         """Context manager for database cursor with automatic cleanup."""
-        connection = self.get_connection()
+        connection, owned = self._acquire()
         cursor = connection.cursor(dictionary=True)
         try:
             yield cursor
@@ -39,8 +80,77 @@ class DatabaseManager:
             raise
         finally:
             cursor.close()
+            if owned:
+                connection.close()
+
+    @contextmanager
+    def get_streaming_cursor(self, row_format="dict"):
+        """Context manager for an unbuffered (server-side) read cursor.
+
+        Rows stay on the server until fetched, so ``fetchmany`` keeps memory
+        bounded whatever the size of the result. ``row_format`` is ``dict``,
+        ``tuple`` or ``namedtuple`` (see :data:`ROW_FORMATS`). The cursor
+        always gets its own pooled connection, never the request-scoped one:
+        a connection with an unread result cannot run other queries, and
+        callers usually query related rows while streaming.
+
+        If rows are left unread (the caller stopped early), the connection
+        is disconnected rather than drained: reading the rest of a large
+        result costs more than the reconnect the pool does on next checkout.
+        """
+        if row_format not in ROW_FORMATS:
+            raise ValueError(f"Unknown row format: {row_format}")
+        self._count("cursors")
+        connection = self.get_connection()
+        cursor = connection.cursor(buffered=False, **ROW_FORMATS[row_format])
+        try:
+            yield cursor
+        finally:
+            self._release_streaming(connection, cursor)
+
+    def _release_streaming(self, connection, cursor):
+        if connection.unread_result:
+            with self._stats_lock:
+                self._stats["discards"] += 1
+            try:
+                connection.disconnect()
+            except Error:
+                pass
+            finally:
+                try:
+                    connection.close()
+                except Error:
+                    # Expected: the session of a disconnected connection
+                    # cannot be reset; it is back in the pool all the same.
+                    pass
+            return
+        try:
+            cursor.close()
+            connection.rollback()
+        finally:
             connection.close()
 
+    def iter_query(self, query, params=None, batch_size=1000, row_format="dict", batches=False):
+        """Iterate over the rows of a SELECT without loading them all.
+
+        Holds a streaming cursor (see :meth:`get_streaming_cursor`) while
+        the generator is alive and fetches ``batch_size`` rows at a time.
+        Yields single rows, or lists of up to ``batch_size`` rows with
+        ``batches=True``. The connection is released when the iteration
+        ends, when the generator is closed (``close()``, ``break`` out of a
+        ``with closing(...)`` block) or when it is garbage collected.
+        """
+        with self.get_streaming_cursor(row_format) as cursor:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                if batches:
+                    yield rows
+                else:
+                    yield from rows
+
     def execute_query(self, query, params=None, fetch_one=False, fetch_all=False, commit=False):
         """Execute a SQL query and return results."""
         with self.get_cursor(commit=commit) as cursor:
@@ -52,17 +162,52 @@ class DatabaseManager:
             return cursor.lastrowid if commit else None
 
     def execute_many(self, query, params_list, commit=False):
-        """Execute a query multiple times with different parameters."""
+        """Execute a query multiple times with different parameters; returns
+        the affected row count (``get_cursor`` commits)."""
         with self.get_cursor(commit=commit) as cursor:
-            affected_rows = cursor.executemany(query, params_list)
-            if commit:
-                cursor.connection.commit()
-            return affected_rows
+            cursor.executemany(query, params_list)
+            return cursor.rowcount
 
     def close_connection(self):
-        """No-op for pooled connections (kept for API compatibility)."""
+        """Release the connection bound to the current request, if any."""
+        if not has_app_context():
+            return None
+        connection = g.pop("_db_connection", None)
+        if connection is not None:
+            try:
+                # Reads leave an implicit transaction open; end it before the
+                # connection goes back to the pool.
+                connection.rollback()
+            finally:
+                connection.close()
+        return None
+
+    def end_read_transaction(self):
+        """End the implicit transaction of the connection bound to the
+        current request, if any: under REPEATABLE READ its first read took a
+        snapshot, and later reads only see rows committed since once it ends.
+        Only for polling reads; writes commit through ``get_cursor``."""
+        if not has_app_context():
+            return None
+        connection = g.get("_db_connection")
+        if connection is not None:
+            connection.rollback()
         return None
 
+    def get_request_stats(self):
+        """Cursor uses and pool checkouts for the current request."""
+        if not has_app_context():
+            return {"cursors": 0, "checkouts": 0, "reuses": 0}
+        return dict(g.get("_db_stats") or {"cursors": 0, "checkouts": 0, "reuses": 0})
+
+    def get_pool_stats(self):
+        """Process-wide cursor, checkout and reuse counters."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["pool_size"] = self._pool.pool_size
+        stats["request_scoped"] = self.request_scoped
+        return stats
+
 
 _db_manager = None
 
@@ -73,4 +218,3 @@ def get_db_manager():
     if _db_manager is None:
         _db_manager = DatabaseManager()
     return _db_manager
-
@@ -1,6 +1,9 @@
 from backend.database.connection import get_db_manager
+from backend.cache.read_through import read_through
 
 
+# A client's cart row never changes once created, so the lookup is cached.
+@read_through("cart")
 def get_cart_by_client(client_id):
     query = "SELECT id_cart, id_client, cart_createdAt FROM cart WHERE id_client = %s"
     return get_db_manager().execute_query(query, (client_id,), fetch_one=True)
@@ -24,6 +27,43 @@ def list_cart_items(cart_id):
     return get_db_manager().execute_query(query, (cart_id,), fetch_all=True)
 
 
+def list_cart_rows(client_id):
+    """The client's cart joined with its items, their product and the
+    product's first image: one row per item, or a single row with NULL item
+    columns for an empty cart. No row if the client has no cart."""
+    query = (
+        "SELECT c.id_cart, c.id_client, c.cart_createdAt, "
+        "ci.id_cart_item, ci.id_product AS item_id_product, ci.quantity, "
+        "p.id_product, p.product_name, p.brand, p.product_description, p.price, p.stock, "
+        "p.rating, p.id_seller, p.id_category, p.id_SubCategory, p.createdAtt, p.updatedAt, "
+        "pi.id_product_image, pi.imageURL "
+        "FROM cart c "
+        "LEFT JOIN cart_item ci ON ci.id_cart = c.id_cart "
+        "LEFT JOIN product p ON p.id_product = ci.id_product "
+        "LEFT JOIN product_image pi ON pi.id_product_image = ("
+        "SELECT MIN(fi.id_product_image) FROM product_image fi WHERE fi.id_product = p.id_product"
+        ") "
+        "WHERE c.id_client = %s ORDER BY c.id_cart, ci.id_cart_item"
+    )
+    return get_db_manager().execute_query(query, (client_id,), fetch_all=True)
+
+
+@read_through("cart_summary")
+def get_cart_summary(cart_id):
+    """Item count (units) and total of the cart's items whose product exists.
+
+    Cached per cart; the cart write functions below invalidate it. A product
+    price change shows up when the entry expires.
+    """
+    query = (
+        "SELECT COALESCE(SUM(ci.quantity), 0) AS item_count, "
+        "COALESCE(SUM(p.price * ci.quantity), 0) AS total "
+        "FROM cart_item ci JOIN product p ON p.id_product = ci.id_product "
+        "WHERE ci.id_cart = %s"
+    )
+    return get_db_manager().execute_query(query, (cart_id,), fetch_one=True)
+
+
 def get_cart_item(cart_item_id):
     query = (
         "SELECT id_cart_item, id_cart, id_product, quantity "
@@ -40,23 +80,56 @@ def get_cart_item_by_product(cart_id, product_id):
     return get_db_manager().execute_query(query, (cart_id, product_id), fetch_one=True)
 
 
-def add_cart_item(cart_id, product_id, quantity):
+def list_cart_stock(cart_id, product_ids):
+    """Name and stock of `product_ids`, with the quantity already in the
+    cart (0 if none). Products that do not exist are absent."""
+    if not product_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(product_ids))
     query = (
-        "INSERT INTO cart_item (id_cart, id_product, quantity) VALUES (%s, %s, %s)"
+        "SELECT p.id_product, p.product_name, p.stock, COALESCE(ci.quantity, 0) AS in_cart "
+        "FROM product p LEFT JOIN cart_item ci ON ci.id_product = p.id_product AND ci.id_cart = %s "
+        f"WHERE p.id_product IN ({placeholders})"
     )
-    return get_db_manager().execute_query(query, (cart_id, product_id, quantity), commit=True)
+    return get_db_manager().execute_query(query, [cart_id, *product_ids], fetch_all=True)
+
+
+def add_cart_items(cart_id, quantities):
+    """Add `quantities` ({id_product: quantity}) to the cart in one
+    statement: new lines are inserted, existing ones incremented
+    (unique key of migration 0010)."""
+    if not quantities:
+        return 0
+    query = (
+        "INSERT INTO cart_item (id_cart, id_product, quantity) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)"
+    )
+    params = [(cart_id, product_id, quantity) for product_id, quantity in quantities.items()]
+    result = get_db_manager().execute_many(query, params, commit=True)
+    get_cart_summary.invalidate(cart_id)
+    return result
+
+
+def add_cart_item(cart_id, product_id, quantity):
+    return add_cart_items(cart_id, {product_id: quantity})
 
 
-def update_cart_item_quantity(cart_item_id, quantity):
-    query = "UPDATE cart_item SET quantity = %s WHERE id_cart_item = %s"
-    return get_db_manager().execute_query(query, (quantity, cart_item_id), commit=True)
+def update_cart_item_quantity(cart_item_id, quantity, cart_id):
+    query = "UPDATE cart_item SET quantity = %s WHERE id_cart_item = %s AND id_cart = %s"
+    result = get_db_manager().execute_query(query, (quantity, cart_item_id, cart_id), commit=True)
+    get_cart_summary.invalidate(cart_id)
+    return result
 
 
-def delete_cart_item(cart_item_id):
-    query = "DELETE FROM cart_item WHERE id_cart_item = %s"
-    return get_db_manager().execute_query(query, (cart_item_id,), commit=True)
+def delete_cart_item(cart_item_id, cart_id):
+    query = "DELETE FROM cart_item WHERE id_cart_item = %s AND id_cart = %s"
+    result = get_db_manager().execute_query(query, (cart_item_id, cart_id), commit=True)
+    get_cart_summary.invalidate(cart_id)
+    return result
 
 
 def clear_cart(cart_id):
     query = "DELETE FROM cart_item WHERE id_cart = %s"
-    return get_db_manager().execute_query(query, (cart_id,), commit=True)
+    result = get_db_manager().execute_query(query, (cart_id,), commit=True)
+    get_cart_summary.invalidate(cart_id)
+    return result
@@ -0,0 +1,59 @@
+from mysql.connector import errorcode, Error as MySQLError
+from backend.database.connection import get_db_manager
+
+# Bumps made by this process, so its own writes are seen without waiting
+# for the next version check.
+_local_writes = {}
+
+
+def local_writes(name):
+    return _local_writes.get(name, 0)
+
+
+def get_version(name):
+    """Version counter of `name`, or None if the catalog_version table does
+    not exist yet (migration 0003 not applied)."""
+    query = "SELECT version FROM catalog_version WHERE name = %s"
+    try:
+        row = get_db_manager().execute_query(query, (name,), fetch_one=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+    return int(row["version"]) if row else 0
+
+
+def get_versions(names):
+    """`{name: (version, updatedAt)}` for `names` (missing counters are
+    `(0, None)`), or None if the catalog_version table does not exist."""
+    names = list(names)
+    if not names:
+        return {}
+    placeholders = ", ".join(["%s"] * len(names))
+    query = f"SELECT name, version, updatedAt FROM catalog_version WHERE name IN ({placeholders})"
+    try:
+        rows = get_db_manager().execute_query(query, names, fetch_all=True) or []
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+    versions = {name: (0, None) for name in names}
+    for row in rows:
+        versions[row["name"]] = (int(row["version"]), row["updatedAt"])
+    return versions
+
+
+def bump_version(name):
+    # updatedAt is stored in UTC: it is sent as Last-Modified.
+    query = (
+        "INSERT INTO catalog_version (name, version, updatedAt) VALUES (%s, 1, UTC_TIMESTAMP()) "
+        "ON DUPLICATE KEY UPDATE version = version + 1, updatedAt = UTC_TIMESTAMP()"
+    )
+    try:
+        return get_db_manager().execute_query(query, (name,), commit=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+    finally:
+        _local_writes[name] = _local_writes.get(name, 0) + 1
@@ -1,4 +1,9 @@
 from backend.database.connection import get_db_manager
+from backend.cache.read_through import read_through
+from backend.database.dao.catalog_versions import bump_version
+
+# Name of the catalog_version counter of the category/subcategory tree.
+TREE_VERSION = "category_tree"
 
 
 def create_category(name, description, image):
@@ -6,7 +11,9 @@ def create_category(name, description, image):
         "INSERT INTO category (category_name, category_description, image) "
         "VALUES (%s, %s, %s)"
     )
-    return get_db_manager().execute_query(query, (name, description, image), commit=True)
+    category_id = get_db_manager().execute_query(query, (name, description, image), commit=True)
+    bump_version(TREE_VERSION)
+    return category_id
 
 
 def list_categories():
@@ -14,6 +21,20 @@ def list_categories():
     return get_db_manager().execute_query(query, fetch_all=True)
 
 
+def list_category_tree_rows():
+    """Categories joined with their subcategories (one row per pair, NULL
+    subcategory columns for a category without subcategories)."""
+    query = (
+        "SELECT c.id_category, c.category_name, c.category_description, c.image, "
+        "s.id_SubCategory, s.SubCategory_name, s.SubCategory_description "
+        "FROM category c "
+        "LEFT JOIN SubCategory s ON s.id_category = c.id_category "
+        "ORDER BY c.id_category, s.id_SubCategory"
+    )
+    return get_db_manager().execute_query(query, fetch_all=True)
+
+
+@read_through("category")
 def get_category(category_id):
     query = (
         "SELECT id_category, category_name, category_description, image "
@@ -36,9 +57,26 @@ def update_category(category_id, fields):
     assignments = ", ".join(f"{key} = %s" for key in fields.keys())
     params = list(fields.values()) + [category_id]
     query = f"UPDATE category SET {assignments} WHERE id_category = %s"
-    return get_db_manager().execute_query(query, params, commit=True)
+    result = get_db_manager().execute_query(query, params, commit=True)
+    get_category.invalidate(category_id)
+    bump_version(TREE_VERSION)
+    return result
 
 
 def delete_category(category_id):
     query = "DELETE FROM category WHERE id_category = %s"
-    return get_db_manager().execute_query(query, (category_id,), commit=True)
+    result = get_db_manager().execute_query(query, (category_id,), commit=True)
+    get_category.invalidate(category_id)
+    bump_version(TREE_VERSION)
+    return result
+
+
+def list_categories_by_ids(category_ids):
+    if not category_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(category_ids))
+    query = (
+        "SELECT id_category, category_name, category_description, image "
+        f"FROM category WHERE id_category IN ({placeholders})"
+    )
+    return get_db_manager().execute_query(query, list(category_ids), fetch_all=True)
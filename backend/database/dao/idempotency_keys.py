@@ -0,0 +1,90 @@
+"""Idempotency keys and their stored responses (migration 0009).
+
+Every function returns None when the ``idempotency_key`` table does not
+exist, so the endpoints work, without idempotency, before the migration.
+"""
+from mysql.connector import errorcode, Error as MySQLError
+from backend.database.connection import get_db_manager
+
+
+def claim_key(user_id, key, request_hash, lock_timeout):
+    """Record `key` as running for at most `lock_timeout` seconds.
+
+    True if this call claimed the key, False if a live row already holds it
+    (running or completed). An expired row is replaced.
+    """
+    try:
+        with get_db_manager().get_cursor(commit=True) as cursor:
+            cursor.execute(
+                "DELETE FROM idempotency_key "
+                "WHERE id_user = %s AND idem_key = %s AND expiresAt <= UTC_TIMESTAMP()",
+                (user_id, key),
+            )
+            cursor.execute(
+                "INSERT INTO idempotency_key (id_user, idem_key, request_hash, createdAt, expiresAt) "
+                "VALUES (%s, %s, %s, UTC_TIMESTAMP(), UTC_TIMESTAMP() + INTERVAL %s SECOND)",
+                (user_id, key, request_hash, int(lock_timeout)),
+            )
+        return True
+    except MySQLError as error:
+        if error.errno == errorcode.ER_DUP_ENTRY:
+            return False
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+
+
+def get_key(user_id, key):
+    """Live row of `key`, or None. Read in a new transaction, so polls see
+    the response or release committed by another worker meanwhile."""
+    query = (
+        "SELECT request_hash, status_code, content_type, response_body FROM idempotency_key "
+        "WHERE id_user = %s AND idem_key = %s AND expiresAt > UTC_TIMESTAMP()"
+    )
+    db = get_db_manager()
+    try:
+        db.end_read_transaction()
+        return db.execute_query(query, (user_id, key), fetch_one=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+
+
+def save_response(user_id, key, status_code, content_type, body, ttl):
+    """Store the response of the request that claimed `key`, kept `ttl` seconds."""
+    query = (
+        "UPDATE idempotency_key SET status_code = %s, content_type = %s, response_body = %s, "
+        "expiresAt = UTC_TIMESTAMP() + INTERVAL %s SECOND "
+        "WHERE id_user = %s AND idem_key = %s"
+    )
+    try:
+        return get_db_manager().execute_query(
+            query, (status_code, content_type, body, int(ttl), user_id, key), commit=True
+        )
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+
+
+def release_key(user_id, key):
+    """Drop the claim of a request that failed, so a retry runs again."""
+    query = "DELETE FROM idempotency_key WHERE id_user = %s AND idem_key = %s AND status_code IS NULL"
+    try:
+        return get_db_manager().execute_query(query, (user_id, key), commit=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+
+
+def purge_expired_keys(limit=1000):
+    """Delete up to `limit` expired rows."""
+    query = "DELETE FROM idempotency_key WHERE expiresAt <= UTC_TIMESTAMP() LIMIT %s"
+    try:
+        return get_db_manager().execute_query(query, (int(limit),), commit=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
@@ -1,4 +1,10 @@
+from backend import search
 from backend.database.connection import get_db_manager
+from backend.database.dao.products import invalidate_product_caches
+from backend.database.dao import stats as stats_dao
+from backend.database.dao import seller_stats as seller_stats_dao
+from backend.database.dao import cart as cart_dao
+from backend.database.dao import reservations as reservations_dao
 
 
 def create_order(client_id, total_amount, payment_status, order_status):
@@ -6,32 +12,171 @@ def create_order(client_id, total_amount, payment_status, order_status):
         "INSERT INTO orders (id_client, total_amount, payment_status, order_status, order_createdAt) "
         "VALUES (%s, %s, %s, %s, NOW())"
     )
-    return get_db_manager().execute_query(
-        query, (client_id, total_amount, payment_status, order_status), commit=True
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        cursor.execute(query, (client_id, total_amount, payment_status, order_status))
+        order_id = cursor.lastrowid
+    # Compteurs après le commit : leur ligne n'est pas verrouillée pendant la transaction
+    stats_dao.adjust_counters({"total_orders": 1, "pending_orders": int(order_status == "processing")})
+    return order_id
+
+
+class CheckoutError(ValueError):
+    """The cart cannot be turned into an order (empty, out of stock...);
+    ``product_ids`` are the products found short of stock under lock."""
+
+    def __init__(self, message, product_ids=()):
+        super().__init__(message)
+        self.product_ids = list(product_ids)
+
+
+def _decrement_stock(cursor, quantities, held=None):
+    """Take `quantities` ({id_product: quantity}) off the stock in one
+    statement. Rows whose stock is too low are left untouched, so the
+    update applies to every product or the caller rolls back.
+
+    With `held` ({id_product: quantity held by the client}), the holds are
+    converted: reserved stock goes down by the held units and only the
+    units not reserved by other clients can be ordered.
+    """
+    if held is None:
+        rows = " UNION ALL ".join(["SELECT %s AS id_product, %s AS quantity"] * len(quantities))
+        params = [value for item in quantities.items() for value in item]
+        cursor.execute(
+            f"UPDATE product p JOIN ({rows}) q ON q.id_product = p.id_product "
+            "SET p.stock = p.stock - q.quantity WHERE p.stock >= q.quantity",
+            params,
+        )
+        return cursor.rowcount == len(quantities)
+    product_ids = sorted(set(quantities) | set(held))
+    rows = " UNION ALL ".join(["SELECT %s AS id_product, %s AS quantity, %s AS held"] * len(product_ids))
+    params = [
+        value for product_id in product_ids
+        for value in (product_id, quantities.get(product_id, 0), held.get(product_id, 0))
+    ]
+    cursor.execute(
+        f"UPDATE product p JOIN ({rows}) q ON q.id_product = p.id_product "
+        "SET p.stock = p.stock - q.quantity, p.reserved_stock = p.reserved_stock - q.held "
+        "WHERE q.quantity = 0 OR p.stock - p.reserved_stock + q.held >= q.quantity",
+        params,
     )
+    return cursor.rowcount == len(product_ids)
+
+
+def checkout_cart(client_id, cart_id):
+    """Turn the cart into a processing order in one transaction.
+
+    The cart lines and their products are read with ``FOR UPDATE`` (products
+    in id order, so concurrent checkouts lock them in the same order and
+    wait for each other instead of deadlocking); the stock checked is
+    therefore the stock decremented. Order items are inserted with one
+    ``executemany`` and the stock of every product is decremented by one
+    conditional UPDATE. Raises :class:`CheckoutError` (nothing written) if
+    the cart is empty, a product lacks stock or the total is zero.
 
+    With ``STOCK_RESERVATIONS`` enabled, the stock available to the client
+    is the stock not held by other clients plus the client's own holds
+    (``reservations.hold_cart``), which the order converts: they are
+    deleted and their units leave ``reserved_stock`` with the stock.
+    Products sold out a moment ago are refused before their rows are locked.
+    Expired holds are released here too (``reservations.maybe_sweep``), and
+    when stock is short those of the products concerned are released and
+    the checkout is tried once more, as ``hold_cart`` does.
+
+    The dashboard and seller counters are updated after the commit, so the
+    order transaction never waits on their rows.
+    """
+    if not reservations_dao.enabled():
+        return _checkout(client_id, cart_id, False)
+    reservations_dao.maybe_sweep()
+    try:
+        return _checkout(client_id, cart_id, True)
+    except CheckoutError as error:
+        if not error.product_ids or not reservations_dao.release_expired(error.product_ids):
+            raise
+    return _checkout(client_id, cart_id, True)
+
+
+def _checkout(client_id, cart_id, reserving):
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        cursor.execute(
+            "SELECT id_product, quantity FROM cart_item WHERE id_cart = %s FOR UPDATE",
+            (cart_id,),
+        )
+        cart_items = cursor.fetchall()
+        if not cart_items:
+            raise CheckoutError("Cart is empty")
+
+        quantities = {}
+        for cart_item in cart_items:
+            quantities[cart_item["id_product"]] = quantities.get(cart_item["id_product"], 0) + cart_item["quantity"]
+        held = None
+        if reserving:
+            held = reservations_dao.lock_holds(cursor, client_id)
+            # Produits épuisés il y a un instant : refus sans verrouiller leur ligne
+            if reservations_dao.sold_out(quantities, held):
+                raise CheckoutError("Insufficient stock (sold out)")
+        product_ids = sorted(set(quantities) | set(held or ()))
+        placeholders = ", ".join(["%s"] * len(product_ids))
+        reserved = ", reserved_stock" if held is not None else ""
+        cursor.execute(
+            f"SELECT id_product, product_name, price, stock{reserved} FROM product "
+            f"WHERE id_product IN ({placeholders}) ORDER BY id_product FOR UPDATE",
+            product_ids,
+        )
+        products = {product["id_product"]: product for product in cursor.fetchall()}
+
+        # Lignes de produits supprimés ignorées
+        cart_items = [item for item in cart_items if item["id_product"] in products]
+        quantities = {product_id: quantity for product_id, quantity in quantities.items() if product_id in products}
+        available = {}
+        for product_id, product in products.items():
+            available[product_id] = product["stock"] or 0
+            if held is not None:
+                available[product_id] += held.get(product_id, 0) - product["reserved_stock"]
+        for product_id, quantity in quantities.items():
+            product = products[product_id]
+            if available[product_id] < quantity:
+                if held is not None:
+                    reservations_dao.note_available({product_id: available[product_id] - held.get(product_id, 0)})
+                raise CheckoutError(f"Insufficient stock for product {product['product_name']}", [product_id])
+        total_amount = sum(
+            float(products[item["id_product"]]["price"] or 0) * item["quantity"] for item in cart_items
+        )
+        if total_amount == 0:
+            raise CheckoutError("Cannot create order with zero total")
 
-def create_order_with_items(client_id, cart_id, items, total_amount):
-    db = get_db_manager()
-    with db.get_cursor(commit=True) as cursor:
         cursor.execute(
             "INSERT INTO orders (id_client, total_amount, payment_status, order_status, order_createdAt) "
             "VALUES (%s, %s, %s, %s, NOW())",
             (client_id, total_amount, "pending", "processing"),
         )
         order_id = cursor.lastrowid
-        for item in items:
-            cursor.execute(
-                "INSERT INTO order_item (id_order, id_product, order_item_quantity, order_item_price) "
-                "VALUES (%s, %s, %s, %s)",
-                (order_id, item["id_product"], item["quantity"], item["price"]),
-            )
-            cursor.execute(
-                "UPDATE product SET stock = stock - %s WHERE id_product = %s",
-                (item["quantity"], item["id_product"]),
-            )
+        cursor.executemany(
+            "INSERT INTO order_item (id_order, id_product, order_item_quantity, order_item_price) "
+            "VALUES (%s, %s, %s, %s)",
+            [
+                (order_id, item["id_product"], item["quantity"], float(products[item["id_product"]]["price"] or 0))
+                for item in cart_items
+            ],
+        )
+        if not _decrement_stock(cursor, quantities, held):
+            raise CheckoutError("Insufficient stock", quantities)
+        if held is not None:
+            reservations_dao.delete_holds(cursor, client_id)
         cursor.execute("DELETE FROM cart_item WHERE id_cart = %s", (cart_id,))
-        return order_id
+    # Compteurs après le commit, chacun dans sa propre transaction : leurs
+    # lignes ne sérialisent pas les commandes concurrentes
+    stats_dao.adjust_counters({"total_orders": 1, "pending_orders": 1})
+    seller_stats_dao.order_created(order_id)
+    # Le stock des produits a changé
+    invalidate_product_caches(*quantities, listings=False)
+    search.products_changed(quantities)
+    if held is not None:
+        reservations_dao.note_available({
+            product_id: available[product_id] - quantities.get(product_id, 0) for product_id in products
+        })
+    cart_dao.get_cart_summary.invalidate(cart_id)
+    return order_id
 
 
 def get_order(order_id):
@@ -58,6 +203,21 @@ def list_orders_all():
     return get_db_manager().execute_query(query, fetch_all=True)
 
 
+def search_orders(conditions, params, order_by, limit=None):
+    """One page of orders matching `conditions` (keyset pagination: the
+    cursor condition is one of `conditions`)."""
+    query = (
+        "SELECT id_order, id_client, total_amount, payment_status, order_status, order_createdAt "
+        "FROM orders"
+    )
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {order_by}"
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    return get_db_manager().execute_query(query, list(params), fetch_all=True)
+
+
 def list_orders_by_ids(order_ids):
     if not order_ids:
         return []
@@ -75,7 +235,21 @@ def update_order_status(order_id, fields):
     assignments = ", ".join(f"{key} = %s" for key in fields.keys())
     params = list(fields.values()) + [order_id]
     query = f"UPDATE orders SET {assignments} WHERE id_order = %s"
-    return get_db_manager().execute_query(query, params, commit=True)
+    counted = stats_dao.incremental_enabled() or seller_stats_dao.materialized_enabled()
+    if "order_status" not in fields or not counted:
+        return get_db_manager().execute_query(query, params, commit=True)
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        # Ancien statut verrouillé jusqu'au commit : compteurs exacts
+        cursor.execute("SELECT order_status FROM orders WHERE id_order = %s FOR UPDATE", (order_id,))
+        row = cursor.fetchone()
+        cursor.execute(query, params)
+        if row:
+            old_status, new_status = row["order_status"], fields["order_status"]
+            was_pending = old_status == "processing"
+            is_pending = new_status == "processing"
+            stats_dao.adjust_counters({"pending_orders": int(is_pending) - int(was_pending)}, cursor)
+            seller_stats_dao.order_status_changed(order_id, old_status, new_status, cursor)
+    return None
 
 
 def create_order_item(order_id, product_id, quantity, price):
@@ -94,6 +268,43 @@ def list_order_items(order_id):
     return get_db_manager().execute_query(query, (order_id,), fetch_all=True)
 
 
+def list_order_items_by_orders(order_ids):
+    if not order_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    query = (
+        "SELECT id_order_item, id_order, id_product, order_item_quantity, order_item_price "
+        f"FROM order_item WHERE id_order IN ({placeholders})"
+    )
+    return get_db_manager().execute_query(query, list(order_ids), fetch_all=True)
+
+
+def seller_orders_condition(seller_id):
+    """`(condition, params)` restricting `search_orders` to the orders that
+    contain products of `seller_id` (semi-join through order_item)."""
+    return (
+        "id_order IN (SELECT oi.id_order FROM order_item oi "
+        "JOIN product p ON p.id_product = oi.id_product WHERE p.id_seller = %s)",
+        [seller_id],
+    )
+
+
+def list_seller_order_items(seller_id, order_ids):
+    """Items of `order_ids` that are products of `seller_id`, each row joined
+    with its product's columns."""
+    if not order_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    query = (
+        "SELECT oi.id_order_item, oi.id_order, oi.id_product, oi.order_item_quantity, oi.order_item_price, "
+        "p.product_name, p.brand, p.product_description, p.price, p.stock, p.rating, "
+        "p.id_seller, p.id_category, p.id_SubCategory, p.createdAtt, p.updatedAt "
+        "FROM order_item oi JOIN product p ON p.id_product = oi.id_product "
+        f"WHERE p.id_seller = %s AND oi.id_order IN ({placeholders})"
+    )
+    return get_db_manager().execute_query(query, [seller_id] + list(order_ids), fetch_all=True)
+
+
 def client_has_purchased_product(client_id, product_id):
     query = (
         "SELECT oi.id_order_item FROM order_item oi "
@@ -31,3 +31,13 @@ def update_payment_status(payment_id, status):
     query = "UPDATE payment SET payment_status = %s WHERE id_payment = %s"
     return get_db_manager().execute_query(query, (status, payment_id), commit=True)
 
+
+def list_payments_by_orders(order_ids):
+    if not order_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    query = (
+        "SELECT id_payment, id_order, payment_amount, method, payment_status, id_transaction "
+        f"FROM payment WHERE id_order IN ({placeholders})"
+    )
+    return get_db_manager().execute_query(query, list(order_ids), fetch_all=True)
@@ -1,4 +1,5 @@
 from backend.database.connection import get_db_manager
+from backend.database.dao.catalog_versions import bump_version
 
 
 def list_images_by_product(product_id):
@@ -11,10 +12,25 @@ def list_images_by_product(product_id):
 
 def create_image(product_id, image_url):
     query = "INSERT INTO product_image (imageURL, id_product) VALUES (%s, %s)"
-    return get_db_manager().execute_query(query, (image_url, product_id), commit=True)
+    image_id = get_db_manager().execute_query(query, (image_url, product_id), commit=True)
+    bump_version("product_image")
+    return image_id
 
 
 def delete_images_by_product(product_id):
     query = "DELETE FROM product_image WHERE id_product = %s"
-    return get_db_manager().execute_query(query, (product_id,), commit=True)
+    result = get_db_manager().execute_query(query, (product_id,), commit=True)
+    bump_version("product_image")
+    return result
 
+
+def list_images_by_products(product_ids):
+    if not product_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    query = (
+        "SELECT id_product_image, imageURL, id_product "
+        f"FROM product_image WHERE id_product IN ({placeholders}) "
+        "ORDER BY id_product_image"
+    )
+    return get_db_manager().execute_query(query, list(product_ids), fetch_all=True)
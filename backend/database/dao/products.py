@@ -1,4 +1,32 @@
 from backend.database.connection import get_db_manager
+from backend import cache, search
+from backend.cache.read_through import read_through
+from backend.database.dao.catalog_versions import bump_version
+from backend.database.dao import stats as stats_dao
+from backend.database.dao import seller_stats as seller_stats_dao
+from backend.database.dao import reservations as reservations_dao
+
+# Caches derived from the product table, cleared on every product write.
+PRODUCT_CACHES = ("product_counts",)
+
+
+def invalidate_product_caches(*product_ids, listings=True):
+    """Clear the derived caches, and the cached rows and recent
+    availability of ``product_ids``, and bump the `product` version used by
+    conditional GETs.
+
+    Stock-only changes (checkouts, ``update_product_stock``) pass
+    ``listings=False``: the version is left alone, so a sale neither
+    invalidates every listing ETag nor writes the shared counter row.
+    Conditional clients see the new stock after the next catalog change;
+    checkouts check the stock under lock whatever they were shown.
+    """
+    if listings:
+        bump_version("product")
+    cache.invalidate(*PRODUCT_CACHES)
+    for product_id in product_ids:
+        get_product.invalidate(product_id)
+    reservations_dao.forget_available(product_ids)
 
 
 def create_product(data):
@@ -13,13 +41,20 @@ def create_product(data):
         data.get("product_description"),
         data.get("price"),
         data.get("stock", 0),
-        data.get("rating", 0.0),
+        0.0,  # derived from the reviews (see reviews._apply_rating)
         data.get("id_seller"),
         data.get("id_category"),
     )
-    return get_db_manager().execute_query(query, params, commit=True)
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        cursor.execute(query, params)
+        product_id = cursor.lastrowid
+        stats_dao.adjust_counters({"total_products": 1}, cursor)
+        seller_stats_dao.product_added(data.get("id_seller"), cursor)
+    invalidate_product_caches()
+    return product_id
 
 
+@read_through("product")
 def get_product(product_id):
     query = (
         "SELECT id_product, product_name, brand, product_description, price, stock, rating, "
@@ -32,12 +67,22 @@ def get_product(product_id):
 def list_products():
     query = (
         "SELECT id_product, product_name, brand, product_description, price, stock, rating, "
-        "id_seller, id_category, createdAtt, updatedAt "
+        "id_seller, id_category, id_SubCategory, createdAtt, updatedAt "
         "FROM product"
     )
     return get_db_manager().execute_query(query, fetch_all=True)
 
 
+def iter_products(batch_size):
+    """All products in batches, ordered by ID (streaming cursor)."""
+    query = (
+        "SELECT id_product, product_name, brand, product_description, price, stock, rating, "
+        "id_seller, id_category, id_SubCategory, createdAtt, updatedAt "
+        "FROM product ORDER BY id_product"
+    )
+    return get_db_manager().iter_query(query, batch_size=batch_size, batches=True)
+
+
 def list_products_by_seller(seller_id):
     query = (
         "SELECT id_product, product_name, brand, product_description, price, stock, rating, "
@@ -47,6 +92,18 @@ def list_products_by_seller(seller_id):
     return get_db_manager().execute_query(query, (seller_id,), fetch_all=True)
 
 
+def list_products_by_ids(product_ids):
+    if not product_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    query = (
+        "SELECT id_product, product_name, brand, product_description, price, stock, rating, "
+        "id_seller, id_category, id_SubCategory, createdAtt, updatedAt "
+        f"FROM product WHERE id_product IN ({placeholders})"
+    )
+    return get_db_manager().execute_query(query, list(product_ids), fetch_all=True)
+
+
 def update_product(product_id, fields):
     if not fields:
         return 0
@@ -61,18 +118,26 @@ def update_product(product_id, fields):
             params.append(value)
     params.append(product_id)
     query = f"UPDATE product SET {', '.join(assignments)} WHERE id_product = %s"
-    return get_db_manager().execute_query(query, params, commit=True)
+    result = get_db_manager().execute_query(query, params, commit=True)
+    invalidate_product_caches(product_id)
+    return result
 
 
 def delete_product(product_id):
     query = "DELETE FROM product WHERE id_product = %s"
-    return get_db_manager().execute_query(query, (product_id,), commit=True)
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        seller_stats_dao.product_deleting(product_id, cursor)
+        cursor.execute(query, (product_id,))
+        stats_dao.adjust_counters({"total_products": -cursor.rowcount}, cursor)
+    invalidate_product_caches(product_id)
+    return None
 
 
-def search_products(conditions, params, order_by=None, limit=None, offset=None):
+def search_products(conditions, params, order_by=None, limit=None, offset=None, order_params=None):
     """
     Recherche de produits avec filtres SQL complets.
     Pas d'ORM - uniquement des requêtes SQL pures MySQL.
+    `order_params` fournit les valeurs des %s de `order_by` (tri par pertinence).
     """
     base = (
         "SELECT id_product, product_name, brand, product_description, price, stock, rating, "
@@ -94,6 +159,8 @@ def search_products(conditions, params, order_by=None, limit=None, offset=None):
         if offset is not None:
             base += f" OFFSET {offset}"
     
+    if order_params:
+        params = list(params) + list(order_params)
     return get_db_manager().execute_query(base, params, fetch_all=True)
 
 
@@ -109,14 +176,59 @@ def count_products(conditions, params):
     return result["total"] if result else 0
 
 
-def update_product_stock(product_id, delta):
-    query = "UPDATE product SET stock = stock + %s WHERE id_product = %s"
-    return get_db_manager().execute_query(query, (delta, product_id), commit=True)
+def estimate_products(conditions, params):
+    """
+    Estimation du nombre de produits filtrés d'après le plan d'exécution
+    (EXPLAIN : lignes estimées x pourcentage filtré), sans lire les lignes.
+    """
+    base = "EXPLAIN SELECT id_product FROM product"
+    if conditions:
+        base += " WHERE " + " AND ".join(conditions)
+    plan = get_db_manager().execute_query(base, params, fetch_all=True) or []
+    for step in plan:
+        if step.get("table") == "product" and step.get("rows") is not None:
+            return int(float(step["rows"]) * float(step.get("filtered") or 100) / 100)
+    return 0
+
 
+def estimate_product_table_rows():
+    """Nombre de lignes de `product` d'après les statistiques de la table."""
+    query = (
+        "SELECT TABLE_ROWS AS total FROM information_schema.TABLES "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'product'"
+    )
+    result = get_db_manager().execute_query(query, fetch_one=True)
+    return int(result["total"] or 0) if result else 0
 
-def update_product_rating(product_id, rating):
-    query = "UPDATE product SET rating = %s WHERE id_product = %s"
-    return get_db_manager().execute_query(query, (rating, product_id), commit=True)
+
+def count_facets(conditions, params, expressions):
+    """
+    Compte les produits filtrés par valeur de chaque facette demandée, en une
+    seule requête : une branche `GROUP BY` par facette (même clause WHERE),
+    réunies par `UNION ALL`, pour ne renvoyer que les valeurs distinctes de
+    chaque facette. `expressions` associe un nom de facette à son expression
+    SQL; chaque ligne contient `facet`, `facet_value` (texte) et `total`.
+    """
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    branches = [
+        f"SELECT %s AS facet, CAST({expression} AS CHAR) AS facet_value, COUNT(*) AS total "
+        f"FROM product{where} GROUP BY facet_value"
+        for expression in expressions.values()
+    ]
+    query = " UNION ALL ".join(branches)
+    branch_params = []
+    for name in expressions:
+        branch_params.append(name)
+        branch_params.extend(params)
+    return get_db_manager().execute_query(query, branch_params, fetch_all=True) or []
+
+
+def update_product_stock(product_id, delta):
+    query = "UPDATE product SET stock = stock + %s WHERE id_product = %s"
+    result = get_db_manager().execute_query(query, (delta, product_id), commit=True)
+    invalidate_product_caches(product_id, listings=False)
+    search.products_changed([product_id])
+    return result
 
 
 def get_top_sellers_by_product_count(limit=5):
@@ -0,0 +1,234 @@
+"""Stock holds of checkouts in progress (migration 0011).
+
+Enabled with ``STOCK_RESERVATIONS=true``. :func:`hold_cart` reserves the
+client's cart for ``STOCK_RESERVATION_TTL`` seconds when checkout starts:
+each product's ``reserved_stock`` grows by the held quantity, so other
+clients can only hold or order ``stock - reserved_stock`` units. The
+checkout that follows converts the client's holds (``orders.checkout_cart``:
+stock and reserved stock go down together, holds are deleted, in the order
+transaction); expired holds are released by :func:`release_expired`, run
+from the request path at most every ``STOCK_RESERVATION_SWEEP_INTERVAL``
+seconds per worker and by ``python init_db.py --release-expired-holds``.
+
+Every locked read of a product also records its available units in an
+in-process cache valid ``STOCK_AVAILABILITY_TTL`` seconds. Holds and
+checkouts asking for more than a product had available a moment ago are
+refused from that cache, before any product row is locked: during a sale,
+the requests for a sold-out product do not queue on its row.
+"""
+import threading
+import time
+from backend import cache
+from backend.cache import MISSING
+from backend.config import Config
+from backend.database.connection import get_db_manager
+
+
+class ReservationError(ValueError):
+    """The cart cannot be held; ``product_ids`` are the products lacking
+    stock, ``from_cache`` is set when the in-process availability refused
+    them without reading the database."""
+
+    def __init__(self, message, product_ids=(), from_cache=False):
+        super().__init__(message)
+        self.product_ids = list(product_ids)
+        self.from_cache = from_cache
+
+
+AVAILABILITY_CACHE = "stock_available"
+
+_sweep_lock = threading.Lock()
+_swept_at = 0.0
+
+
+def enabled():
+    return Config.STOCK_RESERVATIONS
+
+
+# In-process availability of recently locked products
+
+def _availability():
+    return cache.get_cache(AVAILABILITY_CACHE, maxsize=4096, ttl=Config.STOCK_AVAILABILITY_TTL)
+
+
+def note_available(available):
+    """Record {id_product: available units} read under lock."""
+    availability = _availability()
+    for product_id, units in available.items():
+        availability.set(product_id, units)
+
+
+def forget_available(product_ids):
+    availability = _availability()
+    for product_id in product_ids:
+        availability.delete(product_id)
+
+
+def sold_out(quantities, held=None):
+    """Products of `quantities` that recently had fewer available units than
+    asked (units already held by the client count as available to them)."""
+    held = held or {}
+    availability = _availability()
+    refused = []
+    for product_id, quantity in quantities.items():
+        units = availability.get(product_id)
+        if units is not MISSING and units + held.get(product_id, 0) < quantity:
+            refused.append(product_id)
+    return refused
+
+
+# Holds
+
+def _in(values):
+    return ", ".join(["%s"] * len(values))
+
+
+def lock_holds(cursor, client_id):
+    """{id_product: quantity} held by the client, locked until commit.
+    Expired holds not released yet still count: their units are still in
+    `reserved_stock`."""
+    cursor.execute(
+        "SELECT id_product, quantity FROM stock_reservation WHERE id_client = %s FOR UPDATE",
+        (client_id,),
+    )
+    return {row["id_product"]: row["quantity"] for row in cursor.fetchall()}
+
+
+def delete_holds(cursor, client_id):
+    cursor.execute("DELETE FROM stock_reservation WHERE id_client = %s", (client_id,))
+
+
+def _adjust_reserved(cursor, deltas):
+    """Add `deltas` ({id_product: delta}) to reserved_stock in one statement.
+    Rows are listed in id order, the order in which checkouts and holds lock
+    products, so a sweep and a checkout do not deadlock."""
+    deltas = sorted((product_id, delta) for product_id, delta in deltas.items() if delta)
+    if not deltas:
+        return None
+    rows = " UNION ALL ".join(["SELECT %s AS id_product, %s AS delta"] * len(deltas))
+    params = [value for item in deltas for value in item]
+    cursor.execute(
+        f"UPDATE product p JOIN ({rows}) d ON d.id_product = p.id_product "
+        "SET p.reserved_stock = p.reserved_stock + d.delta",
+        params,
+    )
+    return None
+
+
+def _hold(client_id, cart_id, ttl):
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        cursor.execute("SELECT id_product, quantity FROM cart_item WHERE id_cart = %s", (cart_id,))
+        quantities = {}
+        for item in cursor.fetchall():
+            quantities[item["id_product"]] = quantities.get(item["id_product"], 0) + item["quantity"]
+        held = lock_holds(cursor, client_id)
+        refused = sold_out(quantities, held)
+        if refused:
+            raise ReservationError("Sold out", refused, from_cache=True)
+
+        product_ids = sorted(set(quantities) | set(held))
+        if not product_ids:
+            return {}
+        # Produits verrouillés dans l'ordre des id (comme au checkout)
+        cursor.execute(
+            "SELECT id_product, stock, reserved_stock FROM product "
+            f"WHERE id_product IN ({_in(product_ids)}) ORDER BY id_product FOR UPDATE",
+            product_ids,
+        )
+        products = {row["id_product"]: row for row in cursor.fetchall()}
+        quantities = {product_id: quantity for product_id, quantity in quantities.items() if product_id in products}
+        available = {
+            product_id: (row["stock"] or 0) - row["reserved_stock"] + held.get(product_id, 0)
+            for product_id, row in products.items()
+        }
+        insufficient = [
+            product_id for product_id, quantity in quantities.items() if available[product_id] < quantity
+        ]
+        if insufficient:
+            note_available({product_id: available[product_id] - held.get(product_id, 0) for product_id in insufficient})
+            raise ReservationError("Insufficient stock", insufficient)
+
+        _adjust_reserved(cursor, {
+            product_id: quantities.get(product_id, 0) - held.get(product_id, 0) for product_id in products
+        })
+        delete_holds(cursor, client_id)
+        if quantities:
+            cursor.executemany(
+                "INSERT INTO stock_reservation (id_client, id_product, quantity, createdAt, expiresAt) "
+                "VALUES (%s, %s, %s, UTC_TIMESTAMP(), UTC_TIMESTAMP() + INTERVAL %s SECOND)",
+                [(client_id, product_id, quantity, int(ttl)) for product_id, quantity in quantities.items()],
+            )
+    note_available({
+        product_id: available[product_id] - quantities.get(product_id, 0) for product_id in products
+    })
+    return quantities
+
+
+def hold_cart(client_id, cart_id):
+    """Hold the cart's products for the client, replacing the client's
+    previous holds. Returns {id_product: quantity held}; raises
+    :class:`ReservationError` (nothing held) if a product lacks stock.
+
+    When stock is short, expired holds of the products concerned are
+    released and the hold is tried once more.
+    """
+    maybe_sweep()
+    ttl = Config.STOCK_RESERVATION_TTL
+    try:
+        return _hold(client_id, cart_id, ttl)
+    except ReservationError as error:
+        if error.from_cache or not release_expired(error.product_ids):
+            raise
+    return _hold(client_id, cart_id, ttl)
+
+
+def release_holds(client_id):
+    """Give back the units held by the client (checkout abandoned)."""
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        held = lock_holds(cursor, client_id)
+        _adjust_reserved(cursor, {product_id: -quantity for product_id, quantity in held.items()})
+        delete_holds(cursor, client_id)
+    forget_available(held)
+    return held
+
+
+def release_expired(product_ids=None, limit=500):
+    """Release up to `limit` expired holds (of `product_ids` only, if
+    given); returns the number released."""
+    query = "SELECT id_reservation, id_product, quantity FROM stock_reservation WHERE "
+    params = []
+    if product_ids:
+        query += f"id_product IN ({_in(product_ids)}) AND "
+        params.extend(product_ids)
+    query += "expiresAt <= UTC_TIMESTAMP() ORDER BY expiresAt LIMIT %s FOR UPDATE"
+    params.append(int(limit))
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        cursor.execute(query, params)
+        holds = cursor.fetchall()
+        if not holds:
+            return 0
+        released = {}
+        for hold in holds:
+            released[hold["id_product"]] = released.get(hold["id_product"], 0) - hold["quantity"]
+        _adjust_reserved(cursor, released)
+        reservation_ids = [hold["id_reservation"] for hold in holds]
+        cursor.execute(
+            f"DELETE FROM stock_reservation WHERE id_reservation IN ({_in(reservation_ids)})",
+            reservation_ids,
+        )
+    forget_available(released)
+    return len(holds)
+
+
+def maybe_sweep():
+    """Release expired holds if this worker has not done it for
+    STOCK_RESERVATION_SWEEP_INTERVAL seconds."""
+    global _swept_at
+    now = time.monotonic()
+    if now - _swept_at < Config.STOCK_RESERVATION_SWEEP_INTERVAL:
+        return None
+    with _sweep_lock:
+        if now - _swept_at < Config.STOCK_RESERVATION_SWEEP_INTERVAL:
+            return None
+        _swept_at = now
+    return release_expired()
@@ -1,4 +1,53 @@
+from mysql.connector import errorcode, Error as MySQLError
+from backend import search
 from backend.database.connection import get_db_manager
+from backend.database.dao import seller_stats as seller_stats_dao
+from backend.database.dao.products import invalidate_product_caches
+
+STARS = (1, 2, 3, 4, 5)
+
+
+def _apply_rating(cursor, product_id, sum_delta, count_delta):
+    """Add to the product's review aggregates and derive its rating, in the
+    caller's transaction (the product row stays locked until commit).
+
+    `rating` is assigned first so it is computed from the old values under
+    both MySQL's left-to-right and standard SQL assignment rules.
+    """
+    cursor.execute(
+        "UPDATE product SET "
+        "rating = CASE WHEN rating_count + %s > 0 "
+        "THEN (rating_sum + %s) / (rating_count + %s) ELSE 0 END, "
+        "rating_sum = rating_sum + %s, rating_count = rating_count + %s "
+        "WHERE id_product = %s",
+        (count_delta, sum_delta, count_delta, sum_delta, count_delta, product_id),
+    )
+
+
+def _count_stars(cursor, product_id, stars, delta):
+    """Add `delta` to the histogram bucket of `stars`, in the caller's
+    transaction (no-op without the table of migration 0008)."""
+    if stars not in STARS or not delta:
+        return None
+    try:
+        cursor.execute(
+            "INSERT INTO product_rating_histogram (id_product, stars, review_count) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE review_count = review_count + VALUES(review_count)",
+            (product_id, stars, delta),
+        )
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+    return None
+
+
+def _locked_review(cursor, review_id):
+    cursor.execute(
+        "SELECT id_review, rating_review, id_product FROM review WHERE id_review = %s FOR UPDATE",
+        (review_id,),
+    )
+    return cursor.fetchone()
 
 
 def create_review(rating, comment, product_id, client_id):
@@ -6,9 +55,13 @@ def create_review(rating, comment, product_id, client_id):
         "INSERT INTO review (rating_review, commentt, id_product, id_client, review_createdAt) "
         "VALUES (%s, %s, %s, %s, NOW())"
     )
-    return get_db_manager().execute_query(
-        query, (rating, comment, product_id, client_id), commit=True
-    )
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        cursor.execute(query, (rating, comment, product_id, client_id))
+        review_id = cursor.lastrowid
+        _apply_rating(cursor, product_id, rating, 1)
+        _count_stars(cursor, product_id, rating, 1)
+    _rating_changed(product_id)
+    return review_id
 
 
 def get_review(review_id):
@@ -22,11 +75,57 @@ def get_review(review_id):
 def list_reviews_by_product(product_id):
     query = (
         "SELECT id_review, rating_review, commentt, id_product, id_client, review_createdAt "
-        "FROM review WHERE id_product = %s ORDER BY review_createdAt DESC"
+        "FROM review WHERE id_product = %s ORDER BY review_createdAt DESC, id_review DESC"
     )
     return get_db_manager().execute_query(query, (product_id,), fetch_all=True)
 
 
+def search_reviews(conditions, params, order_by, limit=None):
+    """One page of reviews matching `conditions` (keyset pagination: the
+    cursor condition is one of `conditions`)."""
+    query = (
+        "SELECT id_review, rating_review, commentt, id_product, id_client, review_createdAt "
+        "FROM review"
+    )
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {order_by}"
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    return get_db_manager().execute_query(query, list(params), fetch_all=True)
+
+
+def _histogram(rows):
+    histogram = dict.fromkeys(STARS, 0)
+    for row in rows or []:
+        if row["stars"] in histogram:
+            histogram[row["stars"]] = int(row["review_count"])
+    return histogram
+
+
+def get_rating_histogram(product_id):
+    """{stars: review count} of `product_id` for 1-5 stars, from the
+    maintained histogram. None if the table does not exist."""
+    query = "SELECT stars, review_count FROM product_rating_histogram WHERE id_product = %s"
+    try:
+        rows = get_db_manager().execute_query(query, (product_id,), fetch_all=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+    return _histogram(rows)
+
+
+def count_reviews_by_rating(product_id):
+    """{stars: review count} of `product_id` counted from the reviews."""
+    query = (
+        "SELECT rating_review AS stars, COUNT(*) AS review_count FROM review "
+        "WHERE id_product = %s GROUP BY rating_review"
+    )
+    rows = get_db_manager().execute_query(query, (product_id,), fetch_all=True)
+    return _histogram(rows)
+
+
 def list_reviews_by_client(client_id):
     query = (
         "SELECT id_review, rating_review, commentt, id_product, id_client, review_createdAt "
@@ -41,12 +140,37 @@ def update_review(review_id, fields):
     assignments = ", ".join(f"{key} = %s" for key in fields.keys())
     params = list(fields.values()) + [review_id]
     query = f"UPDATE review SET {assignments} WHERE id_review = %s"
-    return get_db_manager().execute_query(query, params, commit=True)
+    if "rating_review" not in fields:
+        return get_db_manager().execute_query(query, params, commit=True)
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        review = _locked_review(cursor, review_id)
+        cursor.execute(query, params)
+        if review:
+            _apply_rating(cursor, review["id_product"], fields["rating_review"] - (review["rating_review"] or 0), 0)
+            if fields["rating_review"] != review["rating_review"]:
+                _count_stars(cursor, review["id_product"], review["rating_review"], -1)
+                _count_stars(cursor, review["id_product"], fields["rating_review"], 1)
+    if review:
+        _rating_changed(review["id_product"])
+    return None
 
 
 def delete_review(review_id):
-    query = "DELETE FROM review WHERE id_review = %s"
-    return get_db_manager().execute_query(query, (review_id,), commit=True)
+    with get_db_manager().get_cursor(commit=True) as cursor:
+        review = _locked_review(cursor, review_id)
+        cursor.execute("DELETE FROM review WHERE id_review = %s", (review_id,))
+        if review:
+            _apply_rating(cursor, review["id_product"], -(review["rating_review"] or 0), -1)
+            _count_stars(cursor, review["id_product"], review["rating_review"], -1)
+    if review:
+        _rating_changed(review["id_product"])
+    return None
+
+
+def _rating_changed(product_id):
+    invalidate_product_caches(product_id)
+    search.products_changed([product_id])
+    seller_stats_dao.product_reviews_changed(product_id)
 
 
 def get_review_by_client_and_product(client_id, product_id):
@@ -55,10 +179,3 @@ def get_review_by_client_and_product(client_id, product_id):
         "FROM review WHERE id_client = %s AND id_product = %s"
     )
     return get_db_manager().execute_query(query, (client_id, product_id), fetch_one=True)
-
-
-def average_rating_for_product(product_id):
-    query = "SELECT AVG(rating_review) AS avg_rating FROM review WHERE id_product = %s"
-    row = get_db_manager().execute_query(query, (product_id,), fetch_one=True)
-    return row["avg_rating"] if row and row["avg_rating"] is not None else None
-
@@ -1,6 +1,9 @@
 from backend.database.connection import get_db_manager
+from backend.cache.read_through import read_through
+from backend.database.dao.catalog_versions import bump_version
 
 
+@read_through("seller_profile")
 def get_profile_by_user_id(user_id):
     query = (
         "SELECT id_seller_profile, id_user, shop_name, shop_description, verification_status "
@@ -14,9 +17,12 @@ def create_profile(user_id, shop_name, shop_description, status):
         "INSERT INTO seller_profile (id_user, shop_name, shop_description, verification_status) "
         "VALUES (%s, %s, %s, %s)"
     )
-    return get_db_manager().execute_query(
+    profile_id = get_db_manager().execute_query(
         query, (user_id, shop_name, shop_description, status), commit=True
     )
+    get_profile_by_user_id.invalidate(user_id)
+    bump_version("seller")
+    return profile_id
 
 
 def update_profile(user_id, fields):
@@ -25,7 +31,10 @@ def update_profile(user_id, fields):
     assignments = ", ".join(f"{key} = %s" for key in fields.keys())
     params = list(fields.values()) + [user_id]
     query = f"UPDATE seller_profile SET {assignments} WHERE id_user = %s"
-    return get_db_manager().execute_query(query, params, commit=True)
+    result = get_db_manager().execute_query(query, params, commit=True)
+    get_profile_by_user_id.invalidate(user_id)
+    bump_version("seller")
+    return result
 
 
 def count_pending_verifications():
@@ -33,3 +42,13 @@ def count_pending_verifications():
     row = get_db_manager().execute_query(query, fetch_one=True)
     return row["total"] if row else 0
 
+
+def list_profiles_by_user_ids(user_ids):
+    if not user_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(user_ids))
+    query = (
+        "SELECT id_seller_profile, id_user, shop_name, shop_description, verification_status "
+        f"FROM seller_profile WHERE id_user IN ({placeholders})"
+    )
+    return get_db_manager().execute_query(query, list(user_ids), fetch_all=True)
@@ -0,0 +1,158 @@
+from mysql.connector import errorcode, Error as MySQLError
+from backend.config import Config
+from backend.database.connection import get_db_manager
+
+STATS_COLUMNS = (
+    "total_products", "total_orders", "pending_orders", "delivered_orders",
+    "total_revenue", "average_rating",
+)
+
+# Average of the per-product average ratings of a seller's reviewed
+# products, from the review aggregates kept on product (migration 0007).
+_AVERAGE_RATING = "AVG(CASE WHEN rating_count > 0 THEN rating_sum / rating_count END)"
+
+# Every counter of one seller (params: seller_id x2), grouped in SQL.
+_STATS_QUERY = (
+    "SELECT pc.total_products, pc.average_rating, oc.total_orders, oc.pending_orders, "
+    "oc.delivered_orders, oc.total_revenue FROM ("
+    f"SELECT COUNT(*) AS total_products, {_AVERAGE_RATING} AS average_rating "
+    "FROM product WHERE id_seller = %s"
+    ") pc CROSS JOIN ("
+    "SELECT COUNT(*) AS total_orders, "
+    "COALESCE(SUM(o.order_status = 'processing'), 0) AS pending_orders, "
+    "COALESCE(SUM(o.order_status = 'delivered'), 0) AS delivered_orders, "
+    "COALESCE(SUM(CASE WHEN o.order_status = 'delivered' THEN so.revenue ELSE 0 END), 0) AS total_revenue "
+    "FROM (SELECT oi.id_order, SUM(COALESCE(oi.order_item_price, 0) * oi.order_item_quantity) AS revenue "
+    "FROM order_item oi JOIN product ip ON ip.id_product = oi.id_product "
+    "WHERE ip.id_seller = %s GROUP BY oi.id_order) so "
+    "JOIN orders o ON o.id_order = so.id_order"
+    ") oc"
+)
+
+# Revenue of each seller in one order (params: order_id).
+_ORDER_SELLERS = (
+    "SELECT p.id_seller, SUM(COALESCE(oi.order_item_price, 0) * oi.order_item_quantity) AS revenue "
+    "FROM order_item oi JOIN product p ON p.id_product = oi.id_product "
+    "WHERE oi.id_order = %s GROUP BY p.id_seller"
+)
+
+
+def materialized_enabled():
+    return Config.SELLER_STATS_MODE == "materialized"
+
+
+def compute_seller_stats(seller_id):
+    """Counters of `seller_id` computed from the tables (one grouped query)."""
+    return get_db_manager().execute_query(
+        _STATS_QUERY, (seller_id, seller_id), fetch_one=True
+    )
+
+
+def get_seller_stats_row(seller_id):
+    """Materialized row of `seller_id`, or None (no row, or no table)."""
+    query = f"SELECT id_seller, {', '.join(STATS_COLUMNS)} FROM seller_stats WHERE id_seller = %s"
+    try:
+        return get_db_manager().execute_query(query, (seller_id,), fetch_one=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+
+
+def save_seller_stats(seller_id, stats):
+    """Store freshly computed counters as the row of `seller_id`."""
+    query = (
+        f"REPLACE INTO seller_stats (id_seller, {', '.join(STATS_COLUMNS)}, updatedAt) "
+        f"VALUES (%s, {', '.join(['%s'] * len(STATS_COLUMNS))}, NOW())"
+    )
+    params = [seller_id] + [stats[column] for column in STATS_COLUMNS]
+    try:
+        return get_db_manager().execute_query(query, params, commit=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+
+
+def _apply(cursor, query, params):
+    """Run a counter update in the caller's transaction (no-op without the table)."""
+    try:
+        if cursor is not None:
+            cursor.execute(query, params)
+            return None
+        return get_db_manager().execute_query(query, params, commit=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+
+
+# Incremental updates: only sellers that already have a row are updated;
+# a missing row is computed in full on the next read.
+
+def order_created(order_id, cursor=None):
+    """A new (processing) order: +1 order and pending order for each of its sellers."""
+    if not materialized_enabled():
+        return None
+    query = (
+        "UPDATE seller_stats s "
+        f"JOIN ({_ORDER_SELLERS}) os ON os.id_seller = s.id_seller "
+        "SET s.total_orders = s.total_orders + 1, s.pending_orders = s.pending_orders + 1, "
+        "s.updatedAt = NOW()"
+    )
+    return _apply(cursor, query, (order_id,))
+
+
+def order_status_changed(order_id, old_status, new_status, cursor=None):
+    """Move the order between the pending/delivered counters (and revenue)
+    of each of its sellers."""
+    if not materialized_enabled() or old_status == new_status:
+        return None
+    pending = int(new_status == "processing") - int(old_status == "processing")
+    delivered = int(new_status == "delivered") - int(old_status == "delivered")
+    query = (
+        "UPDATE seller_stats s "
+        f"JOIN ({_ORDER_SELLERS}) os ON os.id_seller = s.id_seller "
+        "SET s.pending_orders = s.pending_orders + %s, "
+        "s.delivered_orders = s.delivered_orders + %s, "
+        "s.total_revenue = s.total_revenue + %s * os.revenue, s.updatedAt = NOW()"
+    )
+    return _apply(cursor, query, (order_id, pending, delivered, delivered))
+
+
+def product_added(seller_id, cursor=None):
+    if not materialized_enabled():
+        return None
+    query = (
+        "UPDATE seller_stats SET total_products = total_products + 1, updatedAt = NOW() "
+        "WHERE id_seller = %s"
+    )
+    return _apply(cursor, query, (seller_id,))
+
+
+def product_deleting(product_id, cursor=None):
+    """Run before deleting `product_id`, in the same transaction."""
+    if not materialized_enabled():
+        return None
+    query = (
+        "UPDATE seller_stats s JOIN product p ON p.id_seller = s.id_seller "
+        "SET s.total_products = s.total_products - 1, s.updatedAt = NOW() "
+        "WHERE p.id_product = %s"
+    )
+    return _apply(cursor, query, (product_id,))
+
+
+def product_reviews_changed(product_id):
+    """Recompute the average rating of the seller of `product_id`."""
+    if not materialized_enabled():
+        return None
+    product = get_db_manager().execute_query(
+        "SELECT id_seller FROM product WHERE id_product = %s", (product_id,), fetch_one=True
+    )
+    if not product or product["id_seller"] is None:
+        return None
+    query = (
+        f"UPDATE seller_stats SET average_rating = (SELECT {_AVERAGE_RATING} FROM product WHERE id_seller = %s), "
+        "updatedAt = NOW() WHERE id_seller = %s"
+    )
+    return _apply(None, query, (product["id_seller"], product["id_seller"]))
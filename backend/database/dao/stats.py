@@ -0,0 +1,127 @@
+from mysql.connector import errorcode, Error as MySQLError
+from backend.config import Config
+from backend.database.connection import get_db_manager
+
+# Counters maintained incrementally in `dashboard_counter` (migration 0004),
+# with the aggregate that recomputes each of them.
+COUNTER_QUERIES = {
+    "total_products": "SELECT COUNT(*) FROM product",
+    "total_orders": "SELECT COUNT(*) FROM orders",
+    "pending_orders": "SELECT COUNT(*) FROM orders WHERE order_status = 'processing'",
+}
+
+# Row of `dashboard_counter` present while the counters are kept current.
+# Writers running in another mode delete it (once per process), and the next
+# incremental read re-seeds the counters: switching the mode on later never
+# serves the totals left from before.
+MAINTAINED_MARKER = "maintained"
+_marker_cleared = False
+
+# Counters always computed on read (small tables, or indexed filters).
+_LIVE_COUNTERS = {
+    "total_users": "SELECT COUNT(*) FROM users",
+    "total_clients": "SELECT COUNT(*) FROM users WHERE rolee = 'client'",
+    "total_sellers": "SELECT COUNT(*) FROM users WHERE rolee = 'seller'",
+    "total_categories": "SELECT COUNT(*) FROM category",
+    "pending_seller_verifications": (
+        "SELECT COUNT(*) FROM seller_profile WHERE verification_status = 'pending'"
+    ),
+}
+
+
+def incremental_enabled():
+    return Config.DASHBOARD_STATS_MODE == "incremental"
+
+
+def _select(counters):
+    return "SELECT " + ", ".join(f"({query}) AS {name}" for name, query in counters.items())
+
+
+def _as_ints(row):
+    return {name: None if value is None else int(value) for name, value in row.items()}
+
+
+def dashboard_counts():
+    """Every dashboard counter, computed by one aggregate query."""
+    row = get_db_manager().execute_query(_select({**_LIVE_COUNTERS, **COUNTER_QUERIES}), fetch_one=True)
+    return _as_ints(row)
+
+
+def dashboard_counts_incremental():
+    """Dashboard counters in one query, the order and product ones read from
+    `dashboard_counter`. None if the table does not exist; a counter missing
+    from the table is None, and all of them are when the counters were not
+    kept current (no MAINTAINED_MARKER row)."""
+    stored = {
+        name: f"SELECT value FROM dashboard_counter WHERE name = '{name}'"
+        for name in (*COUNTER_QUERIES, MAINTAINED_MARKER)
+    }
+    try:
+        row = get_db_manager().execute_query(_select({**_LIVE_COUNTERS, **stored}), fetch_one=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+    counts = _as_ints(row)
+    if counts.pop(MAINTAINED_MARKER) is None:
+        # Compteurs non tenus à jour depuis le dernier calcul : à recalculer
+        for name in COUNTER_QUERIES:
+            counts[name] = None
+    return counts
+
+
+def resync_counters():
+    """Recompute the stored counters from the tables (and mark them kept
+    current from now on)."""
+    query = "REPLACE INTO dashboard_counter (name, value) " + " UNION ALL ".join(
+        [f"SELECT '{name}', ({count})" for name, count in COUNTER_QUERIES.items()]
+        + [f"SELECT '{MAINTAINED_MARKER}', 1"]
+    )
+    return get_db_manager().execute_query(query, commit=True)
+
+
+def adjust_counters(deltas, cursor=None):
+    """Add `deltas` ({name: delta}) to the stored counters.
+
+    Only in DASHBOARD_STATS_MODE=incremental; in the other modes the first
+    call of the process deletes MAINTAINED_MARKER instead, so the counters
+    are re-seeded when incremental mode is switched on. With `cursor`, runs
+    in the caller's transaction, so the counters commit or roll back with
+    the write they count; hot paths (checkout) call it without `cursor`
+    after their commit instead, so the counter rows are locked only for the
+    length of their own UPDATE.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return None
+    if not incremental_enabled():
+        return _clear_marker(cursor)
+    query = "UPDATE dashboard_counter SET value = value + %s WHERE name = %s"
+    params = [(delta, name) for name, delta in deltas.items()]
+    try:
+        if cursor is not None:
+            for values in params:
+                cursor.execute(query, values)
+            return None
+        return get_db_manager().execute_many(query, params, commit=True)
+    except MySQLError as error:
+        if error.errno == errorcode.ER_NO_SUCH_TABLE:
+            return None
+        raise
+
+
+def _clear_marker(cursor=None):
+    global _marker_cleared
+    if _marker_cleared:
+        return None
+    query = "DELETE FROM dashboard_counter WHERE name = %s"
+    try:
+        if cursor is not None:
+            cursor.execute(query, (MAINTAINED_MARKER,))
+        else:
+            get_db_manager().execute_query(query, (MAINTAINED_MARKER,), commit=True)
+    except MySQLError as error:
+        if error.errno != errorcode.ER_NO_SUCH_TABLE:
+            raise
+    _marker_cleared = True
+    return None
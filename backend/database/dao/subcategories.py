@@ -1,4 +1,6 @@
 from backend.database.connection import get_db_manager
+from backend.database.dao.catalog_versions import bump_version
+from backend.database.dao.categories import TREE_VERSION
 
 
 def create_subcategory(name, category_id, description):
@@ -6,7 +8,9 @@ def create_subcategory(name, category_id, description):
         "INSERT INTO SubCategory (SubCategory_name, id_category, SubCategory_description) "
         "VALUES (%s, %s, %s)"
     )
-    return get_db_manager().execute_query(query, (name, category_id, description), commit=True)
+    subcategory_id = get_db_manager().execute_query(query, (name, category_id, description), commit=True)
+    bump_version(TREE_VERSION)
+    return subcategory_id
 
 
 def list_subcategories():
@@ -47,9 +51,24 @@ def update_subcategory(subcategory_id, fields):
     assignments = ", ".join(f"{key} = %s" for key in fields.keys())
     params = list(fields.values()) + [subcategory_id]
     query = f"UPDATE SubCategory SET {assignments} WHERE id_SubCategory = %s"
-    return get_db_manager().execute_query(query, params, commit=True)
+    result = get_db_manager().execute_query(query, params, commit=True)
+    bump_version(TREE_VERSION)
+    return result
 
 
 def delete_subcategory(subcategory_id):
     query = "DELETE FROM SubCategory WHERE id_SubCategory = %s"
-    return get_db_manager().execute_query(query, (subcategory_id,), commit=True)
+    result = get_db_manager().execute_query(query, (subcategory_id,), commit=True)
+    bump_version(TREE_VERSION)
+    return result
+
+
+def list_subcategories_by_ids(subcategory_ids):
+    if not subcategory_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(subcategory_ids))
+    query = (
+        "SELECT id_SubCategory, SubCategory_name, id_category, SubCategory_description "
+        f"FROM SubCategory WHERE id_SubCategory IN ({placeholders})"
+    )
+    return get_db_manager().execute_query(query, list(subcategory_ids), fetch_all=True)
@@ -1,4 +1,7 @@
 from backend.database.connection import get_db_manager
+from backend.cache.read_through import read_through
+from backend.database.dao.seller_profiles import get_profile_by_user_id
+from backend.database.dao.catalog_versions import bump_version
 
 
 def get_user_by_email(email):
@@ -9,6 +12,8 @@ def get_user_by_email(email):
     return get_db_manager().execute_query(query, (email,), fetch_one=True)
 
 
+# Rows include the password hash: kept out of the shared cache backend.
+@read_through("user", shared=False)
 def get_user_by_id(user_id):
     query = (
         "SELECT id_user, full_name, email, pass_word, rolee, phone, adress, createdAT "
@@ -25,6 +30,17 @@ def list_users():
     return get_db_manager().execute_query(query, fetch_all=True)
 
 
+def search_users(conditions, params, order_by, limit=None):
+    """Rows of ``list_users`` matching `conditions` (keyset batches)."""
+    query = "SELECT id_user, full_name, email, rolee, phone, adress, createdAT FROM users"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {order_by}"
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    return get_db_manager().execute_query(query, list(params), fetch_all=True)
+
+
 def list_users_by_role(role):
     query = (
         "SELECT id_user, full_name, email, rolee, phone, adress, createdAT "
@@ -49,12 +65,19 @@ def update_user(user_id, fields):
     assignments = ", ".join(f"{key} = %s" for key in fields.keys())
     params = list(fields.values()) + [user_id]
     query = f"UPDATE users SET {assignments} WHERE id_user = %s"
-    return get_db_manager().execute_query(query, params, commit=True)
+    result = get_db_manager().execute_query(query, params, commit=True)
+    get_user_by_id.invalidate(user_id)
+    bump_version("seller")
+    return result
 
 
 def delete_user(user_id):
     query = "DELETE FROM users WHERE id_user = %s"
-    return get_db_manager().execute_query(query, (user_id,), commit=True)
+    result = get_db_manager().execute_query(query, (user_id,), commit=True)
+    get_user_by_id.invalidate(user_id)
+    get_profile_by_user_id.invalidate(user_id)
+    bump_version("seller")
+    return result
 
 
 def count_users():
@@ -68,3 +91,13 @@ def count_users_by_role(role):
     row = get_db_manager().execute_query(query, (role,), fetch_one=True)
     return row["total"] if row else 0
 
+
+def list_users_by_ids(user_ids):
+    if not user_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(user_ids))
+    query = (
+        "SELECT id_user, full_name, email, rolee, phone, adress, createdAT "
+        f"FROM users WHERE id_user IN ({placeholders})"
+    )
+    return get_db_manager().execute_query(query, list(user_ids), fetch_all=True)
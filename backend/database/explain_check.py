@@ -0,0 +1,147 @@
+"""Run EXPLAIN on the DAO read queries and flag full table scans.
+
+The DAO functions are called for real with sample arguments while a recording
+manager stands in for the global ``DatabaseManager``: every SELECT they issue
+is sent to MySQL as ``EXPLAIN <query>`` instead, so the check always covers
+the SQL the DAO layer actually runs.
+
+A plan step fails when MySQL reads a whole table (``type = ALL``) without any
+usable index (``possible_keys`` empty). Plans that have a usable index but
+still choose a scan (common on tiny development tables) are only reported.
+"""
+from backend.database import connection
+from backend.database.dao import cart as cart_dao
+from backend.database.dao import catalog_versions as catalog_versions_dao
+from backend.database.dao import categories as categories_dao
+from backend.database.dao import orders as orders_dao
+from backend.database.dao import payment_cards as payment_cards_dao
+from backend.database.dao import payments as payments_dao
+from backend.database.dao import product_images as images_dao
+from backend.database.dao import products as products_dao
+from backend.database.dao import reviews as reviews_dao
+from backend.database.dao import seller_profiles as seller_profiles_dao
+from backend.database.dao import seller_stats as seller_stats_dao
+from backend.database.dao import stats as stats_dao
+from backend.database.dao import subcategories as subcategories_dao
+from backend.database.dao import users as users_dao
+from backend.database.dao import wishlist as wishlist_dao
+
+
+class _ExplainingManager:
+    """Answers DAO reads with their EXPLAIN plan; skips writes."""
+
+    def __init__(self, db):
+        self._db = db
+        self.plans = []
+
+    def execute_query(self, query, params=None, fetch_one=False, fetch_all=False, commit=False):
+        if commit or not query.lstrip().upper().startswith("SELECT"):
+            return None
+        self.plans.append(self._db.execute_query("EXPLAIN " + query, params, fetch_all=True))
+        return [] if fetch_all else None
+
+
+# (label, DAO call, whole-table read is intended)
+CHECKS = [
+    ("cart.get_cart_by_client", lambda: cart_dao.get_cart_by_client.uncached(1), False),
+    ("cart.list_cart_rows", lambda: cart_dao.list_cart_rows(1), False),
+    ("cart.get_cart_summary", lambda: cart_dao.get_cart_summary.uncached(1), False),
+    ("cart.list_cart_items", lambda: cart_dao.list_cart_items(1), False),
+    ("cart.list_cart_stock", lambda: cart_dao.list_cart_stock(1, [1, 2]), False),
+    ("cart.get_cart_item_by_product", lambda: cart_dao.get_cart_item_by_product(1, 1), False),
+    ("catalog_versions.get_version", lambda: catalog_versions_dao.get_version("category_tree"), False),
+    ("catalog_versions.get_versions", lambda: catalog_versions_dao.get_versions(["product", "seller"]), False),
+    ("categories.list_categories", categories_dao.list_categories, True),
+    ("categories.get_category_by_name", lambda: categories_dao.get_category_by_name("x"), False),
+    ("categories.list_category_tree_rows", categories_dao.list_category_tree_rows, True),
+    ("categories.list_categories_by_ids", lambda: categories_dao.list_categories_by_ids([1, 2]), False),
+    ("orders.get_order", lambda: orders_dao.get_order(1), False),
+    ("orders.list_orders_by_client", lambda: orders_dao.list_orders_by_client(1), False),
+    ("orders.list_orders_all", orders_dao.list_orders_all, True),
+    ("orders.list_orders_by_ids", lambda: orders_dao.list_orders_by_ids([1, 2]), False),
+    ("orders.list_order_items", lambda: orders_dao.list_order_items(1), False),
+    ("orders.list_order_items_by_orders", lambda: orders_dao.list_order_items_by_orders([1, 2]), False),
+    ("orders.list_order_items_by_products", lambda: orders_dao.list_order_items_by_products([1, 2]), False),
+    ("orders.client_has_purchased_product", lambda: orders_dao.client_has_purchased_product(1, 1), False),
+    ("payment_cards.list_payment_cards_by_client", lambda: payment_cards_dao.list_payment_cards_by_client(1), False),
+    ("payments.get_payment_by_order", lambda: payments_dao.get_payment_by_order(1), False),
+    ("payments.list_payments_by_orders", lambda: payments_dao.list_payments_by_orders([1, 2]), False),
+    ("product_images.list_images_by_product", lambda: images_dao.list_images_by_product(1), False),
+    ("product_images.list_images_by_products", lambda: images_dao.list_images_by_products([1, 2]), False),
+    ("products.get_product", lambda: products_dao.get_product.uncached(1), False),
+    ("products.list_products", products_dao.list_products, True),
+    ("products.list_products_by_seller", lambda: products_dao.list_products_by_seller(1), False),
+    ("products.list_products_by_ids", lambda: products_dao.list_products_by_ids([1, 2]), False),
+    ("products.search_products[category,price]", lambda: products_dao.search_products(
+        ["id_category IN (%s)", "price BETWEEN %s AND %s"], [1, 10, 100],
+        order_by="price ASC", limit=24, offset=0), False),
+    ("products.search_products[seller,newest]", lambda: products_dao.search_products(
+        ["id_seller = %s"], [1], order_by="createdAtt DESC", limit=24, offset=0), False),
+    ("products.search_products[rating]", lambda: products_dao.search_products(
+        ["rating >= %s"], [4.0], order_by="rating DESC", limit=24, offset=0), False),
+    ("products.count_products[category]", lambda: products_dao.count_products(
+        ["id_category IN (%s)"], [1]), False),
+    ("products.get_top_sellers_by_product_count", products_dao.get_top_sellers_by_product_count, True),
+    ("orders.search_orders", lambda: orders_dao.search_orders(
+        ["order_status IN (%s)"], ["processing"], "order_createdAt DESC, id_order DESC", 25), False),
+    ("orders.search_orders (client)", lambda: orders_dao.search_orders(
+        ["id_client = %s"], [1], "order_createdAt DESC, id_order DESC", 25), False),
+    ("orders.search_orders (seller)", lambda: orders_dao.search_orders(
+        [orders_dao.seller_orders_condition(1)[0]], [1], "order_createdAt DESC, id_order DESC", 25), False),
+    ("orders.list_seller_order_items", lambda: orders_dao.list_seller_order_items(1, [1, 2]), False),
+    ("reviews.list_reviews_by_product", lambda: reviews_dao.list_reviews_by_product(1), False),
+    ("reviews.search_reviews", lambda: reviews_dao.search_reviews(
+        ["id_product = %s"], [1], "review_createdAt DESC, id_review DESC", 25), False),
+    ("reviews.get_rating_histogram", lambda: reviews_dao.get_rating_histogram(1), False),
+    ("reviews.list_reviews_by_client", lambda: reviews_dao.list_reviews_by_client(1), False),
+    ("reviews.get_review_by_client_and_product", lambda: reviews_dao.get_review_by_client_and_product(1, 1), False),
+    ("seller_profiles.get_profile_by_user_id", lambda: seller_profiles_dao.get_profile_by_user_id.uncached(1), False),
+    ("seller_profiles.list_profiles_by_user_ids", lambda: seller_profiles_dao.list_profiles_by_user_ids([1, 2]), False),
+    ("seller_profiles.count_pending_verifications", seller_profiles_dao.count_pending_verifications, False),
+    ("seller_stats.compute_seller_stats", lambda: seller_stats_dao.compute_seller_stats(1), False),
+    ("seller_stats.get_seller_stats_row", lambda: seller_stats_dao.get_seller_stats_row(1), False),
+    ("stats.dashboard_counts", stats_dao.dashboard_counts, True),
+    ("stats.dashboard_counts_incremental", stats_dao.dashboard_counts_incremental, True),
+    ("subcategories.list_subcategories", subcategories_dao.list_subcategories, True),
+    ("subcategories.list_subcategories_by_category", lambda: subcategories_dao.list_subcategories_by_category(1), False),
+    ("subcategories.get_subcategory_by_name", lambda: subcategories_dao.get_subcategory_by_name("x"), False),
+    ("subcategories.list_subcategories_by_ids", lambda: subcategories_dao.list_subcategories_by_ids([1, 2]), False),
+    ("users.get_user_by_email", lambda: users_dao.get_user_by_email("x@example.com"), False),
+    ("users.get_user_by_id", lambda: users_dao.get_user_by_id.uncached(1), False),
+    ("users.list_users", users_dao.list_users, True),
+    ("users.search_users (stream batch)", lambda: users_dao.search_users(
+        ["id_user < %s"], [1000], "id_user DESC", 500), False),
+    ("users.list_users_by_role", lambda: users_dao.list_users_by_role("seller"), False),
+    ("users.list_users_by_ids", lambda: users_dao.list_users_by_ids([1, 2]), False),
+    ("users.count_users_by_role", lambda: users_dao.count_users_by_role("seller"), False),
+    ("wishlist.get_wishlist_by_client", lambda: wishlist_dao.get_wishlist_by_client(1), False),
+    ("wishlist.is_product_in_wishlist", lambda: wishlist_dao.is_product_in_wishlist(1, 1), False),
+]
+
+
+def run_explain_check(db=None, log=print):
+    """EXPLAIN every entry of CHECKS; return the list of failing labels."""
+    db = db or connection.get_db_manager()
+    failures = []
+    previous = connection._db_manager
+    for label, call, full_read_ok in CHECKS:
+        recorder = _ExplainingManager(db)
+        connection._db_manager = recorder
+        try:
+            call()
+        finally:
+            connection._db_manager = previous
+        for plan in recorder.plans:
+            for step in plan or []:
+                if step.get("type") != "ALL":
+                    continue
+                table = step.get("table")
+                if full_read_ok:
+                    status = "ok (full read)"
+                elif step.get("possible_keys"):
+                    status = "warn (scan chosen over " + step["possible_keys"] + ")"
+                else:
+                    status = "FAIL (full table scan, no usable index)"
+                    failures.append(label)
+                log(f"{label}: {table} {status}")
+    return failures
@@ -0,0 +1,48 @@
+-- Indexes for the filters and sorts used by backend/database/dao/.
+-- Foreign-key columns (product.id_seller, product.id_category,
+-- order_item.id_product, orders.id_client, review.id_product,
+-- product_image.id_product, ...) already get an implicit InnoDB index, and
+-- users.email is UNIQUE; the indexes below add the sort columns on top so
+-- lookups can also skip the filesort. InnoDB appends the primary key to every
+-- secondary index, so (col) also serves ORDER BY col, id.
+
+-- products.search_products / count_products: sort keys and range filters
+CREATE INDEX idx_product_created ON product (createdAtt);
+CREATE INDEX idx_product_price ON product (price);
+CREATE INDEX idx_product_rating ON product (rating);
+CREATE INDEX idx_product_name ON product (product_name);
+CREATE INDEX idx_product_brand ON product (brand);
+CREATE INDEX idx_product_category_price ON product (id_category, price);
+CREATE INDEX idx_product_seller_created ON product (id_seller, createdAtt);
+
+-- orders.list_orders_by_client / list_orders_all
+CREATE INDEX idx_orders_client_created ON orders (id_client, order_createdAt);
+CREATE INDEX idx_orders_created ON orders (order_createdAt);
+CREATE INDEX idx_orders_status ON orders (order_status);
+
+-- orders.list_order_items_by_products / client_has_purchased_product (covering)
+CREATE INDEX idx_order_item_product_order ON order_item (id_product, id_order, order_item_quantity, order_item_price);
+
+-- reviews.list_reviews_by_product (+ covering for average_rating_for_product)
+-- and reviews.list_reviews_by_client
+CREATE INDEX idx_review_product_created ON review (id_product, review_createdAt, rating_review);
+CREATE INDEX idx_review_client_created ON review (id_client, review_createdAt);
+
+-- product_images.list_images_by_product(s)
+CREATE INDEX idx_product_image_product ON product_image (id_product, id_product_image);
+
+-- cart.get_cart_item_by_product
+CREATE INDEX idx_cart_item_cart_product ON cart_item (id_cart, id_product);
+
+-- users.list_users_by_role / count_users_by_role
+CREATE INDEX idx_users_role ON users (rolee);
+
+-- seller_profiles.count_pending_verifications
+CREATE INDEX idx_seller_profile_status ON seller_profile (verification_status);
+
+-- categories.get_category_by_name / subcategories.get_subcategory_by_name
+CREATE INDEX idx_category_name ON category (category_name);
+CREATE INDEX idx_subcategory_name ON SubCategory (SubCategory_name);
+
+-- wishlist.get_wishlist_by_client
+CREATE INDEX idx_wishlist_client_created ON wishlist (id_client, wishlist_createdAt);
@@ -0,0 +1,2 @@
+-- FULLTEXT index used by SEARCH_BACKEND=fulltext (backend/search/fulltext.py).
+CREATE FULLTEXT INDEX ft_product_text ON product (product_name, brand, product_description);
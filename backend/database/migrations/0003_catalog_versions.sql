@@ -0,0 +1,10 @@
+-- Version counters of catalog data (category_tree, product, product_image,
+-- seller), bumped by the DAO write functions. Workers compare them with the
+-- version of their in-memory snapshots, and conditional GETs derive their
+-- ETag / Last-Modified (updatedAt, UTC) from them.
+
+CREATE TABLE IF NOT EXISTS catalog_version (
+    name varchar(64) NOT NULL PRIMARY KEY,
+    version bigint NOT NULL DEFAULT 0,
+    updatedAt datetime NOT NULL
+);
@@ -0,0 +1,8 @@
+-- Admin order listing (orders.search_orders / iter_orders): each filter
+-- with the (order_createdAt, id_order) keyset sort, so a filtered page is
+-- an index range read. id_client already has idx_orders_client_created.
+-- (order_status, order_createdAt) replaces idx_orders_status.
+
+CREATE INDEX idx_orders_status_created ON orders (order_status, order_createdAt);
+CREATE INDEX idx_orders_payment_created ON orders (payment_status, order_createdAt);
+DROP INDEX idx_orders_status ON orders;
@@ -0,0 +1,15 @@
+-- Materialized seller dashboard counters (SELLER_STATS_MODE=materialized).
+-- A seller's row is computed in full on its first read, then kept current
+-- by the order, product and review DAO writes (dao/seller_stats.py).
+
+CREATE TABLE IF NOT EXISTS seller_stats (
+    id_seller int NOT NULL PRIMARY KEY,
+    total_products int NOT NULL DEFAULT 0,
+    total_orders int NOT NULL DEFAULT 0,
+    pending_orders int NOT NULL DEFAULT 0,
+    delivered_orders int NOT NULL DEFAULT 0,
+    total_revenue decimal(14,4) NOT NULL DEFAULT 0,
+    average_rating decimal(6,4) NULL,
+    updatedAt datetime NOT NULL,
+    FOREIGN KEY (id_seller) REFERENCES users(id_user) ON DELETE CASCADE
+);
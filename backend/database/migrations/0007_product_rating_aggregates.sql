@@ -0,0 +1,15 @@
+-- Running review aggregates on product: the review DAO writes add to them in
+-- the review's transaction, and product.rating is derived from them
+-- (rating_sum / rating_count). They are filled from the existing reviews
+-- here, before any review write adds to them; on a large review table
+-- `python init_db.py --backfill-ratings` recomputes them in batches.
+
+ALTER TABLE product ADD COLUMN rating_sum int NOT NULL DEFAULT 0;
+ALTER TABLE product ADD COLUMN rating_count int NOT NULL DEFAULT 0;
+
+UPDATE product p
+JOIN (
+    SELECT id_product, SUM(rating_review) AS rating_total, COUNT(*) AS reviews
+    FROM review GROUP BY id_product
+) r ON r.id_product = p.id_product
+SET p.rating_sum = r.rating_total, p.rating_count = r.reviews;
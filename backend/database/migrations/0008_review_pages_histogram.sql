@@ -0,0 +1,23 @@
+-- reviews.search_reviews pages a product's reviews by (review_createdAt,
+-- id_review): this index serves the whole ORDER BY, so MySQL reads only the
+-- page. It replaces idx_review_product_created, whose rating_review column
+-- (covering for the former AVG recompute) broke ties out of id_review order.
+CREATE INDEX idx_review_product_page ON review (id_product, review_createdAt, id_review);
+DROP INDEX idx_review_product_created ON review;
+
+-- Review count of each product per star rating (1-5), kept current by the
+-- review DAO writes. Filled from the existing reviews below, before any
+-- review write adds to it (`python init_db.py --backfill-ratings` recomputes
+-- it in batches).
+CREATE TABLE IF NOT EXISTS product_rating_histogram (
+    id_product int NOT NULL,
+    stars tinyint NOT NULL,
+    review_count int NOT NULL DEFAULT 0,
+    PRIMARY KEY (id_product, stars),
+    FOREIGN KEY (id_product) REFERENCES product(id_product) ON DELETE CASCADE
+);
+
+REPLACE INTO product_rating_histogram (id_product, stars, review_count)
+SELECT id_product, rating_review, COUNT(*) FROM review
+WHERE rating_review BETWEEN 1 AND 5
+GROUP BY id_product, rating_review;
@@ -0,0 +1,17 @@
+-- Responses of POST requests sent with an Idempotency-Key header
+-- (backend/middleware/idempotency.py). A row without status_code is a
+-- request still running; expiresAt is short while it runs, then
+-- IDEMPOTENCY_TTL after it completed. Expired rows are purged by the app.
+
+CREATE TABLE IF NOT EXISTS idempotency_key (
+    id_user int NOT NULL,
+    idem_key varchar(255) NOT NULL,
+    request_hash char(64) NOT NULL,
+    status_code smallint NULL,
+    content_type varchar(100) NULL,
+    response_body mediumblob NULL,
+    createdAt datetime NOT NULL,
+    expiresAt datetime NOT NULL,
+    PRIMARY KEY (id_user, idem_key),
+    KEY idx_idempotency_key_expires (expiresAt)
+);
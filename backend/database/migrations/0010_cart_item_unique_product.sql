@@ -0,0 +1,17 @@
+-- One cart_item row per product of a cart, so cart.add_cart_items can add
+-- quantities with INSERT ... ON DUPLICATE KEY UPDATE. Existing duplicate
+-- lines are merged into the oldest one first.
+
+UPDATE cart_item ci JOIN (
+    SELECT MIN(id_cart_item) AS keep_id, SUM(quantity) AS total_quantity
+    FROM cart_item GROUP BY id_cart, id_product HAVING COUNT(*) > 1
+) dup ON dup.keep_id = ci.id_cart_item
+SET ci.quantity = dup.total_quantity;
+
+DELETE ci FROM cart_item ci JOIN (
+    SELECT id_cart, id_product, MIN(id_cart_item) AS keep_id
+    FROM cart_item GROUP BY id_cart, id_product HAVING COUNT(*) > 1
+) dup ON dup.id_cart = ci.id_cart AND dup.id_product = ci.id_product
+    AND ci.id_cart_item <> dup.keep_id;
+
+ALTER TABLE cart_item ADD UNIQUE KEY uq_cart_item_product (id_cart, id_product);
@@ -0,0 +1,21 @@
+-- Time-bounded stock holds placed when a client starts checkout
+-- (STOCK_RESERVATIONS=true, dao/reservations.py). product.reserved_stock is
+-- the sum of the product's holds, so the units a new hold or order may take
+-- are stock - reserved_stock. A hold is converted (deleted, stock taken) by
+-- the checkout that follows it, or released once expired.
+
+ALTER TABLE product ADD COLUMN reserved_stock int NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS stock_reservation (
+    id_reservation int PRIMARY KEY AUTO_INCREMENT,
+    id_client int NOT NULL,
+    id_product int NOT NULL,
+    quantity int NOT NULL,
+    createdAt datetime NOT NULL,
+    expiresAt datetime NOT NULL,
+    UNIQUE KEY uq_stock_reservation_client_product (id_client, id_product),
+    KEY idx_stock_reservation_expires (expiresAt),
+    KEY idx_stock_reservation_product (id_product, expiresAt),
+    FOREIGN KEY (id_client) REFERENCES users(id_user),
+    FOREIGN KEY (id_product) REFERENCES product(id_product) ON DELETE CASCADE
+);
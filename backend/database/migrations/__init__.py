@@ -0,0 +1,84 @@
+"""Versioned SQL migrations.
+
+Migrations are the numbered ``NNNN_description.sql`` files of this package,
+applied in order. Applied versions are recorded in ``schema_migrations`` so
+running the migrations again only applies the new ones. Errors meaning "this
+change is already there" (duplicate index/column, missing index to drop) are
+ignored, so a migration interrupted half-way can simply be re-run.
+"""
+import os
+import re
+from mysql.connector import errorcode, Error as MySQLError
+from backend.database.connection import get_db_manager
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+_FILENAME_RE = re.compile(r"^(\d{4})_([\w-]+)\.sql$")
+
+ALREADY_APPLIED_ERRORS = {
+    errorcode.ER_DUP_KEYNAME,
+    errorcode.ER_DUP_FIELDNAME,
+    errorcode.ER_CANT_DROP_FIELD_OR_KEY,
+    errorcode.ER_TABLE_EXISTS_ERROR,
+}
+
+
+def list_migrations():
+    """Return ``[(version, name, path)]`` sorted by version."""
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _FILENAME_RE.match(filename)
+        if match:
+            migrations.append((match.group(1), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return sorted(migrations)
+
+
+def split_statements(sql):
+    """Split a migration file into statements (``--`` comments stripped)."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def _ensure_table(db):
+    db.execute_query(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version varchar(16) primary key, "
+        "name varchar(255), "
+        "applied_at datetime)",
+        commit=True,
+    )
+
+
+def applied_versions(db=None):
+    db = db or get_db_manager()
+    _ensure_table(db)
+    rows = db.execute_query("SELECT version FROM schema_migrations", fetch_all=True)
+    return {row["version"] for row in rows or []}
+
+
+def apply_migrations(db=None, log=print):
+    """Apply every pending migration; return the list of applied versions."""
+    db = db or get_db_manager()
+    done = applied_versions(db)
+    applied = []
+    for version, name, path in list_migrations():
+        if version in done:
+            continue
+        with open(path, "r", encoding="utf-8") as handle:
+            statements = split_statements(handle.read())
+        log(f"Migration {version}_{name} ({len(statements)} statements)")
+        with db.get_cursor(commit=True) as cursor:
+            for statement in statements:
+                try:
+                    cursor.execute(statement)
+                    if cursor.with_rows:
+                        cursor.fetchall()
+                except MySQLError as error:
+                    if error.errno not in ALREADY_APPLIED_ERRORS:
+                        raise
+                    log(f"  already applied: {error.msg}")
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, NOW())",
+                (version, name),
+            )
+        applied.append(version)
+    return applied
@@ -0,0 +1,94 @@
+"""JSON encoding of API responses.
+
+:class:`FastJSONProvider` replaces Flask's default provider. It encodes the
+values coming straight from MySQL rows itself: ``datetime``/``date``/``time``
+as ISO 8601 strings, so serializers can hand over row values unconverted,
+and ``Decimal`` as a string, like Flask's default provider (serializers
+convert the amounts the API sends as numbers). ``orjson`` is used when it
+is installed (``JSON_BACKEND=auto``, the default) and the standard library
+otherwise.
+Keys are sorted like Flask's default provider, so responses keep the same
+shape and stable bytes whichever encoder runs.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+# Exact-type dispatch first: the encoder calls this once per value.
+_ENCODERS = {
+    Decimal: str,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    time: time.isoformat,
+    set: list,
+    frozenset: list,
+}
+
+
+def encode_default(value):
+    """Encode the non-JSON types found in DAO rows."""
+    encoder = _ENCODERS.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if hasattr(value, "keys") and hasattr(value, "__getitem__"):
+        # Read-only mappings (MappingProxyType) of cached snapshots
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using orjson when available."""
+
+    def __init__(self, app, backend="auto"):
+        super().__init__(app)
+        backend = (backend or "auto").lower()
+        if backend == "orjson" and orjson is None:
+            raise RuntimeError("JSON_BACKEND=orjson but the orjson package is not installed")
+        self.use_orjson = orjson is not None and backend in ("auto", "orjson")
+
+    def _pretty(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def _orjson_options(self, pretty=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.dumps(obj, default=encode_default, option=self._orjson_options()).decode("utf-8")
+        kwargs.setdefault("default", encode_default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def dumps_bytes(self, obj, pretty=None):
+        """Encoded ``obj`` as UTF-8 bytes (no str round trip with orjson).
+
+        ``pretty`` defaults to Flask's rule (indented in debug mode).
+        """
+        if pretty is None:
+            pretty = self._pretty()
+        if self.use_orjson:
+            return orjson.dumps(obj, default=encode_default, option=self._orjson_options(pretty))
+        if pretty:
+            return self.dumps(obj, indent=2).encode("utf-8")
+        return self.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
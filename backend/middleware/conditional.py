@@ -0,0 +1,56 @@
+from datetime import timezone
+from functools import wraps
+import hashlib
+from flask import request, make_response
+from backend.database.dao import catalog_versions as catalog_versions_dao
+
+
+def conditional_get(*signals):
+    """Décorateur : réponses conditionnelles (ETag / If-None-Match,
+    Last-Modified / If-Modified-Since) pour les GET publics du catalogue.
+
+    `signals` sont les compteurs `catalog_version` dont dépend la réponse
+    (incrémentés par les fonctions DAO d'écriture). Les valideurs sont
+    calculés avec une seule requête sur ces compteurs, avant d'appeler la
+    vue : un client à jour reçoit un 304 sans lecture ni sérialisation du
+    catalogue.
+
+    Une même URL peut renvoyer du JSON ou du NDJSON selon `Accept` : l'en-tête
+    entre dans l'ETag et les réponses portent `Vary: Accept`.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            versions = catalog_versions_dao.get_versions(signals)
+            if versions is None:
+                # Table catalog_version absente (migration 0003) : pas de cache
+                return f(*args, **kwargs)
+
+            state = ",".join(f"{name}={versions[name][0]}" for name in signals)
+            accept = request.headers.get("Accept", "")
+            etag = hashlib.sha1(f"{request.full_path}|{accept}|{state}".encode("utf-8")).hexdigest()
+            modified = [updated for _, updated in versions.values() if updated is not None]
+            last_modified = max(modified).replace(tzinfo=timezone.utc, microsecond=0) if modified else None
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = bool(since and last_modified and last_modified <= since)
+            if not_modified:
+                response = make_response("", 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.vary.add("Accept")
+            if last_modified:
+                response.last_modified = last_modified
+            # Les clients gardent la réponse mais la revalident à chaque fois
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return decorated
+
+    return decorator
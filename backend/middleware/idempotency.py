@@ -0,0 +1,200 @@
+"""Idempotency-Key support for POST endpoints that must not run twice
+(order creation, payments).
+
+A key is scoped to the authenticated user: ``(id_user, Idempotency-Key)``
+identifies one request, and the same key sent by another user is a
+different one. The request it stands for is the endpoint's scope name, its
+URL arguments and its body (hashed); reusing a key for another request
+gets a 422.
+
+The first request claims the key in the ``idempotency_key`` table
+(migration 0009) and runs. Every response other than a 5xx is then stored
+there for ``IDEMPOTENCY_TTL`` seconds: status code, content type and body
+(streamed responses are not stored), with recent ones also kept in a
+per-process LRU. Retries with the key get the stored response back
+(``Idempotent-Replayed: true``) without running the request again. A 5xx or
+an exception releases the key so a retry runs again.
+"""
+from collections import namedtuple
+from functools import wraps
+import hashlib
+import threading
+import time
+from flask import current_app, jsonify, make_response, request
+from mysql.connector import Error as MySQLError
+from backend.cache import get_cache, MISSING
+from backend.config import Config
+from backend.database.dao import idempotency_keys as keys_dao
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+StoredResponse = namedtuple("StoredResponse", ["request_hash", "status_code", "content_type", "body"])
+
+# Requêtes en cours dans ce processus : (id_user, clé) -> Event
+_running = {}
+_running_lock = threading.Lock()
+_PURGE_INTERVAL = 60
+_purged_at = 0.0
+
+
+def _cache():
+    return get_cache(
+        "idempotency", maxsize=Config.IDEMPOTENCY_CACHE_SIZE, ttl=Config.IDEMPOTENCY_CACHE_TTL
+    )
+
+
+def _request_hash(scope):
+    view_args = sorted((request.view_args or {}).items())
+    digest = hashlib.sha256(f"{scope}|{view_args}|".encode("utf-8"))
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(stored, request_hash):
+    if stored.request_hash != request_hash:
+        return jsonify({"message": "Idempotency-Key already used for a different request"}), 422
+    response = current_app.response_class(
+        stored.body, status=stored.status_code, mimetype=stored.content_type
+    )
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _stored(row):
+    return StoredResponse(
+        row["request_hash"], row["status_code"], row["content_type"], bytes(row["response_body"] or b"")
+    )
+
+
+def _maybe_purge():
+    global _purged_at
+    now = time.monotonic()
+    if now - _purged_at < _PURGE_INTERVAL:
+        return
+    _purged_at = now
+    try:
+        keys_dao.purge_expired_keys()
+    except MySQLError as error:
+        current_app.logger.warning("Purge des clés d'idempotence impossible : %s", error)
+
+
+def _execute(user_id, key, request_hash, handler):
+    """Run the request that claimed the key and store its response."""
+    cache_key = (user_id, key)
+    event = threading.Event()
+    with _running_lock:
+        _running[cache_key] = event
+    try:
+        try:
+            response = make_response(handler())
+        except Exception:
+            keys_dao.release_key(user_id, key)
+            raise
+        if response.status_code >= 500 or response.is_streamed:
+            # Échec : la clé est libérée, un nouvel essai exécute à nouveau
+            keys_dao.release_key(user_id, key)
+            return response
+        stored = StoredResponse(request_hash, response.status_code, response.mimetype, response.get_data())
+        try:
+            keys_dao.save_response(
+                user_id, key, stored.status_code, stored.content_type, stored.body, Config.IDEMPOTENCY_TTL
+            )
+        except MySQLError as error:
+            # La requête a réussi : sa réponse part quand même ; les doublons
+            # attendent jusqu'à l'expiration de la réservation.
+            current_app.logger.warning("Réponse idempotente non enregistrée : %s", error)
+            return response
+        _cache().set(cache_key, stored)
+        return response
+    finally:
+        with _running_lock:
+            _running.pop(cache_key, None)
+        event.set()
+
+
+def _wait_for(user_id, key, request_hash, deadline):
+    """Wait for the request holding the key to finish.
+
+    Returns its stored response, None if it failed (key released) or
+    MISSING once ``deadline`` has passed. Within the same process the wait
+    is on the running request's Event; otherwise the row is read again at
+    growing intervals.
+    """
+    cache_key = (user_id, key)
+    delay = 0.02
+    while True:
+        stored = _cache().get(cache_key)
+        if stored is not MISSING:
+            return stored
+        row = keys_dao.get_key(user_id, key)
+        if row is None:
+            return None
+        if row["status_code"] is not None or row["request_hash"] != request_hash:
+            stored = _stored(row)
+            if row["status_code"] is not None:
+                _cache().set(cache_key, stored)
+            return stored
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return MISSING
+        with _running_lock:
+            event = _running.get(cache_key)
+        if event is not None:
+            event.wait(remaining)
+        else:
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+
+
+def run_idempotent(scope, user_id, handler):
+    """Run `handler` once per Idempotency-Key header of `user_id`.
+
+    Any response other than a 5xx is stored in the `idempotency_key` table
+    (migration 0009), with an in-memory LRU in front: a retry with the same
+    key gets the stored response without running the request again. A
+    concurrent duplicate waits for the first run to finish (at most
+    IDEMPOTENCY_WAIT_TIMEOUT seconds, then 409). A key reused for another
+    request gets a 422. Without the header, or without the table, `handler`
+    is simply called.
+    """
+    key = (request.headers.get(HEADER) or "").strip()
+    if not key or user_id is None:
+        return handler()
+    if len(key) > MAX_KEY_LENGTH:
+        return jsonify({"message": f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters"}), 400
+
+    request_hash = _request_hash(scope)
+    deadline = time.monotonic() + Config.IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        stored = _cache().get((user_id, key))
+        if stored is not MISSING:
+            return _replay(stored, request_hash)
+        claimed = keys_dao.claim_key(user_id, key, request_hash, Config.IDEMPOTENCY_LOCK_TIMEOUT)
+        if claimed is None:
+            # Table idempotency_key absente (migration 0009)
+            return handler()
+        if claimed:
+            _maybe_purge()
+            return _execute(user_id, key, request_hash, handler)
+        stored = _wait_for(user_id, key, request_hash, deadline)
+        if stored is MISSING:
+            return jsonify({"message": "A request with this Idempotency-Key is still in progress"}), 409
+        if stored is not None:
+            return _replay(stored, request_hash)
+        # La première exécution a échoué : nouvel essai de réservation
+
+
+def idempotent(scope):
+    """Decorator: apply `run_idempotent` to a view behind `verify_token`
+    (keys are scoped to the token's user)."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            user = getattr(request, "user", None) or {}
+            user_id = user.get('id') or user.get('id_user')
+            return run_idempotent(scope, user_id, lambda: f(*args, **kwargs))
+
+        return decorated
+
+    return decorator
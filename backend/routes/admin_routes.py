@@ -1,4 +1,4 @@
-from flask import Blueprint
+from flask import Blueprint, request
 from backend.controllers import admin_controller
 from backend.middleware.auth_jwt import verify_token, check_role
 
@@ -96,7 +96,9 @@ def update_seller_verification(seller_id):
 @bp.route('/orders', methods=['GET'])
 @admin_only
 def get_all_orders():
-    return admin_controller.get_all_orders()
+    # Filtres : status, payment_status, client_id, date_from, date_to ;
+    # pagination par curseur si `cursor` est fourni
+    return admin_controller.get_all_orders(request.args)
 
 @bp.route('/orders/<int:order_id>/status', methods=['PUT'])
 @admin_only
@@ -109,6 +111,11 @@ def update_order_status(order_id):
 def get_dashboard_stats():
     return admin_controller.get_dashboard_stats()
 
+@bp.route('/metrics', methods=['GET'])
+@admin_only
+def get_metrics():
+    return admin_controller.get_metrics()
+
 # ============ REVIEWS ============
 @bp.route('/reviews/<int:review_id>', methods=['DELETE'])
 @admin_only
@@ -15,6 +15,17 @@ def get_cart():
     client_id = user.get('id') or user.get('id_user')
     return cart_controller.get_cart(client_id)
 
+@bp.route('/summary', methods=['GET'])
+@verify_token
+def get_cart_summary():
+    """Nombre d'articles et total du panier (badge du header)"""
+    user = request.user
+    if user.get('role') != 'client':
+        from flask import jsonify
+        return jsonify({'message': 'Unauthorized: Only clients can access cart'}), 403
+    client_id = user.get('id') or user.get('id_user')
+    return cart_controller.get_cart_summary(client_id)
+
 @bp.route('/add', methods=['POST'])
 @verify_token
 def add_to_cart():
@@ -27,6 +38,19 @@ def add_to_cart():
     client_id = user.get('id') or user.get('id_user')
     return cart_controller.add_to_cart(client_id, data)
 
+@bp.route('/items', methods=['POST'])
+@verify_token
+def add_items_to_cart():
+    """Ajoute plusieurs produits au panier en une requête
+    ({"items": [{"id_product", "quantity"}, ...]})"""
+    user = request.user
+    if user.get('role') != 'client':
+        from flask import jsonify
+        return jsonify({'message': 'Unauthorized: Only clients can add to cart'}), 403
+    data = request.get_json(silent=True)
+    client_id = user.get('id') or user.get('id_user')
+    return cart_controller.add_items_to_cart(client_id, data)
+
 @bp.route('/item/<int:cart_item_id>', methods=['PUT'])
 @verify_token
 def update_cart_item(cart_item_id):
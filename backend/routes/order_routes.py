@@ -1,11 +1,13 @@
 from flask import Blueprint, request
 from backend.controllers import order_controller
 from backend.middleware.auth_jwt import verify_token
+from backend.middleware.idempotency import idempotent
 
 bp = Blueprint('order', __name__)
 
 @bp.route('/', methods=['POST'])
 @verify_token
+@idempotent("order")
 def create_order():
     """Crée une commande à partir du panier"""
     user = request.user
@@ -16,6 +18,28 @@ def create_order():
     client_id = user.get('id') or user.get('id_user')
     return order_controller.create_order(client_id, data)
 
+@bp.route('/reserve', methods=['POST'])
+@verify_token
+def reserve_cart():
+    """Réserve le stock du panier pendant le paiement"""
+    user = request.user
+    if user.get('role') != 'client':
+        from flask import jsonify
+        return jsonify({'message': 'Unauthorized: Only clients can reserve stock'}), 403
+    client_id = user.get('id') or user.get('id_user')
+    return order_controller.reserve_cart(client_id)
+
+@bp.route('/reserve', methods=['DELETE'])
+@verify_token
+def release_reservation():
+    """Libère le stock réservé par le client"""
+    user = request.user
+    if user.get('role') != 'client':
+        from flask import jsonify
+        return jsonify({'message': 'Unauthorized: Only clients can release reservations'}), 403
+    client_id = user.get('id') or user.get('id_user')
+    return order_controller.release_reservation(client_id)
+
 @bp.route('/', methods=['GET'])
 @verify_token
 def get_client_orders():
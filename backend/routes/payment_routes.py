@@ -2,6 +2,7 @@ from flask import Blueprint, request
 from backend.controllers import payment_controller
 from backend.controllers import stripe_controller
 from backend.middleware.auth_jwt import verify_token, check_role
+from backend.middleware.idempotency import idempotent
 
 bp = Blueprint('payment', __name__)
 
@@ -9,6 +10,7 @@ admin_only = check_role(['admin'])
 
 @bp.route('/order/<int:order_id>', methods=['POST'])
 @verify_token
+@idempotent("payment")
 def create_payment(order_id):
     """Crée un paiement pour une commande (client only)"""
     user = request.user
@@ -39,6 +41,7 @@ def update_payment_status(payment_id):
 # Stripe Payment Routes
 @bp.route('/stripe/create-checkout', methods=['POST'])
 @verify_token
+@idempotent("stripe_checkout")
 def create_stripe_checkout():
     """Crée une session Stripe Checkout"""
     user = request.user
@@ -1,5 +1,6 @@
 from flask import Blueprint, request
 from backend.controllers import photo_controller
+from backend.middleware.conditional import conditional_get
 
 bp = Blueprint('photos', __name__)
 
@@ -12,6 +13,7 @@ def upload_photo(product_id):
     return photo_controller.add_photo(product_id, files)
 
 @bp.route('/<int:product_id>', methods=['GET'])
+@conditional_get("product_image")
 def get_images(product_id):
     """Récupère toutes les images d'un produit"""
     return photo_controller.get_images_by_product(product_id)
@@ -1,23 +1,27 @@
 from flask import Blueprint, request
 from backend.controllers import product_controller
 from backend.middleware.auth_jwt import verify_token
+from backend.middleware.conditional import conditional_get
 
 bp = Blueprint('product', __name__)
 
 @bp.route('/All', methods=['GET'])
+@conditional_get("product", "product_image", "category_tree", "seller")
 def get_all():
-    """Récupère tous les produits (public)"""
-    return product_controller.get_all_products()
+    """Récupère tous les produits (public), par pages si `cursor` est fourni"""
+    return product_controller.get_all_products(request.args)
 
 @bp.route('/<int:product_id>', methods=['GET'])
+@conditional_get("product", "product_image", "category_tree", "seller")
 def get_product(product_id):
     """Récupère un produit par ID (public)"""
     return product_controller.get_product_by_id(product_id)
 
 @bp.route('/spec/<int:seller_id>', methods=['GET'])
+@conditional_get("product", "product_image", "category_tree")
 def get_products_by_seller(seller_id):
-    """Récupère tous les produits d'un vendeur spécifique (public)"""
-    return product_controller.get_all_products_by_seller(seller_id)
+    """Récupère tous les produits d'un vendeur spécifique (public), par pages si `cursor` est fourni"""
+    return product_controller.get_all_products_by_seller(seller_id, request.args)
 
 @bp.route('/search', methods=['GET'])
 def search_product():
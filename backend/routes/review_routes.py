@@ -6,8 +6,9 @@ bp = Blueprint('review', __name__)
 
 @bp.route('/product/<int:product_id>', methods=['GET'])
 def get_product_reviews(product_id):
-    """Récupère tous les avis d'un produit (public)"""
-    return review_controller.get_product_reviews(product_id)
+    """Récupère les avis d'un produit (public) ; avec `cursor`, une page
+    (`limit`, `sort=newest|oldest`) et le résumé des notes"""
+    return review_controller.get_product_reviews(product_id, request.args)
 
 @bp.route('/product/<int:product_id>', methods=['POST'])
 @verify_token
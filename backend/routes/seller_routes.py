@@ -30,13 +30,13 @@ def update_seller_profile():
 @bp.route('/orders', methods=['GET'])
 @verify_token
 def get_seller_orders():
-    """Récupère les commandes du vendeur"""
+    """Récupère les commandes du vendeur (par pages si `cursor` est fourni)"""
     user = request.user
     if user.get('role') != 'seller':
         from flask import jsonify
         return jsonify({'message': 'Unauthorized: Only sellers can view orders'}), 403
     seller_id = user.get('id') or user.get('id_user')
-    return seller_controller.get_seller_orders(seller_id)
+    return seller_controller.get_seller_orders(seller_id, request.args)
 
 @bp.route('/orders/<int:order_id>/status', methods=['PUT'])
 @verify_token
@@ -59,4 +59,5 @@ def get_seller_stats():
         from flask import jsonify
         return jsonify({'message': 'Unauthorized: Only sellers can view stats'}), 403
     seller_id = user.get('id') or user.get('id_user')
-    return seller_controller.get_seller_stats(seller_id)
+    refresh = request.args.get('refresh', '').lower() == 'true'
+    return seller_controller.get_seller_stats(seller_id, refresh=refresh)
@@ -0,0 +1,78 @@
+"""Product text search.
+
+``SEARCH_BACKEND`` selects how the ``search`` parameter of
+``/api/product/search`` is matched:
+
+- ``like`` (default): substring LIKE, no schema requirement;
+- ``fulltext``: MySQL FULLTEXT index (migration 0002), prefix matching;
+- ``memory``: in-process inverted index, no schema change.
+
+Every backend turns a query into a :class:`TextMatch` that the controller
+adds to its SQL conditions, and supports ``sort=relevance``. Product writes
+call :func:`product_saved` / :func:`product_deleted` so backends holding
+their own index can update it incrementally; stock and rating writes
+(checkout, order cancellation, reviews) call :func:`products_changed`.
+"""
+from backend.config import Config
+from backend.search.base import TextMatch, NO_MATCH
+from backend.search.tokenizer import tokenize, query_terms
+
+_backend = None
+
+
+def _create_backend(config):
+    name = (config.SEARCH_BACKEND or "like").lower()
+    if name == "fulltext":
+        from backend.search.fulltext import FulltextBackend
+        return FulltextBackend(min_token_size=config.SEARCH_FULLTEXT_MIN_TOKEN_SIZE)
+    if name == "memory":
+        from backend.search.memory import MemoryBackend
+        return MemoryBackend(
+            max_candidates=config.SEARCH_MAX_CANDIDATES,
+            ttl=config.SEARCH_INDEX_TTL,
+        )
+    if name != "like":
+        raise ValueError(f"Unknown SEARCH_BACKEND: {name}")
+    from backend.search.like import LikeBackend
+    return LikeBackend()
+
+
+def get_search_backend():
+    """Get the configured search backend instance."""
+    global _backend
+    if _backend is None:
+        _backend = _create_backend(Config())
+    return _backend
+
+
+def product_saved(product):
+    """Notify the backend that a product row was created or updated."""
+    hook = getattr(get_search_backend(), "product_saved", None)
+    if hook:
+        hook(product)
+
+
+def products_changed(product_ids):
+    """Notify the backend that the stock or rating of products changed."""
+    hook = getattr(get_search_backend(), "products_changed", None)
+    if hook and product_ids:
+        hook(list(product_ids))
+
+
+def product_deleted(product_id):
+    """Notify the backend that a product was deleted."""
+    hook = getattr(get_search_backend(), "product_deleted", None)
+    if hook:
+        hook(product_id)
+
+
+__all__ = [
+    "TextMatch",
+    "NO_MATCH",
+    "get_search_backend",
+    "product_saved",
+    "product_deleted",
+    "products_changed",
+    "tokenize",
+    "query_terms",
+]
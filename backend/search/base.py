@@ -0,0 +1,9 @@
+"""Types shared by the search backends."""
+from collections import namedtuple
+
+# SQL fragment restricting ``product`` to the rows matching a text query.
+# ``relevance`` is an ORDER BY fragment (with direction) ranking the best
+# matches first, or None when the backend cannot rank this query.
+TextMatch = namedtuple("TextMatch", ["condition", "params", "relevance", "relevance_params"])
+
+NO_MATCH = TextMatch(condition="1 = 0", params=[], relevance=None, relevance_params=[])
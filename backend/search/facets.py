@@ -0,0 +1,190 @@
+"""Facet counts for the product search page.
+
+``/api/product/search?facets=category,brand,price`` returns, next to the
+results, how many products of the current filter set fall in each category,
+subcategory, brand, price bucket and rating bucket. All requested facets are
+computed together: one query of per-facet ``GROUP BY`` branches joined by
+``UNION ALL`` (each returns only the distinct values of its facet), or one
+pass over the in-memory index when ``SEARCH_BACKEND=memory``.
+
+Like the SQL filters, every facet is counted *with* all active filters,
+including the filter on that facet's own dimension.
+"""
+import bisect
+import math
+from backend.database.dao import products as products_dao
+from backend.search import get_search_backend
+
+FACETS = ("category", "subcategory", "brand", "price", "rating")
+
+# Upper bounds of the price buckets: [0, 25), [25, 50), ..., [1000, +inf).
+PRICE_BUCKETS = (25, 50, 100, 250, 500, 1000)
+
+# SQL expression grouped on for each facet (one UNION ALL branch each).
+SQL_EXPRESSIONS = {
+    "category": "id_category",
+    "subcategory": "id_SubCategory",
+    "brand": "brand",
+    # INTERVAL() returns the bucket number, the same as bisect_right below.
+    "price": "INTERVAL(price, " + ", ".join(str(bound) for bound in PRICE_BUCKETS) + ")",
+    "rating": "FLOOR(rating)",
+}
+
+
+def parse_facets(value):
+    """Requested facet names from ``facets=a,b`` (``all`` selects every facet)."""
+    if not value:
+        return []
+    names = value if isinstance(value, list) else str(value).split(",")
+    names = [name.strip().lower() for name in names if name.strip()]
+    if "all" in names:
+        return list(FACETS)
+    unknown = [name for name in names if name not in FACETS]
+    if unknown:
+        raise ValueError(f"Unknown facet(s): {', '.join(unknown)}")
+    return [name for name in FACETS if name in names]
+
+
+def price_bucket(price):
+    """Bucket number of a price, or None for a missing price."""
+    if price is None or math.isnan(price):
+        return None
+    return bisect.bisect_right(PRICE_BUCKETS, price)
+
+
+def _price_entry(bucket, count):
+    low = PRICE_BUCKETS[bucket - 1] if bucket > 0 else 0
+    high = PRICE_BUCKETS[bucket] if bucket < len(PRICE_BUCKETS) else None
+    label = f"{low}-{high}" if high is not None else f"{low}+"
+    return {"value": label, "min": low, "max": high, "count": count}
+
+
+def format_facets(counts):
+    """``{facet: {value: count}}`` -> response lists.
+
+    Category, subcategory and brand are sorted by count (most first); price
+    buckets by price and rating buckets from the best rating down.
+    """
+    result = {}
+    for facet, values in counts.items():
+        if facet == "price":
+            result[facet] = [_price_entry(bucket, values[bucket]) for bucket in sorted(values)]
+        elif facet == "rating":
+            result[facet] = [{"value": value, "count": values[value]} for value in sorted(values, reverse=True)]
+        else:
+            result[facet] = [
+                {"value": value, "count": count}
+                for value, count in sorted(values.items(), key=lambda item: (-item[1], str(item[0])))
+            ]
+    return result
+
+
+def sql_facet_counts(conditions, params, facets):
+    """Facet counts from one query over the filtered products."""
+    counts = {facet: {} for facet in facets}
+    if not facets:
+        return counts
+    expressions = {facet: SQL_EXPRESSIONS[facet] for facet in facets}
+    for row in products_dao.count_facets(conditions, params, expressions):
+        facet, value = row["facet"], row["facet_value"]
+        if value is None:
+            continue
+        if facet != "brand":
+            # Numeric values come back as text (common type of the branches)
+            value = int(float(value))
+            # INTERVAL(NULL, ...) = -1: missing price
+            if facet == "price" and value < 0:
+                continue
+        counts[facet][value] = int(row["total"])
+    return counts
+
+
+def _slot_filter(attributes, filters):
+    """Predicate on index slots equivalent to the SQL conditions of ``filters``."""
+    checks = []
+    if filters.get("brands"):
+        brand_of = attributes["brand"]
+        wanted = {str(brand).casefold() for brand in filters["brands"]}
+        checks.append(lambda slot: (brand_of[slot] or "").casefold() in wanted)
+    for key, column in (("category_ids", "id_category"), ("subcategory_ids", "id_SubCategory")):
+        if filters.get(key):
+            values, wanted = attributes[column], set(filters[key])
+            checks.append(lambda slot, values=values, wanted=wanted: values[slot] in wanted)
+    price = attributes["price"]
+    if filters.get("min_price") is not None:
+        low = filters["min_price"]
+        checks.append(lambda slot: price[slot] >= low)
+    if filters.get("max_price") is not None:
+        high = filters["max_price"]
+        checks.append(lambda slot: price[slot] <= high)
+    stock = attributes["stock"]
+    if filters.get("stock") == "available":
+        checks.append(lambda slot: stock[slot] > 0)
+    elif filters.get("stock") == "out":
+        checks.append(lambda slot: stock[slot] == 0)
+    if filters.get("seller_id") is not None:
+        seller, seller_id = attributes["id_seller"], filters["seller_id"]
+        checks.append(lambda slot: seller[slot] == seller_id)
+    if filters.get("min_rating") is not None:
+        rating, min_rating = attributes["rating"], filters["min_rating"]
+        checks.append(lambda slot: rating[slot] >= min_rating)
+    return checks
+
+
+def index_count(attributes, slots, filters):
+    """Number of ``slots`` passing ``filters``."""
+    checks = _slot_filter(attributes, filters)
+    if not checks:
+        return len(slots)
+    return sum(1 for slot in slots if all(check(slot) for check in checks))
+
+
+def index_facet_counts(attributes, slots, filters, facets):
+    """Facet counts from one pass over ``slots`` of a search index.
+
+    ``attributes`` are the per-slot columns of
+    :class:`backend.search.memory.SearchIndex`; ``filters`` is the structured
+    form of the search filters built by the product controller.
+    """
+    counts = {facet: {} for facet in facets}
+    checks = _slot_filter(attributes, filters)
+    readers = []
+    for facet in facets:
+        if facet == "price":
+            price = attributes["price"]
+            readers.append((counts[facet], lambda slot: price_bucket(price[slot])))
+        elif facet == "rating":
+            rating = attributes["rating"]
+            readers.append((
+                counts[facet],
+                lambda slot: None if math.isnan(rating[slot]) else math.floor(rating[slot]),
+            ))
+        else:
+            column = {"category": "id_category", "subcategory": "id_SubCategory", "brand": "brand"}[facet]
+            values = attributes[column]
+            readers.append((counts[facet], values.__getitem__))
+    for slot in slots:
+        if checks and not all(check(slot) for check in checks):
+            continue
+        for values_count, read in readers:
+            value = read(slot)
+            if value is None or value == -1:
+                continue
+            values_count[value] = values_count.get(value, 0) + 1
+    return counts
+
+
+def facet_counts(facets, conditions, params, search_query=None, filters=None):
+    """Formatted counts of ``facets`` for the current search.
+
+    Uses the search backend's own ``facet_counts`` when it has one (the
+    in-memory index), otherwise one grouped SQL query.
+    """
+    if not facets:
+        return {}
+    counter = getattr(get_search_backend(), "facet_counts", None)
+    if counter is not None and filters is not None:
+        counts = counter(search_query, filters, facets)
+    else:
+        counts = sql_facet_counts(conditions, params, facets)
+    return format_facets(counts)
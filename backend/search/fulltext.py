@@ -0,0 +1,52 @@
+"""MySQL FULLTEXT backend (InnoDB, boolean mode).
+
+Requires the ``ft_product_text`` index from migration 0002.
+"""
+from backend.search.base import TextMatch
+from backend.search.like import LikeBackend
+from backend.search.tokenizer import query_terms
+
+MATCH_EXPR = "MATCH(product_name, brand, product_description) AGAINST (%s IN BOOLEAN MODE)"
+
+
+class FulltextBackend:
+    """Every query term is required and matched as a word prefix (``+term*``).
+
+    InnoDB does not index tokens shorter than ``innodb_ft_min_token_size``
+    (3 by default), so shorter terms are matched with LIKE on name and brand;
+    MySQL applies them to the FULLTEXT candidates only.
+    """
+
+    name = "fulltext"
+
+    def __init__(self, min_token_size=3):
+        self.min_token_size = min_token_size
+
+    def match(self, query):
+        terms = query_terms(query)
+        if not terms:
+            return LikeBackend().match(query)
+
+        indexed = [term for term in terms if len(term) >= self.min_token_size]
+        short = [term for term in terms if len(term) < self.min_token_size]
+
+        conditions = []
+        params = []
+        relevance = None
+        relevance_params = []
+        if indexed:
+            boolean_query = " ".join(f"+{term}*" for term in indexed)
+            conditions.append(MATCH_EXPR)
+            params.append(boolean_query)
+            relevance = f"{MATCH_EXPR} DESC"
+            relevance_params = [boolean_query]
+        for term in short:
+            conditions.append("(product_name LIKE %s OR brand LIKE %s)")
+            params.extend([f"%{term}%", f"%{term}%"])
+
+        return TextMatch(
+            condition="(" + " AND ".join(conditions) + ")",
+            params=params,
+            relevance=relevance,
+            relevance_params=relevance_params,
+        )
@@ -0,0 +1,19 @@
+"""Baseline backend: substring LIKE on name, brand and description."""
+from backend.search.base import TextMatch
+
+
+class LikeBackend:
+    """Matches the whole query as a substring. Needs no schema change but
+    scans the product table."""
+
+    name = "like"
+
+    def match(self, query):
+        pattern = f"%{query}%"
+        return TextMatch(
+            condition="(product_name LIKE %s OR brand LIKE %s OR product_description LIKE %s)",
+            params=[pattern, pattern, pattern],
+            # Name matches first, then brand, then description-only matches.
+            relevance="CASE WHEN product_name LIKE %s THEN 0 WHEN brand LIKE %s THEN 1 ELSE 2 END ASC",
+            relevance_params=[pattern, pattern],
+        )
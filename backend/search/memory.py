@@ -0,0 +1,450 @@
+"""In-process inverted index backend.
+
+Keeps an inverted index of the product texts in worker memory, so search
+needs no schema change and no text scan in MySQL: the index resolves the
+query to a ranked list of product IDs that the SQL query then filters on.
+
+Storage is array-backed: every document gets a dense slot number, and each
+(field, term) posting list is a pair of ``array`` objects (slots, term
+frequencies) appended in slot order. Updates are incremental: a changed
+product gets a new slot and its old slot is tombstoned; tombstoned entries
+are dropped by :meth:`SearchIndex.compact`, which runs automatically once
+they make up a quarter of the index.
+
+Query syntax (terms are tokenized like the indexed text)::
+
+    red phone            both terms required
+    name:phone brand:ac  restrict a term to one field (name, brand, description)
+    phone -case          exclude products matching "case"
+    phone OR tablet      either term
+    pho*                 explicit prefix (all terms are prefixes when prefix=True)
+
+Scoring is BM25 computed per field and combined with ``FIELD_WEIGHTS``.
+"""
+import bisect
+import heapq
+import math
+import threading
+import time
+from array import array
+from itertools import chain
+from backend.database.dao import products as products_dao
+from backend.search.base import TextMatch, NO_MATCH
+from backend.search.facets import index_count, index_facet_counts
+from backend.search.tokenizer import tokenize
+
+FIELDS = ("product_name", "brand", "product_description")
+FIELD_WEIGHTS = {"product_name": 3.0, "brand": 2.0, "product_description": 1.0}
+FIELD_ALIASES = {
+    "name": "product_name",
+    "product_name": "product_name",
+    "brand": "brand",
+    "description": "product_description",
+    "product_description": "product_description",
+}
+
+# Filterable product columns kept per slot (for facet counts), with their
+# array typecode. Missing values are stored as -1 / NaN, which no filter
+# matches, like NULL in SQL.
+ATTRIBUTES = {
+    "id_category": "i",
+    "id_SubCategory": "i",
+    "id_seller": "i",
+    "stock": "i",
+    "price": "d",
+    "rating": "d",
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+COMPACT_RATIO = 0.25
+
+
+class Clause:
+    """One query term: ``fields`` restricts it, ``prefix`` expands it."""
+
+    __slots__ = ("term", "fields", "prefix", "negated")
+
+    def __init__(self, term, fields=FIELDS, prefix=False, negated=False):
+        self.term = term
+        self.fields = fields
+        self.prefix = prefix
+        self.negated = negated
+
+
+def parse_query(query, prefix=False):
+    """Parse a query into groups of clauses.
+
+    The result is a list of AND-ed groups; the clauses inside a group are
+    OR-ed. Negated clauses are returned in their own single-clause groups.
+    """
+    groups = []
+    join_next = False
+    for raw in str(query or "").split():
+        if raw == "OR":
+            join_next = bool(groups)
+            continue
+        negated = raw.startswith("-") and len(raw) > 1
+        if negated:
+            raw = raw[1:]
+        fields = FIELDS
+        if ":" in raw:
+            name, _, rest = raw.partition(":")
+            if name.lower() in FIELD_ALIASES and rest:
+                fields = (FIELD_ALIASES[name.lower()],)
+                raw = rest
+        explicit_prefix = raw.endswith("*")
+        clauses = [
+            Clause(term, fields, prefix or explicit_prefix, negated)
+            for term in tokenize(raw.rstrip("*"))
+        ]
+        if not clauses:
+            continue
+        if join_next and not negated and len(clauses) == 1 and not groups[-1][0].negated:
+            groups[-1].append(clauses[0])
+        else:
+            groups.extend([clause] for clause in clauses)
+        join_next = False
+    return groups
+
+
+class _FieldIndex:
+    """Postings of one field: term -> (slots, term frequencies)."""
+
+    __slots__ = ("postings", "terms", "lengths", "total_length")
+
+    def __init__(self):
+        self.postings = {}
+        self.terms = []
+        self.lengths = array("I")
+        self.total_length = 0
+
+    def add(self, slot, tokens, keep_sorted=True):
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            entry = self.postings.get(token)
+            if entry is None:
+                entry = self.postings[token] = (array("I"), array("H"))
+                if keep_sorted:
+                    bisect.insort(self.terms, token)
+                else:
+                    self.terms.append(token)
+            entry[0].append(slot)
+            entry[1].append(min(count, 65535))
+        self.lengths.append(len(tokens))
+        self.total_length += len(tokens)
+
+    def expand(self, term, prefix):
+        if not prefix:
+            return [term] if term in self.postings else []
+        start = bisect.bisect_left(self.terms, term)
+        end = bisect.bisect_left(self.terms, term + "\uffff")
+        return self.terms[start:end]
+
+
+class SearchIndex:
+    """Array-backed inverted index over product name, brand and description."""
+
+    def __init__(self):
+        self._fields = {field: _FieldIndex() for field in FIELDS}
+        self._doc_ids = array("i")
+        self._alive = bytearray()
+        self._slot_of = {}
+        self._dead = 0
+        self._lock = threading.RLock()
+        self.attributes = {name: array(typecode) for name, typecode in ATTRIBUTES.items()}
+        self.attributes["brand"] = []
+
+    @classmethod
+    def build(cls, products):
+        index = cls()
+        for product in products:
+            index._append(product, keep_sorted=False)
+        for field_index in index._fields.values():
+            field_index.terms.sort()
+        return index
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    # -- updates ---------------------------------------------------------
+
+    def _append(self, product, keep_sorted=True):
+        doc_id = product["id_product"]
+        slot = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._alive.append(1)
+        self._slot_of[doc_id] = slot
+        for field in FIELDS:
+            self._fields[field].add(slot, tokenize(product.get(field)), keep_sorted)
+        for name, typecode in ATTRIBUTES.items():
+            value = product.get(name)
+            if typecode == "i":
+                self.attributes[name].append(-1 if value is None else int(value))
+            else:
+                self.attributes[name].append(math.nan if value is None else float(value))
+        self.attributes["brand"].append(product.get("brand"))
+
+    def _tombstone(self, doc_id):
+        slot = self._slot_of.pop(doc_id, None)
+        if slot is None:
+            return
+        self._alive[slot] = 0
+        self._dead += 1
+        for field_index in self._fields.values():
+            field_index.total_length -= field_index.lengths[slot]
+
+    def add_or_update(self, product):
+        """Index a product row, replacing any previous version."""
+        with self._lock:
+            self._tombstone(product["id_product"])
+            self._append(product)
+            self._maybe_compact()
+
+    def update_attributes(self, product):
+        """Refresh the filter and facet attributes (stock, rating, ...) of an
+        indexed product in place; its text is not re-indexed."""
+        with self._lock:
+            slot = self._slot_of.get(product["id_product"])
+            if slot is None:
+                return False
+            for name, typecode in ATTRIBUTES.items():
+                value = product.get(name)
+                if typecode == "i":
+                    self.attributes[name][slot] = -1 if value is None else int(value)
+                else:
+                    self.attributes[name][slot] = math.nan if value is None else float(value)
+            return True
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._tombstone(doc_id)
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._dead > 1000 and self._dead > COMPACT_RATIO * len(self._doc_ids):
+            self.compact()
+
+    def compact(self):
+        """Drop tombstoned slots and renumber the live ones."""
+        with self._lock:
+            remap = array("i", [-1]) * len(self._doc_ids)
+            doc_ids = array("i")
+            for slot, alive in enumerate(self._alive):
+                if alive:
+                    remap[slot] = len(doc_ids)
+                    doc_ids.append(self._doc_ids[slot])
+            for field, old in self._fields.items():
+                new = _FieldIndex()
+                new.lengths = array("I", (old.lengths[s] for s, alive in enumerate(self._alive) if alive))
+                new.total_length = sum(new.lengths)
+                for term in old.terms:
+                    slots, tfs = old.postings[term]
+                    new_slots = array("I")
+                    new_tfs = array("H")
+                    for slot, tf in zip(slots, tfs):
+                        if remap[slot] >= 0:
+                            new_slots.append(remap[slot])
+                            new_tfs.append(tf)
+                    if new_slots:
+                        new.postings[term] = (new_slots, new_tfs)
+                        new.terms.append(term)
+                self._fields[field] = new
+            for name, values in self.attributes.items():
+                kept = (values[s] for s, alive in enumerate(self._alive) if alive)
+                self.attributes[name] = list(kept) if isinstance(values, list) else array(values.typecode, kept)
+            self._doc_ids = doc_ids
+            self._alive = bytearray(b"\x01") * len(doc_ids)
+            self._slot_of = {doc_id: slot for slot, doc_id in enumerate(doc_ids)}
+            self._dead = 0
+
+    # -- queries ---------------------------------------------------------
+
+    def _clause_scores(self, clause, candidates=None):
+        """slot -> BM25 score of one clause (best expansion per field)."""
+        doc_count = max(len(self._slot_of), 1)
+        alive = self._alive
+        has_dead = self._dead > 0
+        scores = {}
+        for field in clause.fields:
+            field_index = self._fields[field]
+            avg_length = (field_index.total_length / doc_count) or 1.0
+            lengths = field_index.lengths
+            weight = FIELD_WEIGHTS[field]
+            # BM25: weight * idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg))
+            norm_base = BM25_K1 * (1 - BM25_B)
+            norm_per_token = BM25_K1 * BM25_B / avg_length
+            field_scores = {}
+            for term in field_index.expand(clause.term, clause.prefix):
+                slots, tfs = field_index.postings[term]
+                # Document frequency counts tombstoned entries until the
+                # next compaction; close enough for ranking, but capped at the
+                # live document count so idf stays positive (a term in every
+                # product would otherwise score below zero and match nothing).
+                df = min(len(slots), doc_count)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                factor = weight * idf * (BM25_K1 + 1)
+                get = field_scores.get
+                for slot, tf in self._iter_postings(slots, tfs, candidates):
+                    score = factor * tf / (tf + norm_base + norm_per_token * lengths[slot])
+                    if score > get(slot, 0.0) and (not has_dead or alive[slot]):
+                        field_scores[slot] = score
+            for slot, score in field_scores.items():
+                scores[slot] = scores.get(slot, 0.0) + score
+        return scores
+
+    @staticmethod
+    def _iter_postings(slots, tfs, candidates):
+        """(slot, tf) pairs, restricted to ``candidates`` when given.
+
+        Few candidates against a long posting list are looked up by binary
+        search (slots are sorted) instead of walking the whole list.
+        """
+        if candidates is None:
+            return zip(slots, tfs)
+        if len(candidates) * max(len(slots).bit_length(), 1) < len(slots):
+            found = []
+            for slot in sorted(candidates):
+                position = bisect.bisect_left(slots, slot)
+                if position < len(slots) and slots[position] == slot:
+                    found.append((slot, tfs[position]))
+            return found
+        return ((slot, tf) for slot, tf in zip(slots, tfs) if slot in candidates)
+
+    def _document_frequency(self, clause):
+        return sum(
+            len(self._fields[field].postings[term][0])
+            for field in clause.fields
+            for term in self._fields[field].expand(clause.term, clause.prefix)
+        )
+
+    def match_slots(self, query, prefix=False):
+        """slot -> score of every live document matching ``query``."""
+        groups = parse_query(query, prefix=prefix)
+        positive = [group for group in groups if not group[0].negated]
+        negative = [group[0] for group in groups if group[0].negated]
+        if not positive:
+            return {}
+        with self._lock:
+            # Rarest group first, so later groups only score its candidates.
+            positive.sort(key=lambda group: sum(self._document_frequency(c) for c in group))
+            scores = None
+            for group in positive:
+                group_scores = {}
+                for clause in group:
+                    for slot, score in self._clause_scores(clause, scores).items():
+                        group_scores[slot] = group_scores.get(slot, 0.0) + score
+                if scores is None:
+                    scores = group_scores
+                else:
+                    scores = {slot: scores[slot] + score for slot, score in group_scores.items()}
+                if not scores:
+                    return {}
+            for clause in negative:
+                for slot in self._clause_scores(clause, scores):
+                    scores.pop(slot, None)
+            return scores
+
+    def live_slots(self):
+        """Slots of every indexed (not tombstoned) product."""
+        return list(self._slot_of.values())
+
+    def slots_of(self, doc_ids):
+        """Slots of the given product IDs that are in the index."""
+        slot_of = self._slot_of
+        return [slot_of[doc_id] for doc_id in doc_ids if doc_id in slot_of]
+
+    def search(self, query, limit=None, prefix=False):
+        """Ranked ``[(id_product, score)]``, best first."""
+        # Slots mapped to IDs under the same lock as the match: a compact()
+        # in between would renumber them.
+        with self._lock:
+            scores = self.match_slots(query, prefix=prefix)
+            doc_ids = self._doc_ids
+            ranked = [(doc_ids[slot], score) for slot, score in scores.items()]
+        key = lambda item: (item[1], -item[0])
+        if limit:
+            return heapq.nlargest(limit, ranked, key=key)
+        return sorted(ranked, key=key, reverse=True)
+
+
+class MemoryBackend:
+    """Search backend answering from a :class:`SearchIndex`.
+
+    The index is built lazily from ``products_dao.iter_products()``, kept
+    current by :meth:`product_saved` / :meth:`product_deleted`, and rebuilt
+    from scratch once older than ``ttl`` seconds to pick up writes made by
+    other workers. At most ``max_candidates`` best matches are handed to SQL.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_candidates=5000, ttl=300):
+        self.max_candidates = max_candidates
+        self.ttl = ttl
+        self._index = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def _expired(self):
+        return self._index is None or (self.ttl and time.monotonic() - self._built_at > self.ttl)
+
+    def index(self):
+        if self._expired():
+            with self._lock:
+                if self._expired():
+                    self._index = SearchIndex.build(chain.from_iterable(products_dao.iter_products(1000)))
+                    self._built_at = time.monotonic()
+        return self._index
+
+    def product_saved(self, product):
+        if self._index is not None and product:
+            self._index.add_or_update(product)
+
+    def products_changed(self, product_ids):
+        if self._index is None:
+            return
+        for product in products_dao.list_products_by_ids(product_ids):
+            self._index.update_attributes(product)
+
+    def product_deleted(self, product_id):
+        if self._index is not None:
+            self._index.remove(product_id)
+
+    def match(self, query):
+        # Plain user queries are matched as-you-type: every term is a prefix.
+        ranked = self.index().search(query, limit=self.max_candidates, prefix=True)
+        if not ranked:
+            return NO_MATCH
+        # IDs come from the index (ints), so they are inlined rather than
+        # passed twice as parameters.
+        id_list = ", ".join(str(int(doc_id)) for doc_id, _ in ranked)
+        return TextMatch(
+            condition=f"id_product IN ({id_list})",
+            params=[],
+            relevance=f"FIELD(id_product, {id_list}) ASC",
+            relevance_params=[],
+        )
+
+    def _slots(self, index, query):
+        """Slots of the products :meth:`match` would select for ``query``."""
+        if not query:
+            return index.live_slots()
+        ranked = index.search(query, limit=self.max_candidates, prefix=True)
+        return index.slots_of(doc_id for doc_id, _ in ranked)
+
+    def facet_counts(self, query, filters, facets):
+        """Facet counts of the products matching ``query`` and ``filters``,
+        in one pass over the index."""
+        index = self.index()
+        with index._lock:
+            return index_facet_counts(index.attributes, self._slots(index, query), filters, facets)
+
+    def count(self, query, filters):
+        """Number of products matching ``query`` and ``filters``, from the
+        index alone (as fresh as the index, see ``ttl``)."""
+        index = self.index()
+        with index._lock:
+            return index_count(index.attributes, self._slots(index, query), filters)
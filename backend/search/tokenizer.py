@@ -0,0 +1,39 @@
+"""Tokenization shared by the search backends."""
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Words too common to help ranking (English and French, matching the catalog).
+STOPWORDS = frozenset(
+    """
+    a an and are as at be by for from in is it of on or the to with
+    au aux de des du en et la le les pour sur un une
+    """.split()
+)
+
+
+def normalize(text):
+    """Lowercase and strip accents so "Téléphone" matches "telephone"."""
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text, keep_stopwords=False):
+    """Split text into normalized word tokens."""
+    if not text:
+        return []
+    tokens = _TOKEN_RE.findall(normalize(text))
+    if keep_stopwords:
+        return tokens
+    return [token for token in tokens if token not in STOPWORDS]
+
+
+def query_terms(query):
+    """Distinct tokens of a user query, in order.
+
+    Falls back to the stopwords themselves when the query contains nothing
+    else, so searching for "the" still matches something.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    return terms or list(dict.fromkeys(tokenize(query, keep_stopwords=True)))
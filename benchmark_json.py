@@ -0,0 +1,116 @@
+"""
+Benchmark of the response serialization paths for a product listing.
+
+Serializes N synthetic product rows (as mysql-connector returns them, with
+datetime and Decimal values) to a JSON response body:
+  - old:      per-field row.get() + to_iso/to_float, Flask's default provider
+  - new/json: serializers converting the Decimal and datetime fields,
+              FastJSONProvider on the standard library
+  - new/orjson: serializers converting the Decimal fields, FastJSONProvider
+              on orjson, which encodes datetime itself (if installed)
+
+Usage:
+  python benchmark_json.py                   # 10k products
+  python benchmark_json.py --count 50000 --repeat 5
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from backend.controllers.serializers import PRODUCT_CONVERTERS, PRODUCT_FIELDS, PRODUCT_TYPED, compile_serializer
+from backend.database.dao.utils import to_iso, to_float
+from backend.json_provider import FastJSONProvider, orjson
+
+
+def legacy_product_to_dict(row):
+    """The serializer as it was: one row.get() and converter per field."""
+    if not row:
+        return None
+    return {
+        "id_product": row.get("id_product"),
+        "product_name": row.get("product_name"),
+        "brand": row.get("brand"),
+        "product_description": row.get("product_description"),
+        "price": to_float(row.get("price")),
+        "stock": row.get("stock"),
+        "rating": row.get("rating"),
+        "id_seller": row.get("id_seller"),
+        "id_category": row.get("id_category"),
+        "id_SubCategory": row.get("id_SubCategory"),
+        "createdAtt": to_iso(row.get("createdAtt")),
+        "updatedAt": to_iso(row.get("updatedAt")),
+    }
+
+
+def synthetic_rows(count, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "id_product": product_id,
+            "product_name": f"Product {product_id}",
+            "brand": rng.choice(["Acme", "Zeta", "Nova", "Orion"]),
+            "product_description": "Lorem ipsum dolor sit amet " * 4,
+            "price": Decimal(rng.randint(100, 100000)) / 100,
+            "stock": rng.randint(0, 500),
+            "rating": round(rng.uniform(0, 5), 1),
+            "id_seller": rng.randint(1, 50),
+            "id_category": rng.randint(1, 20),
+            "id_SubCategory": rng.randint(1, 80),
+            "createdAtt": start + timedelta(minutes=product_id),
+            "updatedAt": start + timedelta(minutes=product_id, seconds=30),
+        }
+        for product_id in range(1, count + 1)
+    ]
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench(count, repeat):
+    rows = synthetic_rows(count)
+    app = Flask(__name__)
+    legacy = DefaultJSONProvider(app)
+    paths = [("old", legacy_product_to_dict, legacy)]
+    # Without orjson, the serializers also convert the datetime fields
+    paths.append((
+        "new/json",
+        compile_serializer(PRODUCT_FIELDS, PRODUCT_CONVERTERS, PRODUCT_TYPED, native_types=False),
+        FastJSONProvider(app, backend="json"),
+    ))
+    if orjson is not None:
+        paths.append((
+            "new/orjson",
+            compile_serializer(PRODUCT_FIELDS, PRODUCT_CONVERTERS, PRODUCT_TYPED, native_types=True),
+            FastJSONProvider(app, backend="orjson"),
+        ))
+
+    print(f"== {count:,} products ==")
+    print(f"{'path':<12}{'dicts ms':>10}{'encode ms':>11}{'total ms':>10}{'bytes':>12}")
+    with app.app_context():
+        for name, serialize, provider in paths:
+            dicts_ms = timed(lambda: [serialize(row) for row in rows], repeat)
+            payload = [serialize(row) for row in rows]
+            encode_ms = timed(lambda: provider.response(payload).get_data(), repeat)
+            size = len(provider.response(payload).get_data())
+            print(f"{name:<12}{dicts_ms:>10.1f}{encode_ms:>11.1f}{dicts_ms + encode_ms:>10.1f}{size:>12,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    bench(args.count, args.repeat)
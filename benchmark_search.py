@@ -0,0 +1,103 @@
+"""
+Benchmark of the in-memory search index against the SQL LIKE path.
+
+Generates N synthetic products, then times the same queries:
+  - memory: backend.search.memory.SearchIndex (BM25, prefix matching)
+  - like:   the LIKE '%term%' condition used by SEARCH_BACKEND=like, run by
+            SQLite on an in-memory copy of the product table (stdlib only,
+            no MySQL needed; MySQL also has to scan every row for it)
+
+Usage:
+  python benchmark_search.py                      # 10k, 100k, 1M products
+  python benchmark_search.py --sizes 10000,50000 --repeat 5
+"""
+import argparse
+import itertools
+import random
+import sqlite3
+import statistics
+import time
+
+from backend.search.memory import SearchIndex
+
+WORDS = (
+    "phone tablet laptop case charger cable screen wireless bluetooth speaker "
+    "headphones camera watch smart fast slim pro max mini ultra black white red "
+    "blue leather steel glass portable gaming office travel kitchen coffee "
+    "blender mixer lamp desk chair sofa shoe running jacket cotton wool"
+).split()
+BRANDS = ["Acme", "Zeta", "Nova", "Orion", "Pixel", "Vertex", "Lumen", "Atlas"]
+QUERIES = ["phone", "wireless speaker", "smart watch black", "lapt", "pro1234", "zzz"]
+
+
+def synthetic_products(count, seed=42):
+    """Products drawn from the common words above plus a long tail of model
+    names and rarer words, roughly Zipf-distributed like a real catalog."""
+    rng = random.Random(seed)
+    tail = [f"{word}{number}" for word in ("x", "pro", "gt", "neo") for number in range(2500)]
+    vocabulary = WORDS + tail
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    for product_id in range(1, count + 1):
+        yield {
+            "id_product": product_id,
+            "product_name": " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=3)),
+            "brand": rng.choice(BRANDS),
+            "product_description": " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=20)),
+        }
+
+
+def timed(func, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def bench(size, repeat):
+    products = list(synthetic_products(size))
+
+    start = time.perf_counter()
+    index = SearchIndex.build(products)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    db = sqlite3.connect(":memory:")
+    db.execute(
+        "CREATE TABLE product (id_product INTEGER PRIMARY KEY, product_name TEXT, "
+        "brand TEXT, product_description TEXT, createdAtt INTEGER)"
+    )
+    db.executemany(
+        "INSERT INTO product VALUES (?, ?, ?, ?, ?)",
+        ((p["id_product"], p["product_name"], p["brand"], p["product_description"], p["id_product"])
+         for p in products),
+    )
+    del products
+
+    print(f"\n== {size:,} products (index build {build_ms:,.0f} ms) ==")
+    print(f"{'query':<22}{'memory ms':>12}{'like ms':>12}{'hits':>10}")
+    for query in QUERIES:
+        memory_ms, ranked = timed(lambda: index.search(query, limit=24, prefix=True), repeat)
+        pattern = f"%{query}%"
+        like_ms, _ = timed(
+            lambda: db.execute(
+                "SELECT id_product FROM product WHERE product_name LIKE ? OR brand LIKE ? "
+                "OR product_description LIKE ? ORDER BY createdAtt DESC LIMIT 24",
+                (pattern, pattern, pattern),
+            ).fetchall(),
+            repeat,
+        )
+        hits = len(index.match_slots(query, prefix=True))
+        del ranked
+        print(f"{query:<22}{memory_ms:>12.2f}{like_ms:>12.2f}{hits:>10,}")
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for size in (int(value) for value in args.sizes.split(",")):
+        bench(size, args.repeat)
@@ -1,7 +1,16 @@
 """
 Script pour initialiser la base de données MySQL
-Ce script exécute le fichier E-Commerce-BD.sql pour créer la base de données
+Ce script exécute le fichier E-Commerce-BD.sql pour créer la base de données,
+puis applique les migrations versionnées de backend/database/migrations/.
+
+Usage:
+  python init_db.py            # schéma + migrations
+  python init_db.py --migrate  # migrations en attente uniquement
+  python init_db.py --explain  # EXPLAIN des requêtes DAO (échoue sur full scan)
+  python init_db.py --backfill-ratings  # agrégats de notes des produits (migrations 0007, 0008)
+  python init_db.py --release-expired-holds  # réservations de stock expirées (migration 0011)
 """
+import argparse
 import subprocess
 import sys
 import os
@@ -44,6 +53,81 @@ def init_database():
         print(f"Erreur: {e}")
         sys.exit(1)
 
+def migrate_database():
+    """Applique les migrations SQL numérotées qui ne l'ont pas encore été"""
+    from backend.database.migrations import apply_migrations
+
+    print("Application des migrations...")
+    try:
+        applied = apply_migrations()
+    except Exception as e:
+        print(f"Erreur lors des migrations: {e}")
+        sys.exit(1)
+    if applied:
+        print(f"✓ Migrations appliquées: {', '.join(applied)}")
+    else:
+        print("✓ Base de données déjà à jour")
+
+
+def explain_queries():
+    """Vérifie via EXPLAIN qu'aucune requête DAO ne fait de full table scan"""
+    from backend.database.explain_check import run_explain_check
+
+    failures = run_explain_check()
+    if failures:
+        print(f"✗ Full table scan sans index: {', '.join(sorted(set(failures)))}")
+        sys.exit(1)
+    print("✓ Aucune requête DAO en full table scan")
+
+
+def backfill_ratings():
+    """Recalcule rating_sum / rating_count / rating et l'histogramme des notes de tous les produits"""
+    from backend.database.backfill import backfill_product_ratings
+
+    print("Recalcul des notes des produits...")
+    try:
+        total = backfill_product_ratings()
+    except Exception as e:
+        print(f"Erreur lors du recalcul des notes: {e}")
+        sys.exit(1)
+    print(f"✓ {total} produits mis à jour")
+
+
+def release_expired_holds():
+    """Libère toutes les réservations de stock expirées"""
+    from backend.database.dao.reservations import release_expired
+
+    print("Libération des réservations de stock expirées...")
+    total = 0
+    try:
+        while True:
+            released = release_expired()
+            if not released:
+                break
+            total += released
+    except Exception as e:
+        print(f"Erreur lors de la libération des réservations: {e}")
+        sys.exit(1)
+    print(f"✓ {total} réservations libérées")
+
+
 if __name__ == '__main__':
-    init_database()
+    parser = argparse.ArgumentParser(description="Initialisation de la base de données")
+    parser.add_argument('--migrate', action='store_true', help="appliquer uniquement les migrations")
+    parser.add_argument('--explain', action='store_true', help="vérifier les plans des requêtes DAO")
+    parser.add_argument('--backfill-ratings', action='store_true', help="recalculer les agrégats de notes")
+    parser.add_argument('--release-expired-holds', action='store_true', help="libérer les réservations de stock expirées")
+    args = parser.parse_args()
+
+    if args.explain:
+        explain_queries()
+    elif args.backfill_ratings:
+        backfill_ratings()
+    elif args.release_expired_holds:
+        release_expired_holds()
+    elif args.migrate:
+        migrate_database()
+    else:
+        init_database()
+        migrate_database()
 
@@ -0,0 +1,133 @@
+"""
+Concurrency check of the checkout (orders_dao.checkout_cart): parallel
+orders of the same product must never sell more than its stock.
+
+Creates a test product with --stock units and --clients client accounts,
+each with a cart of --quantity units of it (added with cart_dao.add_cart_item,
+the path of POST /api/cart/add), then fires every checkout at
+once from a thread pool (one pooled connection per thread) and checks that:
+  - accepted orders x quantity <= initial stock
+  - final stock = initial stock - accepted orders x quantity (never negative)
+  - every rejected checkout failed with "Insufficient stock"
+Test rows are deleted afterwards. Needs the MySQL database configured in
+backend/config.py (MYSQL_POOL_SIZE >= --workers).
+
+Usage:
+  python stress_checkout.py
+  python stress_checkout.py --clients 50 --stock 20 --quantity 2 --workers 10 --rounds 5
+"""
+import argparse
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.database.connection import get_db_manager
+from backend.database.dao import cart as cart_dao
+from backend.database.dao import orders as orders_dao
+from backend.database.dao import stats as stats_dao
+
+
+def setup(db, clients, stock, quantity):
+    """Test product, clients and carts; returns (product_id, [(client_id, cart_id)])."""
+    tag = uuid.uuid4().hex[:12]
+    product_id = db.execute_query(
+        "INSERT INTO product (product_name, price, stock, rating, createdAtt, updatedAt) "
+        "VALUES (%s, %s, %s, 0, NOW(), NOW())",
+        (f"stress-checkout-{tag}", 10, stock),
+        commit=True,
+    )
+    carts = []
+    for index in range(clients):
+        client_id = db.execute_query(
+            "INSERT INTO users (full_name, email, rolee, createdAT) VALUES (%s, %s, 'client', NOW())",
+            (f"stress {index}", f"stress-{tag}-{index}@example.invalid"),
+            commit=True,
+        )
+        cart_id = db.execute_query(
+            "INSERT INTO cart (id_client, cart_createdAt) VALUES (%s, NOW())", (client_id,), commit=True
+        )
+        # Même chemin que POST /api/cart/add (upsert executemany)
+        cart_dao.add_cart_item(cart_id, product_id, quantity)
+        carts.append((client_id, cart_id))
+    return product_id, carts
+
+
+def cleanup(db, product_id, carts):
+    client_ids = [client_id for client_id, _ in carts]
+    placeholders = ", ".join(["%s"] * len(client_ids))
+    with db.get_cursor(commit=True) as cursor:
+        cursor.execute(
+            "DELETE oi FROM order_item oi JOIN orders o ON o.id_order = oi.id_order "
+            f"WHERE o.id_client IN ({placeholders})",
+            client_ids,
+        )
+        cursor.execute(f"DELETE FROM orders WHERE id_client IN ({placeholders})", client_ids)
+        cursor.execute("DELETE FROM cart_item WHERE id_product = %s", (product_id,))
+        cursor.execute(f"DELETE FROM cart WHERE id_client IN ({placeholders})", client_ids)
+        cursor.execute(f"DELETE FROM users WHERE id_user IN ({placeholders})", client_ids)
+        cursor.execute("DELETE FROM product WHERE id_product = %s", (product_id,))
+    if stats_dao.incremental_enabled():
+        stats_dao.resync_counters()
+
+
+def run_round(db, args):
+    product_id, carts = setup(db, args.clients, args.stock, args.quantity)
+    in_carts = db.execute_query(
+        "SELECT COUNT(*) AS n FROM cart_item WHERE id_product = %s AND quantity = %s",
+        (product_id, args.quantity),
+        fetch_one=True,
+    )["n"]
+    if in_carts != args.clients:
+        cleanup(db, product_id, carts)
+        print(f"FAILED: {in_carts} of {args.clients} carts hold the product after add_cart_item")
+        return False
+
+    def checkout(cart):
+        client_id, cart_id = cart
+        try:
+            return orders_dao.checkout_cart(client_id, cart_id), None
+        except orders_dao.CheckoutError as error:
+            return None, str(error)
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(checkout, carts))
+        accepted = [order_id for order_id, _ in results if order_id is not None]
+        errors = [error for _, error in results if error is not None]
+        stock = db.execute_query(
+            "SELECT stock FROM product WHERE id_product = %s", (product_id,), fetch_one=True
+        )["stock"]
+        sold = len(accepted) * args.quantity
+        expected_accepted = min(args.clients, args.stock // args.quantity)
+        problems = []
+        if sold > args.stock:
+            problems.append(f"oversold: {sold} units sold, stock was {args.stock}")
+        if stock != args.stock - sold:
+            problems.append(f"stock is {stock}, expected {args.stock - sold}")
+        if len(accepted) != expected_accepted:
+            problems.append(f"{len(accepted)} orders accepted, expected {expected_accepted}")
+        if any(not error.startswith("Insufficient stock") for error in errors):
+            problems.append(f"unexpected errors: {sorted(set(errors))}")
+        print(f"accepted {len(accepted):>4}  rejected {len(errors):>4}  final stock {stock:>4}  "
+              + ("OK" if not problems else "FAILED: " + "; ".join(problems)))
+        return not problems
+    finally:
+        cleanup(db, product_id, carts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=30, help="concurrent checkouts")
+    parser.add_argument("--stock", type=int, default=10, help="initial stock of the product")
+    parser.add_argument("--quantity", type=int, default=1, help="units in each cart")
+    parser.add_argument("--workers", type=int, default=5, help="threads (<= MYSQL_POOL_SIZE)")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    db = get_db_manager()
+    ok = all([run_round(db, args) for _ in range(args.rounds)])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Stand-ins for the mysql-connector pool used by the unit tests."""
+import threading
+from backend.database import connection
+
+
+class FakePool:
+    """Counts the connections checked out; ``cursor_factory`` builds the
+    cursor of every connection."""
+
+    pool_size = 5
+
+    def __init__(self, cursor_factory):
+        self.cursor_factory = cursor_factory
+        self.checked_out = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def get_connection(self):
+        self.checked_out += 1
+        return FakeConnection(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self, **kwargs):
+        return self.pool.cursor_factory()
+
+    def commit(self):
+        self.pool.commit()
+
+    def rollback(self):
+        self.pool.rollback()
+
+    def close(self):
+        self.pool.checked_out -= 1
+
+
+def install_manager(monkeypatch, pool, request_scoped=False):
+    """A :class:`DatabaseManager` on ``pool``, returned by ``get_db_manager``."""
+    manager = connection.DatabaseManager.__new__(connection.DatabaseManager)
+    manager.request_scoped = request_scoped
+    manager._pool = pool
+    manager._stats_lock = threading.Lock()
+    manager._stats = {"cursors": 0, "checkouts": 0, "reuses": 0, "discards": 0}
+    monkeypatch.setattr(connection, "_db_manager", manager)
+    return manager
@@ -0,0 +1,257 @@
+"""Checkout stock updates: the conditional multi-row UPDATE never takes
+stock below zero, a short ``rowcount`` rolls the whole order back, and
+stock holds are converted or released.
+
+The fake cursor below plays the few statements of ``orders`` and
+``reservations`` against in-memory tables, with MySQL's rules for the
+conditional UPDATE (rows failing the WHERE clause are left out of
+``rowcount``) and a transaction applied on commit only.
+"""
+import copy
+import re
+import pytest
+from backend.config import Config
+from backend.database.dao import orders as orders_dao
+from backend.database.dao import reservations as reservations_dao
+from tests.fakes import FakePool, install_manager
+
+
+class Store:
+    """Tables of the fake database: ``data`` is the transaction in progress,
+    ``committed`` what other connections would see."""
+
+    def __init__(self, products, cart_items, holds=()):
+        self.data = {
+            "product": {product["id_product"]: dict(product) for product in products},
+            "cart_item": [dict(item) for item in cart_items],
+            "stock_reservation": [dict(hold) for hold in holds],
+            "orders": [],
+            "order_item": [],
+        }
+        self.committed = copy.deepcopy(self.data)
+        # Stock reported by the locked SELECT instead of the real one
+        self.stale_stock = {}
+
+    def commit(self):
+        self.committed = copy.deepcopy(self.data)
+
+    def rollback(self):
+        self.data = copy.deepcopy(self.committed)
+
+
+class StorePool(FakePool):
+    def __init__(self, store):
+        super().__init__(lambda: StoreCursor(store))
+        self.store = store
+
+    def commit(self):
+        super().commit()
+        self.store.commit()
+
+    def rollback(self):
+        super().rollback()
+        self.store.rollback()
+
+
+def _derived_rows(query, params):
+    """Rows of the ``SELECT %s AS a, %s AS b UNION ALL ...`` derived table."""
+    names = re.findall(r"%s AS (\w+)", query.split(" UNION ALL ")[0])
+    return [dict(zip(names, params[i:i + len(names)])) for i in range(0, len(params), len(names))]
+
+
+class StoreCursor:
+    def __init__(self, store):
+        self.store = store
+        self.result = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def execute(self, query, params=None):
+        query = " ".join(query.split())
+        params = list(params or ())
+        data = self.store.data
+        self.result, self.rowcount = [], 0
+        if query.startswith("SELECT id_product, quantity FROM cart_item"):
+            self.result = [dict(item) for item in data["cart_item"]]
+        elif query.startswith("SELECT id_product, product_name, price, stock"):
+            for product_id in sorted(params):
+                product = dict(data["product"][product_id])
+                product["stock"] = self.store.stale_stock.get(product_id, product["stock"])
+                self.result.append(product)
+        elif query.startswith("INSERT INTO orders"):
+            data["orders"].append(params)
+            self.lastrowid = len(data["orders"])
+        elif query.startswith("DELETE FROM cart_item"):
+            data["cart_item"] = []
+        elif query.startswith("UPDATE product p JOIN"):
+            self._update_product(query, params)
+        elif query.startswith("SELECT id_product, quantity FROM stock_reservation WHERE id_client"):
+            self.result = [
+                {"id_product": hold["id_product"], "quantity": hold["quantity"]}
+                for hold in data["stock_reservation"] if hold["id_client"] == params[0]
+            ]
+        elif query.startswith("DELETE FROM stock_reservation WHERE id_client"):
+            data["stock_reservation"] = [
+                hold for hold in data["stock_reservation"] if hold["id_client"] != params[0]
+            ]
+        elif query.startswith("SELECT id_reservation, id_product, quantity FROM stock_reservation"):
+            self.result = [dict(hold) for hold in data["stock_reservation"] if hold["expired"]]
+        elif query.startswith("DELETE FROM stock_reservation WHERE id_reservation IN"):
+            data["stock_reservation"] = [
+                hold for hold in data["stock_reservation"] if hold["id_reservation"] not in params
+            ]
+        elif query.startswith("DELETE FROM dashboard_counter"):
+            pass
+        else:
+            raise AssertionError(f"Unexpected query: {query}")
+
+    def _update_product(self, query, params):
+        products = self.store.data["product"]
+        for row in _derived_rows(query, params):
+            product = products.get(row["id_product"])
+            if product is None:
+                continue
+            if query.endswith("SET p.stock = p.stock - q.quantity WHERE p.stock >= q.quantity"):
+                if product["stock"] < row["quantity"]:
+                    continue
+                product["stock"] -= row["quantity"]
+            elif "SET p.stock = p.stock - q.quantity, p.reserved_stock = p.reserved_stock - q.held" in query:
+                available = product["stock"] - product["reserved_stock"] + row["held"]
+                if row["quantity"] != 0 and available < row["quantity"]:
+                    continue
+                product["stock"] -= row["quantity"]
+                product["reserved_stock"] -= row["held"]
+            elif query.endswith("SET p.reserved_stock = p.reserved_stock + d.delta"):
+                product["reserved_stock"] += row["delta"]
+            else:
+                raise AssertionError(f"Unexpected update: {query}")
+            self.rowcount += 1
+
+    def executemany(self, query, params_list):
+        assert query.startswith("INSERT INTO order_item")
+        self.store.data["order_item"].extend(params_list)
+        self.rowcount = len(params_list)
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def close(self):
+        pass
+
+
+def _product(product_id, stock, reserved_stock=0):
+    return {
+        "id_product": product_id, "product_name": f"product {product_id}", "price": 10,
+        "stock": stock, "reserved_stock": reserved_stock,
+    }
+
+
+@pytest.fixture
+def store(monkeypatch):
+    def install(products, cart_items, holds=(), reserving=False):
+        store = Store(products, cart_items, holds)
+        pool = StorePool(store)
+        install_manager(monkeypatch, pool)
+        monkeypatch.setattr(Config, "STOCK_RESERVATIONS", reserving)
+        monkeypatch.setattr(reservations_dao, "_swept_at", 0.0)
+        reservations_dao.forget_available([product["id_product"] for product in products])
+        store.pool = pool
+        return store
+
+    return install
+
+
+def test_decrement_stock_skips_rows_short_of_stock():
+    store = Store([_product(1, 5), _product(2, 1)], [])
+    cursor = StoreCursor(store)
+
+    assert orders_dao._decrement_stock(cursor, {1: 2, 2: 3}) is False
+    assert cursor.rowcount == 1
+    assert store.data["product"][2]["stock"] == 1
+
+    assert orders_dao._decrement_stock(cursor, {1: 3, 2: 1}) is True
+    assert [product["stock"] for product in store.data["product"].values()] == [0, 0]
+
+
+def test_checkout_takes_stock_off_every_product(store):
+    db = store([_product(1, 5), _product(2, 2)], [
+        {"id_product": 1, "quantity": 2}, {"id_product": 2, "quantity": 2},
+    ])
+
+    order_id = orders_dao.checkout_cart(7, 3)
+
+    assert order_id == 1
+    assert {pid: p["stock"] for pid, p in db.committed["product"].items()} == {1: 3, 2: 0}
+    assert len(db.committed["order_item"]) == 2
+    assert db.committed["cart_item"] == []
+    assert db.pool.checked_out == 0
+
+
+def test_checkout_refuses_missing_stock(store):
+    db = store([_product(1, 5), _product(2, 1)], [
+        {"id_product": 1, "quantity": 2}, {"id_product": 2, "quantity": 2},
+    ])
+
+    with pytest.raises(orders_dao.CheckoutError) as error:
+        orders_dao.checkout_cart(7, 3)
+
+    assert error.value.product_ids == [2]
+    assert db.pool.commits == 0
+    assert {pid: p["stock"] for pid, p in db.committed["product"].items()} == {1: 5, 2: 1}
+
+
+def test_checkout_rolls_back_when_the_update_misses_a_row(store):
+    # The locked read saw enough stock, the conditional UPDATE does not:
+    # rowcount is short and nothing of the order is kept.
+    db = store([_product(1, 5), _product(2, 1)], [
+        {"id_product": 1, "quantity": 2}, {"id_product": 2, "quantity": 2},
+    ])
+    db.stale_stock = {2: 10}
+
+    with pytest.raises(orders_dao.CheckoutError):
+        orders_dao.checkout_cart(7, 3)
+
+    assert db.pool.commits == 0 and db.pool.rollbacks == 1
+    assert {pid: p["stock"] for pid, p in db.committed["product"].items()} == {1: 5, 2: 1}
+    assert db.committed["orders"] == [] and db.committed["order_item"] == []
+    assert len(db.committed["cart_item"]) == 2
+
+
+def test_checkout_converts_the_client_holds(store):
+    db = store(
+        [_product(1, 5, reserved_stock=4), _product(2, 3, reserved_stock=1)],
+        [{"id_product": 1, "quantity": 2}],
+        holds=[
+            {"id_reservation": 1, "id_client": 7, "id_product": 1, "quantity": 2, "expired": False},
+            {"id_reservation": 2, "id_client": 7, "id_product": 2, "quantity": 1, "expired": False},
+            {"id_reservation": 3, "id_client": 8, "id_product": 1, "quantity": 2, "expired": False},
+        ],
+        reserving=True,
+    )
+
+    orders_dao.checkout_cart(7, 3)
+
+    products = db.committed["product"]
+    assert (products[1]["stock"], products[1]["reserved_stock"]) == (3, 2)
+    # Held but not ordered: the units go back to the other clients
+    assert (products[2]["stock"], products[2]["reserved_stock"]) == (3, 0)
+    assert [hold["id_client"] for hold in db.committed["stock_reservation"]] == [8]
+
+
+def test_release_expired_gives_back_reserved_stock(store):
+    db = store(
+        [_product(1, 5, reserved_stock=5)],
+        [],
+        holds=[
+            {"id_reservation": 1, "id_client": 7, "id_product": 1, "quantity": 3, "expired": True},
+            {"id_reservation": 2, "id_client": 8, "id_product": 1, "quantity": 2, "expired": False},
+        ],
+    )
+
+    assert reservations_dao.release_expired() == 1
+
+    assert db.committed["product"][1]["reserved_stock"] == 2
+    assert [hold["id_reservation"] for hold in db.committed["stock_reservation"]] == [2]
@@ -0,0 +1,68 @@
+"""Streamed list responses must not keep a pooled connection while the
+client reads (request-scoped connections enabled)."""
+from flask import Flask
+from backend.controllers import pagination, streaming
+from backend.json_provider import FastJSONProvider
+from tests.fakes import FakePool, install_manager
+
+ROWS = [{"id_product": i} for i in range(1, 8)]
+
+
+class FakeCursor:
+    def execute(self, query, params=None):
+        pass
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+def stream_checkouts(monkeypatch, path):
+    pool = FakePool(FakeCursor)
+    manager = install_manager(monkeypatch, pool, request_scoped=True)
+    monkeypatch.setattr(streaming.Config, "STREAM_BATCH_SIZE", 3)
+
+    def fetch(conditions, params, order_by, limit):
+        # One query on the request-scoped connection, like the DAOs
+        manager.execute_query("SELECT id_product FROM product", params, fetch_all=True)
+        after = params[-1] if params else 0
+        return [row for row in ROWS if row["id_product"] > after][:limit]
+
+    def hydrate(rows):
+        manager.execute_query("SELECT * FROM product_image", None, fetch_all=True)
+        return [dict(row) for row in rows]
+
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app, backend="json")
+
+    @app.route("/stream")
+    def stream():
+        return streaming.stream_json(streaming.keyset_batches(fetch, pagination.PRODUCT_IDS), hydrate)
+
+    app.teardown_appcontext(lambda error: manager.close_connection())
+
+    response = app.test_client().get(path)
+    held = []
+    body = b""
+    for chunk in response.response:
+        # The client reads this chunk: no connection may be checked out
+        held.append(pool.checked_out)
+        body += chunk
+    response.close()
+    return held, body, pool
+
+
+def test_json_stream_releases_connection_between_batches(monkeypatch):
+    held, body, pool = stream_checkouts(monkeypatch, "/stream")
+    assert body.replace(b"\n", b"") == b"[" + b",".join(b'{"id_product":%d}' % row["id_product"] for row in ROWS) + b"]"
+    assert held and set(held) == {0}
+    assert pool.checked_out == 0
+
+
+def test_ndjson_stream_releases_connection_between_batches(monkeypatch):
+    held, body, pool = stream_checkouts(monkeypatch, "/stream?format=ndjson")
+    assert body.splitlines() == [b'{"id_product":%d}' % row["id_product"] for row in ROWS]
+    assert len(held) == 3 and set(held) == {0}
+    assert pool.checked_out == 0